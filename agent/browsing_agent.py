@@ -1,19 +1,57 @@
 # agent/browsing_agent.py
 
 import json
+import os
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from agency_swarm.agents import Agent
-from agency_swarm.tools import BaseTool
-from litellm import completion
-from config.config import GROQ_API_KEY, GROQ_API_BASE, SEARXNG_INSTANCE
-import aiohttp
-from bs4 import BeautifulSoup
+from config.config import (
+    SEARXNG_INSTANCE, SEARXNG_INSTANCES,
+    VERIFY_CONCURRENCY, VERIFY_TIMEOUT, VERIFY_BATCH_SIZE, VERIFY_BATCH_MAX_CHARS,
+    CACHE_DIR, SEARCH_CACHE_TTL, SEARCH_CACHE_MEMORY_SIZE, SEARCH_CACHE_DISK_SIZE,
+    PAGE_CACHE_MAX_ENTRIES, PAGE_MAX_BYTES, PAGE_CHUNK_SIZE,
+    CONTEXT_TOKEN_BUDGET, CONTEXT_CHUNK_TOKENS, LINK_FETCH_CONCURRENCY, LINK_FETCH_DEADLINE
+)
+from config.settings import get_settings
+from utils.http_client import HttpClient, HttpStatusError
+from utils.llm_gateway import acomplete, astream
+from utils.token_stream import collect
+from utils.cache import TieredCache
+from utils.page_cache import PageCache
+from utils.html_extract import extract_document
+from utils.context_packer import ContextPacker
+from utils.search_fanout import build_fanout
+from utils.bounded_gather import gather_bounded
+from utils.tracing import annotate, traced
 import re
 from datetime import datetime
-from urllib.parse import urlencode
-import yaml
-from pathlib import Path
+
+verification_prompt = """
+        Analyze the following content for credibility and potential biases:
+        
+        {content}
+        
+        Provide a brief assessment of:
+        1. The credibility of the source
+        2. Any potential biases or limitations
+        3. Corroboration with other sources (if applicable)
+        
+        Assessment:
+        """
+
+batch_verification_prompt = """
+        Analyze each of the following documents for credibility and potential biases:
+
+        {documents}
+
+        For every document provide a brief assessment of:
+        1. The credibility of the source
+        2. Any potential biases or limitations
+        3. Corroboration with the other documents (if applicable)
+
+        Respond only with a JSON array containing one object per document, in the form:
+        [{{"id": <document id>, "assessment": "<assessment>"}}]
+        """
 
 class SearxngSearchOptions:
     def __init__(self, categories: Optional[List[str]] = None, 
@@ -29,7 +67,7 @@ class SearxngSearchResult:
     def __init__(self, title: str, url: str, img_src: Optional[str] = None, 
                  thumbnail_src: Optional[str] = None, thumbnail: Optional[str] = None, 
                  content: Optional[str] = None, author: Optional[str] = None, 
-                 iframe_src: Optional[str] = None):
+                 iframe_src: Optional[str] = None, engines: Optional[List[str]] = None):
         self.title = title
         self.url = url
         self.img_src = img_src
@@ -38,46 +76,99 @@ class SearxngSearchResult:
         self.content = content
         self.author = author
         self.iframe_src = iframe_src
+        self.engines = engines or []
 
 class BrowsingAgent(Agent):
     def __init__(self, name="Browsing", description="Advanced AI browsing agent"):
         super().__init__(name, description)
 
-        # Load the settings.yml file
-        settings_path = Path(__file__).resolve().parent.parent / "config" / "settings.yml"
-        with open(settings_path, 'r') as file:
-            self.settings = yaml.safe_load(file)
+        # Shared, lazily parsed view of config/settings.yml; only the sections read below are parsed
+        self.settings = get_settings()
 
         self.searxng_instance = self.settings.get('searxng_instance', SEARXNG_INSTANCE)
+        self.searxng_instances = self.settings.get('searxng_instances') or (
+            [self.settings['searxng_instance']] if 'searxng_instance' in self.settings else SEARXNG_INSTANCES
+        )
         self.groq_model = self.settings.get('groq_model', "llama-3.1-70b-versatile")
-       
+
+        # Shared connection pool for every search and link fetch made by this agent
+        self.http = HttpClient.from_settings(self.settings.get('outgoing', {}), self.settings.get('search', {}))
+
+        # Every SearxNG instance and DuckDuckGo are queried together; see utils/search_fanout.py
+        self.search_backend = build_fanout(self.searxng_instances, self.http)
+
+        # Search results survive restarts so repeated planner/suggester queries skip SearxNG
+        self.search_cache = TieredCache(
+            os.path.join(CACHE_DIR, "search.sqlite3"),
+            table="searxng_results",
+            ttl=SEARCH_CACHE_TTL,
+            memory_size=SEARCH_CACHE_MEMORY_SIZE,
+            disk_size=SEARCH_CACHE_DISK_SIZE
+        )
+        self.page_cache = PageCache(os.path.join(CACHE_DIR, "pages"), max_entries=PAGE_CACHE_MAX_ENTRIES)
+
+        self.context_packer = ContextPacker(token_budget=CONTEXT_TOKEN_BUDGET, chunk_tokens=CONTEXT_CHUNK_TOKENS)
+
+        self.verify_concurrency = VERIFY_CONCURRENCY
+        self.verify_timeout = VERIFY_TIMEOUT
+        self.verify_batch_size = VERIFY_BATCH_SIZE
+        self.verify_batch_max_chars = VERIFY_BATCH_MAX_CHARS
+
+        self.link_fetch_concurrency = LINK_FETCH_CONCURRENCY
+        self.link_fetch_deadline = LINK_FETCH_DEADLINE
+
+    async def close(self):
+        await self.http.close()
+        self.search_cache.close()
+        self.page_cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def search_cache_key(self, query: str, opts: Optional[SearxngSearchOptions] = None) -> str:
+        opts = opts or SearxngSearchOptions()
+        return json.dumps({
+            "instances": sorted(self.searxng_instances),
+            "q": " ".join(query.lower().split()),
+            "categories": sorted(opts.categories or []),
+            "engines": sorted(opts.engines or []),
+            "language": opts.language,
+            "pageno": opts.pageno or 1
+        }, sort_keys=True)
+
+    @traced()
     async def search_searxng(self, query: str, opts: Optional[SearxngSearchOptions] = None) -> Dict[str, Any]:
-        url = f"{self.searxng_instance}/search"
-        params = {
-            "q": query,
-            "format": "json"
+        key = self.search_cache_key(query, opts)
+        cached = self.search_cache.get(key)
+        annotate(**{"search.query": query, "cache.hit": cached is not None})
+        if cached is not None:
+            return {
+                "results": [SearxngSearchResult(**result) for result in cached["results"]],
+                "suggestions": cached["suggestions"]
+            }
+
+        data = await self.fetch_searxng(query, opts)
+        if "error" not in data:
+            self.search_cache.set(key, {
+                "results": [vars(result) for result in data["results"]],
+                "suggestions": data["suggestions"]
+            })
+        return data
+
+    async def fetch_searxng(self, query: str, opts: Optional[SearxngSearchOptions] = None) -> Dict[str, Any]:
+        data = await self.search_backend.search(query, opts)
+        response = {
+            "results": [SearxngSearchResult(**result) for result in data["results"]],
+            "suggestions": data["suggestions"]
         }
+        if "error" in data:
+            response["error"] = data["error"]
+        return response
 
-        if opts:
-            if opts.categories:
-                params["categories"] = ",".join(opts.categories)
-            if opts.engines:
-                params["engines"] = ",".join(opts.engines)
-            if opts.language:
-                params["language"] = opts.language
-            if opts.pageno:
-                params["pageno"] = str(opts.pageno)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    results = [SearxngSearchResult(**result) for result in data.get("results", [])]
-                    suggestions = data.get("suggestions", [])
-                    return {"results": results, "suggestions": suggestions}
-                else:
-                    return {"results": [], "suggestions": [], "error": f"Failed to fetch data: {response.status}"}
-
+    @traced()
     async def refined_search_retriever(self, query: str, chat_history: List[Dict[str, str]]) -> str:
         prompt = f"""
                 You are Perplexica, an advanced AI browsing agent.You are working in an agency of ai agents who will communicate with you to ask questions to different tasks,they refer to you as browsing agent.Analyze the conversation and follow-up question below. Your task is to:
@@ -99,55 +190,124 @@ class BrowsingAgent(Agent):
         Follow-up question: {query}
         Analyzed and Rephrased Query:
         """
-        response = await completion(messages=[{"role": "user", "content": prompt}])
+        response = await acomplete(model=self.groq_model, messages=[{"role": "user", "content": prompt}])
         return response['choices'][0]['message']['content']
 
-    async def get_document_from_link(self, link: str) -> Dict[str, Any]:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(link) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    text = soup.get_text(separator='\n', strip=True)
-                    return {
-                        "pageContent": text,
-                        "metadata": {
-                            "source": link,
-                            "title": soup.title.string if soup.title else "No title"
-                        }
-                    }
-                else:
-                    return {"pageContent": "", "metadata": {"source": link, "title": "Failed to load document"}}
+    async def fetch_document(self, link: str) -> Dict[str, Any]:
+        cached = self.page_cache.lookup(link)
+        # Rate limited per host, retried with backoff and bounded by the request deadline
+        async with self.http.request("GET", link, headers=self.page_cache.conditional_headers(cached)) as response:
+            if response.status == 304 and cached is not None:
+                # Unchanged upstream, reuse the text extracted last time
+                self.page_cache.mark_revalidated(link)
+                return self.page_document(link, cached["title"], cached["pageContent"])
+            if response.status != 200:
+                raise HttpStatusError(link, response.status)
+            # Text is extracted while the body streams in, capped at PAGE_MAX_BYTES
+            page = await extract_document(response, max_bytes=PAGE_MAX_BYTES, chunk_size=PAGE_CHUNK_SIZE)
+            self.page_cache.store(
+                link, page["digest"], page["title"], page["text"],
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+            return self.page_document(link, page["title"], page["text"])
+
+    @traced()
+    async def fetch_links(self, links: List[str]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        # At most LINK_FETCH_CONCURRENCY pages in flight; whatever is not done by
+        # LINK_FETCH_DEADLINE is dropped so one hung server cannot hold up the answer
+        outcomes = await gather_bounded(
+            links, self.fetch_document, max_in_flight=self.link_fetch_concurrency, deadline=self.link_fetch_deadline
+        )
+        docs = [outcome.result for outcome in outcomes if outcome.ok]
+        dropped = [{"url": outcome.item, "reason": outcome.reason} for outcome in outcomes if not outcome.ok]
+        return docs, dropped
+
+    def page_document(self, link: str, title: Optional[str], text: str) -> Dict[str, Any]:
+        return {
+            "pageContent": text,
+            "metadata": {
+                "source": link,
+                "title": title or "No title"
+            }
+        }
 
+    @traced()
     async def verify_content(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        verification_prompt = """
-        Analyze the following content for credibility and potential biases:
-        
-        {content}
-        
-        Provide a brief assessment of:
-        1. The credibility of the source
-        2. Any potential biases or limitations
-        3. Corroboration with other sources (if applicable)
-        
-        Assessment:
-        """
-        
-        verified_docs = []
+        semaphore = asyncio.Semaphore(self.verify_concurrency)
+        batches = self.batch_for_verification(docs)
+        await asyncio.gather(*[self.verify_batch(batch, semaphore) for batch in batches])
+        return docs
+
+    def batch_for_verification(self, docs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        # Short documents share a prompt, long ones are verified on their own
+        batches = []
+        current = []
         for doc in docs:
-            prompt = verification_prompt.format(content=doc["pageContent"])
-            response = await completion(model=self.groq_model, messages=[{"role": "user", "content": prompt}])
+            if self.verify_batch_size <= 1 or len(doc["pageContent"]) > self.verify_batch_max_chars:
+                batches.append([doc])
+                continue
+            current.append(doc)
+            if len(current) >= self.verify_batch_size:
+                batches.append(current)
+                current = []
+        if current:
+            batches.append(current)
+        return batches
+
+    async def verify_batch(self, batch: List[Dict[str, Any]], semaphore: asyncio.Semaphore):
+        if len(batch) == 1:
+            await self.verify_document(batch[0], semaphore)
+            return
+
+        documents = "\n\n".join([f"Document {i+1}:\n{doc['pageContent']}" for i, doc in enumerate(batch)])
+        prompt = batch_verification_prompt.format(documents=documents)
+        try:
+            async with semaphore:
+                response = await asyncio.wait_for(
+                    acomplete(model=self.groq_model, messages=[{"role": "user", "content": prompt}]),
+                    timeout=self.verify_timeout
+                )
+            assessments = {
+                int(item["id"]): item["assessment"]
+                for item in json.loads(response['choices'][0]['message']['content'])
+            }
+        except asyncio.TimeoutError:
+            for doc in batch:
+                doc["metadata"]["credibilityAssessment"] = "Credibility assessment timed out."
+            return
+        except (ValueError, KeyError, TypeError):
+            # Unstructured answer, fall back to verifying each document on its own
+            await asyncio.gather(*[self.verify_document(doc, semaphore) for doc in batch])
+            return
+
+        missing = []
+        for i, doc in enumerate(batch):
+            if i + 1 in assessments:
+                doc["metadata"]["credibilityAssessment"] = assessments[i + 1]
+            else:
+                missing.append(doc)
+        await asyncio.gather(*[self.verify_document(doc, semaphore) for doc in missing])
+
+    async def verify_document(self, doc: Dict[str, Any], semaphore: asyncio.Semaphore):
+        prompt = verification_prompt.format(content=doc["pageContent"])
+        try:
+            async with semaphore:
+                response = await asyncio.wait_for(
+                    acomplete(model=self.groq_model, messages=[{"role": "user", "content": prompt}]),
+                    timeout=self.verify_timeout
+                )
             doc["metadata"]["credibilityAssessment"] = response['choices'][0]['message']['content']
-            verified_docs.append(doc)
-        
-        return verified_docs
+        except asyncio.TimeoutError:
+            doc["metadata"]["credibilityAssessment"] = "Credibility assessment timed out."
 
+    @traced()
     async def compare_documents(self, docs: List[Dict[str, Any]], query: str) -> str:
         comparison_prompt = f'''
         Compare the following documents in relation to the query: "{query}"
         
         Documents:
-        {self.format_documents(docs)}
+        {self.format_documents(docs, query)}
         
         Provide a comparison highlighting:
         1. Key similarities
@@ -157,34 +317,42 @@ class BrowsingAgent(Agent):
         Comparison:        
         '''
         
-        response = await completion(model=self.groq_model, messages=[{"role": "user", "content": comparison_prompt}])
+        response = await acomplete(model=self.groq_model, messages=[{"role": "user", "content": comparison_prompt}])
         return response['choices'][0]['message']['content']
 
+    @traced()
     async def process_documents(self, docs: List[Dict[str, Any]], query: str) -> str:
         verified_docs = await self.verify_content(docs)
         comparison_result = await self.compare_documents(verified_docs, query)
         
+        # Only the most relevant chunks of each document fit the answer prompt
         processed_content = "\n\n".join([
-            f"{i+1}. {doc['pageContent']}\nCredibility Assessment: {doc['metadata']['credibilityAssessment']}"
-            for i, doc in enumerate(verified_docs)
+            f"{source}. {text}\nCredibility Assessment: {verified_docs[source - 1]['metadata']['credibilityAssessment']}"
+            for source, text in self.context_packer.pack(verified_docs, query)
         ])
         
         return f"{processed_content}\n\nComparison Analysis:\n{comparison_result}"
 
-    async def perplexica_agent(self, query: str, chat_history: List[Dict[str, str]]) -> str:
+    @traced()
+    async def perplexica_prompt(self, query: str, chat_history: List[Dict[str, str]]
+                                ) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        # Returns the answer prompt (None when no search is needed) and the links that could not be loaded
         refined_query = await self.refined_search_retriever(query, chat_history)
         
         if refined_query == 'not_needed':
-            return "How can I assist you with your task or writing assignment?"
+            return None, []
 
         links_match = re.search(r'<links>(.*?)</links>', refined_query, re.DOTALL)
         question_match = re.search(r'<question>(.*?)</question>', refined_query, re.DOTALL)
 
         links = links_match.group(1).split('\n') if links_match else []
+        links = list(dict.fromkeys(link.strip() for link in links if link.strip()))
         processed_query = question_match.group(1) if question_match else refined_query
 
+        # Returned rather than kept on the agent: one agent serves concurrent sessions (see server.py)
+        dropped_links = []
         if links:
-            docs = await asyncio.gather(*[self.get_document_from_link(link) for link in links])
+            docs, dropped_links = await self.fetch_links(links)
         else:
             search_results = await self.search_searxng(processed_query, SearxngSearchOptions(language="en"))
             docs = [
@@ -202,6 +370,10 @@ class BrowsingAgent(Agent):
             ]
 
         processed_docs = await self.process_documents(docs, processed_query)
+        if dropped_links:
+            processed_docs += "\n\nLinks that could not be loaded:\n" + "\n".join(
+                f"- {link['url']}: {link['reason']}" for link in dropped_links
+            )
 
         perplexica_prompt = f"""
         You are Perplexica, an advanced AI browsing agent with the following capabilities:
@@ -244,20 +416,41 @@ class BrowsingAgent(Agent):
         Response:
         """
 
-        response = await completion(model=self.groq_model, messages=[{"role": "user", "content": perplexica_prompt}])
-        return response['choices'][0]['message']['content']
+        return perplexica_prompt, dropped_links
+
+    async def answer_stream(self, perplexica_prompt: Optional[str]) -> AsyncIterator[str]:
+        if perplexica_prompt is None:
+            yield "How can I assist you with your task or writing assignment?"
+            return
+        async for token in astream(model=self.groq_model, messages=[{"role": "user", "content": perplexica_prompt}]):
+            yield token
+
+    @traced()
+    async def perplexica_stream(self, query: str, chat_history: List[Dict[str, str]]) -> AsyncIterator[str]:
+        # Search and document processing finish first, then the answer streams token by token.
+        # Dropped links only reach the answer through the prompt; use perplexica_prompt to get them
+        perplexica_prompt, _ = await self.perplexica_prompt(query, chat_history)
+        async for token in self.answer_stream(perplexica_prompt):
+            yield token
+
+    @traced()
+    async def perplexica_agent(self, query: str, chat_history: List[Dict[str, str]]
+                               ) -> Tuple[str, List[Dict[str, str]]]:
+        perplexica_prompt, dropped_links = await self.perplexica_prompt(query, chat_history)
+        return await collect(self.answer_stream(perplexica_prompt)), dropped_links
 
     def format_chat_history(self, chat_history: List[Dict[str, str]]) -> str:
         return "\n".join([f"{msg['role'].capitalize()}: {msg['content']}" for msg in chat_history])
 
-    def format_documents(self, docs: List[Dict[str, Any]]) -> str:
-        return "\n\n".join([f"Document {i+1}:\n{doc['pageContent']}" for i, doc in enumerate(docs)])
+    def format_documents(self, docs: List[Dict[str, Any]], query: str = "") -> str:
+        return "\n\n".join([f"Document {source}:\n{text}" for source, text in self.context_packer.pack(docs, query)])
 
+    @traced()
     async def run(self, input_data: str) -> str:
         input_json = json.loads(input_data)
         query = input_json.get('query')
         chat_history = input_json.get('chat_history', [])
 
-        result = await self.perplexica_agent(query, chat_history)
-        return json.dumps({"response": result})
+        result, dropped_links = await self.perplexica_agent(query, chat_history)
+        return json.dumps({"response": result, "dropped_links": dropped_links})
                     
@@ -1,8 +1,11 @@
 # agents/planner_agent.py
 from agency_swarm.agents import Agent
 import json
-from litellm import completion
- plan_prompt = f"""You are the **Planning Agent** within a collaborative team of AI agents designed to convert user-provided ideas into detailed project plans. Your primary responsibilities involve selecting the optimal tech stack, defining the software architecture, and outlining the development tasks. You collaborate closely with the **Browsing Agent** and **Suggester Agent** to ensure that all aspects of the project are thoroughly researched, planned, and optimized.
+from utils.llm_gateway import astream
+from utils.token_stream import collect
+from utils.task_graph import TaskGraph
+from utils.tracing import traced
+plan_prompt = """You are the **Planning Agent** within a collaborative team of AI agents designed to convert user-provided ideas into detailed project plans. Your primary responsibilities involve selecting the optimal tech stack, defining the software architecture, and outlining the development tasks. You collaborate closely with the **Browsing Agent** and **Suggester Agent** to ensure that all aspects of the project are thoroughly researched, planned, and optimized.
 
          ## Task Workflow
 
@@ -39,55 +42,75 @@ from litellm import completion
 class PlannerAgent(Agent):
     def __init__(self, **kwargs):
         super().__init__(
-            name=Planner",
+            name="Planner",
             description="Plans the project architecture and tasks",
             tools=[],  # You may define tools here if needed
             **kwargs
         )
         self.plan = {}
+        self.timings = {}
 
-    async def create_plan(self, user_input):
-        
-
-        # Call to the LLM for generating the plan
-        plan_response = await completion(
+    def draft_plan_stream(self, user_input):
+        # Tokens of the draft plan as the model produces them
+        return astream(
             model="groq/llama-3.1-70b-versatile",
-            messages=[{"role": "user", "content": plan_prompt}]
+            messages=[{"role": "user", "content": plan_prompt.format(user_input=user_input)}]
         )
 
-        self.plan = json.loads(plan_response['choices'][0]['message']['content'])
+    @traced()
+    async def draft_plan(self, user_input):
+        return json.loads(await collect(self.draft_plan_stream(user_input)))
 
+    @traced()
+    async def review_draft(self, plan):
         # Communicate with SuggesterAgent for improvements (Using your agency’s method)
         suggester_response = await self.agency.get_completion(
-            json.dumps({"action": "review_plan", "plan": self.plan}),
+            json.dumps({"action": "review_plan", "plan": plan}),
             recipient_agent=self.agency.get_agent("SuggesterAgent")
         )
         suggester_feedback = json.loads(suggester_response)
 
         # Incorporate suggestions
-        self.plan = self.incorporate_suggestions(self.plan, suggester_feedback.get('suggestions', []))
-
-        return json.dumps(self.plan)
+        return self.incorporate_suggestions(dict(plan), suggester_feedback.get('suggestions', []))
 
-    async def get_tech_stack(self):
+    @traced()
+    async def research_tech_stack(self, requirements):
         # Communicate with BrowsingAgent to get tech stack recommendations
         browsing_response = await self.agency.get_completion(
-            json.dumps({"action": "get_tech_stack", "requirements": self.plan.get('requirements', {})}),
+            json.dumps({"action": "get_tech_stack", "requirements": requirements}),
             recipient_agent=self.agency.get_agent("BrowsingAgent")
         )
-        tech_stack = json.loads(browsing_response)
-
-        self.plan['tech_stack'] = tech_stack
-        return json.dumps(tech_stack)
+        return json.loads(browsing_response)
 
-    async def get_architecture(self):
+    @traced()
+    async def research_architecture(self, requirements, tech_stack=None):
         # Communicate with BrowsingAgent to get architecture recommendations
         browsing_response = await self.agency.get_completion(
-            json.dumps({"action": "get_architecture", "tech_stack": self.plan.get('tech_stack', {})}),
+            json.dumps({"action": "get_architecture", "requirements": requirements, "tech_stack": tech_stack or {}}),
             recipient_agent=self.agency.get_agent("BrowsingAgent")
         )
-        architecture = json.loads(browsing_response)
+        return json.loads(browsing_response)
+
+    async def create_plan_stream(self, user_input):
+        # Streams the draft; self.plan holds the reviewed plan once the generator is exhausted
+        parts = []
+        async for token in self.draft_plan_stream(user_input):
+            parts.append(token)
+            yield token
+        self.plan = await self.review_draft(json.loads("".join(parts)))
+
+    @traced()
+    async def create_plan(self, user_input):
+        await collect(self.create_plan_stream(user_input))
+        return json.dumps(self.plan)
+
+    async def get_tech_stack(self):
+        tech_stack = await self.research_tech_stack(self.plan.get('requirements', {}))
+        self.plan['tech_stack'] = tech_stack
+        return json.dumps(tech_stack)
 
+    async def get_architecture(self):
+        architecture = await self.research_architecture(self.plan.get('requirements', {}), self.plan.get('tech_stack', {}))
         self.plan['architecture'] = architecture
         return json.dumps(architecture)
 
@@ -102,16 +125,57 @@ class PlannerAgent(Agent):
                 plan.pop(suggestion['key'], None)
         return plan
 
+    @traced()
+    async def confirm_research(self, draft, reviewed, tech_stack, architecture):
+        # Research started from the draft requirements; if the review changed them,
+        # the speculative results are stale and both stages run again in order.
+        # Architecture was researched for the draft's own tech stack, so it is only
+        # researched again if the recommended stack turned out different.
+        requirements = reviewed.get('requirements', {})
+        if requirements != draft.get('requirements', {}):
+            tech_stack = await self.research_tech_stack(requirements)
+        elif tech_stack == draft.get('tech_stack', {}):
+            return tech_stack, architecture
+        architecture = await self.research_architecture(requirements, tech_stack)
+        return tech_stack, architecture
+
+    def research_graph(self, user_input):
+        # Research only needs the draft plan, so tech stack and architecture research
+        # run beside the suggester review and beside each other, speculatively from
+        # the draft requirements and the draft's tech stack. "research" keeps what
+        # still matches the reviewed requirements and the recommended stack.
+        graph = TaskGraph()
+        graph.add("draft", lambda results: self.draft_plan(user_input))
+        graph.add("review", lambda results: self.review_draft(results["draft"]), deps=["draft"])
+        graph.add("tech_stack",
+                  lambda results: self.research_tech_stack(results["draft"].get('requirements', {})),
+                  deps=["draft"])
+        graph.add("architecture",
+                  lambda results: self.research_architecture(
+                      results["draft"].get('requirements', {}), results["draft"].get('tech_stack', {})
+                  ),
+                  deps=["draft"])
+        graph.add("research",
+                  lambda results: self.confirm_research(
+                      results["draft"], results["review"], results["tech_stack"], results["architecture"]
+                  ),
+                  deps=["review", "tech_stack", "architecture"])
+        return graph
+
+    @traced()
     async def run(self, user_input):
-        plan = await self.create_plan(user_input)
-        tech_stack = await self.get_tech_stack()
-        architecture = await self.get_architecture()
+        graph = self.research_graph(user_input)
+        results = await graph.run()
+        tech_stack, architecture = results["research"]
+
+        self.plan = dict(results["review"])
+        self.plan['tech_stack'] = tech_stack
+        self.plan['architecture'] = architecture
+        self.timings = graph.timings
 
         return json.dumps({
-            "plan": json.loads(plan),
-            "tech_stack": json.loads(tech_stack),
-            "architecture": json.loads(architecture)
+            "plan": results["review"],
+            "tech_stack": tech_stack,
+            "architecture": architecture,
+            "timings": graph.timings
         })
-
-
-
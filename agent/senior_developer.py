@@ -1,19 +1,29 @@
 import os
+import sys
+import json
 import base64
-import requests
-from PIL import Image
-from io import BytesIO
-from duckduckgo_search import AsyncDDGS
 from agency_swarm.tools import BaseTool
 from pydantic import Field, validator
 from agency_swarm import Agent, Agency, set_openai_client
-from litellm import LiteLLM
+from utils.file_transaction import FileTransaction, write_file
+from utils.patch_engine import AnchoredEdit, PatchError, parse_unified_diff, patch_file
+from utils.tool_runtime import ToolRuntime
+from utils.subprocess_manager import get_manager, install_requirements
+from utils.token_stream import print_stream
+from utils.tracing import span, trace_report
+from config.config import TOOL_TIMEOUT, TOOL_MAX_WORKERS, INSTALL_TIMEOUT, DEBUG_TIMEOUT
 import asyncio
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-from prompt_toolkit.completion import WordCompleter
-from prompt_toolkit.formatted_text import HTML
+from typing import Any, Dict, List, Optional
+
+# Development agencies created from the console, by name; shared by the agency tools
+development_agencies: Dict[str, Any] = {}
+
+
+def close_development_agencies():
+    # Each agency's verifier holds a process pool that outlives the console otherwise
+    for agency in development_agencies.values():
+        agency.close()
+    development_agencies.clear()
 
 # Tools
 
@@ -37,7 +47,10 @@ class CreateAgencyTool(BaseTool):
         verifier = VerifierAgent()
         developers = [ExpertDeveloperAgent() for _ in range(self.num_developers)]
         agency = DevelopmentAgency(verifier, developers)
-        self.development_agencies[self.agency_name] = agency
+        replaced = development_agencies.get(self.agency_name)
+        if replaced is not None:
+            replaced.close()
+        development_agencies[self.agency_name] = agency
         return f"Agency '{self.agency_name}' created with {self.num_developers} developers."
 
 class AssignPlanToAgencyTool(BaseTool):
@@ -55,7 +68,7 @@ class AssignPlanToAgencyTool(BaseTool):
     plan: dict = Field(..., description="The development plan to assign to the agency in dictionary format.")
 
     def run(self):
-        agency = self.development_agencies.get(self.agency_name)
+        agency = development_agencies.get(self.agency_name)
         if agency:
             agency.receive_plan(self.plan)
             return f"Plan assigned to agency '{self.agency_name}'."
@@ -80,7 +93,27 @@ class ModifyMainPyTool(BaseTool):
     def validate_code(cls, v):
         # Ensure the code does not contain placeholders and is properly formatted
         if "placeholder" in v:
-            raise ValueError("Code contains placeholders. Please provide complete and functional code"
+            raise ValueError("Code contains placeholders. Please provide complete and functional code.")
+        if not v.strip():
+            raise ValueError("Code to add cannot be empty.")
+        return v
+
+    def run(self):
+        try:
+            # Check if 'main.py' exists
+            if not os.path.exists("main.py"):
+                return "Error: 'main.py' does not exist."
+
+            # Append the validated code to 'main.py'
+            with open("main.py", "a") as f:
+                f.write(f"\n{self.code_to_add}")
+
+            return "Code successfully added to 'main.py'."
+
+        except Exception as e:
+            return f"Error while modifying 'main.py': {e}"
+
+
 class ImplementCodeTool(BaseTool):
     """
     Tool to implement and verify code from a specified agency. This tool collects the code, verifies its integrity,
@@ -95,7 +128,7 @@ class ImplementCodeTool(BaseTool):
     agency_name: str = Field(..., description="The name of the agency to implement code from.")
 
     def run(self):
-        agency = self.development_agencies.get(self.agency_name)
+        agency = development_agencies.get(self.agency_name)
         if not agency:
             return f"Error: Agency '{self.agency_name}' not found."
 
@@ -108,33 +141,17 @@ class ImplementCodeTool(BaseTool):
             if not verified:
                 return f"Code verification failed for '{self.agency_name}'."
 
-            # Write the verified code to the appropriate files
+            # Write the verified code all-or-nothing, skipping files already up to date
+            transaction = FileTransaction()
             for file in code_submission.files:
-                with open(file.file_name, 'w') as f:
-                    f.write(file.code)
-
-            return f"Code from '{self.agency_name}' successfully implemented."
-
-        except Exception as e:
-            return f"Error during code implementation for agency '{self.agency_name}': {e}'nal code'.")
-        if not v.strip():
-            raise ValueError("Code to add cannot be empty.")
-        return v
-
-    def run(self):
-        try:
-            # Check if 'main.py' exists
-            if not os.path.exists("main.py"):
-                return "Error: 'main.py' does not exist."
-
-            # Append the validated code to 'main.py'
-            with open("main.py", "a") as f:
-                f.write(f"\n{self.code_to_add}")
+                transaction.add(file.file_name, file.code)
+            result = transaction.commit()
 
-            return "Code successfully added to 'main.py'."
+            return (f"Code from '{self.agency_name}' successfully implemented "
+                    f"({len(result['written'])} written, {len(result['unchanged'])} unchanged).")
 
         except Exception as e:
-            return f"Error while modifying 'main.py': {e}"
+            return f"Error during code implementation for agency '{self.agency_name}': {e}"
 
 
 class HandleTerminalCommandTool(BaseTool):
@@ -164,7 +181,7 @@ class HandleTerminalCommandTool(BaseTool):
 
         elif self.command == "/list agencies/":
             # List all created agencies
-            agencies = ", ".join(self.development_agencies.keys())
+            agencies = ", ".join(development_agencies.keys())
             return f"Agencies created: {agencies}"
 
         else:
@@ -182,39 +199,52 @@ class EncodeImageTool(BaseTool):
             return None
 
 class ValidateImageURLTool(BaseTool):
+    """
+    Tool to check that a URL points at an image with a HEAD request, falling back
+    to sniffing the first bytes through a Range request. Verdicts are cached per URL.
+
+    Returns:
+        bool | str: True for an image, otherwise the reason it is not one.
+    """
     url: str = Field(..., description="URL of the image to validate.")
     
-    def run(self):
+    async def run(self):
+        from utils.image_probe import get_image_validator
         try:
-            response = requests.get(
-                self.url, 
-                stream=True, 
-                timeout=5,
-                headers={'User-Agent': 'Mozilla/5.0'}
-            )
-            response.raise_for_status()
+            result = await get_image_validator().validate(self.url)
+            return True if result["valid"] else result["reason"]
+        except Exception as e:
+            return f"Unexpected error: {e}"
 
-            content_type = response.headers.get('Content-Type', '').lower()
-            if content_type.startswith(('image/', 'application/octet-stream')):
-                return True
+class ValidateImageURLsTool(BaseTool):
+    """
+    Tool to validate many image URLs concurrently through the pooled client.
 
-            image = Image.open(BytesIO(response.content))
-            image.verify()
-            return True
+    Returns:
+        dict: Verdict per URL with valid, format, reason and the probe method used.
+    """
+    urls: List[str] = Field(..., description="URLs of the images to validate.")
 
-        except requests.exceptions.RequestException as e:
-            return f"Network error: {e}"
-        except Image.UnidentifiedImageError:
-            return "The URL doesn't point to a valid image."
+    async def run(self):
+        from utils.image_probe import validate_images
+        try:
+            return await validate_images(self.urls)
         except Exception as e:
             return f"Unexpected error: {e}"
 
 class SearchTool(BaseTool):
+    """
+    Tool to search the web through every configured SearxNG instance and DuckDuckGo at once.
+
+    Returns:
+        list: Merged results deduplicated by URL, each with title, url, content and engines.
+    """
     query: str = Field(..., description="Search query.")
     
     async def run(self):
-        results = await AsyncDDGS(proxy=None).atext(self.query, max_results=100)
-        return results
+        from utils.search_fanout import get_search_backend
+        results = await get_search_backend().search(self.query)
+        return results["results"]
 
 class WriteFileTool(BaseTool):
     filepath: str = Field(..., description="Path to the file.")
@@ -222,8 +252,7 @@ class WriteFileTool(BaseTool):
 
     def run(self):
         try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                f.write(self.content)
+            write_file(self.filepath, self.content)
             return True
         except IOError as e:
             return f"Error writing to {self.filepath}: {e}"
@@ -262,55 +291,89 @@ class CheckDirectoryTool(BaseTool):
             return f"Directory {self.directory} does not exist."
 
 class InstallDependenciesTool(BaseTool):
+    """
+    Tool to install a requirements file with pip without blocking the agent.
+
+    pip output is streamed to the console as it runs. Requirements that were
+    already installed for this interpreter (same content hash) are skipped.
+
+    Returns:
+        str: Result message with pip's exit code and the tail of its output.
+    """
     requirements_file: str = Field(..., description="Path to the requirements.txt file.")
 
-    def run(self):
+    async def run(self):
         try:
-            os.system(f"pip install -r {self.requirements_file}")
-            return f"Dependencies installed from {self.requirements_file}."
+            result = await install_requirements(self.requirements_file, timeout=INSTALL_TIMEOUT)
+            if result is None:
+                return f"Dependencies from {self.requirements_file} are already installed."
+            if result.ok:
+                return f"Dependencies installed from {self.requirements_file}."
+            return f"Error installing dependencies: {result.summary()}\n{result.tail()}"
         except Exception as e:
             return f"Error installing dependencies: {e}"
 
 class EditFileTool(BaseTool):
+    """
+    Tool to edit a file in place with one streaming pass over it.
+
+    Accepts either a unified diff (`patch`), a list of anchored edits (`edits`,
+    each a dict with `start_marker`, `content` and optional `end_marker`), or a
+    single anchored edit through `start_marker`/`end_marker`/`content`. Every hunk
+    and marker is validated before the file is replaced, so a failed edit leaves
+    the file untouched.
+
+    Returns:
+        str: Result message indicating whether the file was edited.
+    """
     filepath: str = Field(..., description="Path to the file.")
-    content: str = Field(..., description="New content to replace in the file.")
-    start_marker: str = Field(..., description="Marker where the edit starts.")
-    end_marker: str = Field(..., description="Marker where the edit ends.", default=None)
+    content: Optional[str] = Field(None, description="New content to replace in the file.")
+    start_marker: Optional[str] = Field(None, description="Marker where the edit starts.")
+    end_marker: Optional[str] = Field(description="Marker where the edit ends.", default=None)
+    patch: Optional[str] = Field(None, description="Unified diff to apply to the file.")
+    edits: Optional[List[Dict[str, str]]] = Field(None, description="Anchored edits: start_marker, content, end_marker.")
 
     def run(self):
         try:
-            with open(self.filepath, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
-
-            start_idx = None
-            end_idx = None
-            for idx, line in enumerate(lines):
-                if self.start_marker in line:
-                    start_idx = idx
-                if self.end_marker and self.end_marker in line:
-                    end_idx = idx
-
-            if start_idx is not None:
-                if end_idx is not None:
-                    lines = lines[:start_idx + 1] + [self.content + '\n'] + lines[end_idx:]
-                else:
-                    lines[start_idx] = self.content + '\n'
-                with open(self.filepath, 'w', encoding='utf-8') as file:
-                    file.writelines(lines)
-                return f"File {self.filepath} edited successfully."
+            if self.patch:
+                patch_file(self.filepath, hunks=parse_unified_diff(self.patch))
             else:
-                return f"Markers not found in {self.filepath}."
+                edits = [AnchoredEdit(e['start_marker'], e.get('content', ''), e.get('end_marker'))
+                         for e in (self.edits or [])]
+                if self.start_marker:
+                    edits.append(AnchoredEdit(self.start_marker, self.content or '', self.end_marker))
+                patch_file(self.filepath, edits=edits)
+            return f"File {self.filepath} edited successfully."
+        except PatchError as e:
+            return f"Could not edit {self.filepath}: {e}"
         except Exception as e:
             return f"Error editing {self.filepath}: {e}"
 
 class DebugTool(BaseTool):
+    """
+    Tool to run a file and report how it ended.
+
+    The script runs directly (not under pdb, which exits 0 after a post-mortem
+    even when the script failed), so the exit code is the script's own; on an
+    uncaught exception the last traceback line is reported as the error.
+
+    Returns:
+        str: Result message with the exit code, the error if any and the tail of the output.
+    """
     filepath: str = Field(..., description="Path to the file to debug.")
 
-    def run(self):
+    async def run(self):
         try:
-            # Replace this with actual debugging logic
-            os.system(f"python -m pdb {self.filepath}")
-            return f"Debugging initiated for {self.filepath}."
+            path = os.path.abspath(self.filepath)
+            result = await get_manager().run(
+                [sys.executable, "-X", "faulthandler", path],
+                timeout=DEBUG_TIMEOUT,
+                cwd=os.path.dirname(path),
+            )
+            error = ""
+            if not result.ok and not result.timed_out and result.stderr:
+                error = f"\nError: {result.stderr[-1]}"
+            return f"Debug run of {self.filepath}: {result.summary()}{error}\n{result.tail()}"
         except Exception as e:
             return f"Error debugging {self.filepath}: {e}"
 
@@ -324,6 +387,14 @@ class CheckCodeAlignmentTool(BaseTool):
         except Exception as e:
             return f"Error checking code alignment: {e}"
 
+senior_developer_tools = [
+    CreateAgencyTool, AssignPlanToAgencyTool, ImplementCodeTool, HandleTerminalCommandTool,
+    EncodeImageTool, ValidateImageURLTool, ValidateImageURLsTool, SearchTool,
+    WriteFileTool, ReadFileTool, InitializeProjectTool,
+    CheckDirectoryTool, InstallDependenciesTool,
+    EditFileTool, DebugTool, CheckCodeAlignmentTool
+]
+
 # Senior Developer Agent
 class SeniorDeveloperAgent(Agent):
     def __init__(self):
@@ -332,34 +403,79 @@ class SeniorDeveloperAgent(Agent):
             description="I oversee the development process, guide developer agents, and ensure that the code adheres to the plan.",
             model="groq/llama-3.1-70b-versatile",
             instructions="",
-            tools=[
-                EncodeImageTool, ValidateImageURLTool, SearchTool,
-                WriteFileTool, ReadFileTool, InitializeProjectTool,
-                CheckDirectoryTool, InstallDependenciesTool,
-                EditFileTool, DebugTool, CheckCodeAlignmentTool
-            ],
+            tools=senior_developer_tools,
             temperature=0.5,
             max_prompt_tokens=25000
         )
+        # Blocking tools run in a thread pool so the console stays responsive;
+        # pip and debug runs enforce their own subprocess timeouts, and implementing
+        # code runs a whole plan
+        self.tool_runtime = ToolRuntime(
+            senior_developer_tools,
+            max_workers=TOOL_MAX_WORKERS,
+            timeout=TOOL_TIMEOUT,
+            timeouts={"InstallDependenciesTool": None, "DebugTool": None, "ImplementCodeTool": None}
+        )
+
+    async def run_tool(self, tool_name, timeout=None, **kwargs):
+        return await self.tool_runtime.run(tool_name, timeout=timeout, **kwargs)
+
+    async def run_tools(self, calls):
+        return await self.tool_runtime.run_many(calls)
 
 # Set up LiteLLM client
 
-# Initialize your agents
-senior_developer = SeniorDeveloperAgent()
+# Agents and the prompt session are created on first use so importing this
+# module (or typing `exit`) does not pay for agent construction or prompt_toolkit
+senior_developer = None
+
+def get_senior_developer():
+    global senior_developer
+    if senior_developer is None:
+        senior_developer = SeniorDeveloperAgent()
+    return senior_developer
+
+# Agents used by the streaming console commands, created on first use
+console_agents = {}
+
+def get_console_agent(name):
+    if name not in console_agents:
+        if name == "browser":
+            from agent.browsing_agent import BrowsingAgent
+            console_agents[name] = BrowsingAgent()
+        elif name == "planner":
+            from agent.planner_agent import PlannerAgent
+            console_agents[name] = PlannerAgent()
+        elif name == "suggester":
+            from agent.suggester_agent import SuggesterAgent
+            console_agents[name] = SuggesterAgent()
+    return console_agents[name]
 
 # 
 # Command completion and history
-commands = WordCompleter([
-    '/add', '/edit', '/new', '/search', '/image', '/clear',
-    '/reset', '/diff', '/history', '/save', '/load', '/undo',
-    '/init', '/checkdir', '/install', '/edit', '/debug', '/check',
-    'exit'
-], ignore_case=True)
-command_history = FileHistory('.aiconsole_history.txt')
-session = PromptSession(history=command_history)
+session = None
+commands = None
+
+def get_prompt_session():
+    global session, commands
+    if session is None:
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.completion import WordCompleter
+        from prompt_toolkit.history import FileHistory
+        commands = WordCompleter([
+            '/add', '/edit', '/new', '/search', '/image', '/clear',
+            '/reset', '/diff', '/history', '/save', '/load', '/undo',
+            '/init', '/checkdir', '/install', '/edit', '/debug', '/check',
+            '/ask', '/plan', 'exit'
+        ], ignore_case=True)
+        command_history = FileHistory('.aiconsole_history.txt')
+        session = PromptSession(history=command_history)
+    return session
 
 async def get_input_async(message):
-    result = await session.prompt_async(HTML(f"<ansired>{message}</ansired> "),
+    from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+    from prompt_toolkit.formatted_text import HTML
+    result = await get_prompt_session().prompt_async(HTML(f"<ansired>{message}</ansired> "),
         auto_suggest=AutoSuggestFromHistory(),
         completer=commands,
         refresh_interval=0.5)
@@ -369,70 +485,111 @@ async def handle_commands():
     while True:
         command = await get_input_async("Enter command: ")
 
-        if command.startswith("/add "):
-            filepaths = command.split("/add ", 1)[1].strip().split()
-            for path in filepaths:
-                content = await senior_developer.run_tool("ReadFileTool", filepath=path)
-                await senior_developer.run_tool("WriteFileTool", filepath=path, content=content)
+        if command.startswith("/trace"):
+            # Slowest spans of the previous command, e.g. `/trace 20`
+            arg = command.split("/trace", 1)[1].strip()
+            print(trace_report(int(arg) if arg.isdigit() else 10))
             continue
 
-        elif command.startswith("/edit "):
-            filepath = command.split("/edit ", 1)[1].strip()
-            start_marker = await get_input_async(f"Enter the start marker for editing {filepath}: ")
-            end_marker = await get_input_async(f"Enter the end marker (optional) for editing {filepath}: ")
-            content = await get_input_async(f"Enter the new content for {filepath}: ")
-            result = await senior_developer.run_tool("EditFileTool", filepath=filepath, content=content, start_marker=start_marker, end_marker=end_marker)
-            print(result)
-            continue
-
-        elif command.startswith("/new "):
-            filepath = command.split("/new ", 1)[1].strip()
-            await senior_developer.run_tool("WriteFileTool", filepath=filepath, content="")
-            continue
+        # Each command is one trace; LLM calls, HTTP fetches and tool runs nest under it
+        with span("command", command=command):
+            if command.startswith("/add "):
+                filepaths = command.split("/add ", 1)[1].strip().split()
+                # Independent files are read and written concurrently
+                contents = await get_senior_developer().run_tools([("ReadFileTool", {"filepath": path}) for path in filepaths])
+                await get_senior_developer().run_tools([
+                    ("WriteFileTool", {"filepath": path, "content": content})
+                    for path, content in zip(filepaths, contents)
+                ])
+                continue
+
+            elif command.startswith("/edit "):
+                filepath = command.split("/edit ", 1)[1].strip()
+                start_marker = await get_input_async(f"Enter the start marker for editing {filepath}: ")
+                end_marker = await get_input_async(f"Enter the end marker (optional) for editing {filepath}: ")
+                content = await get_input_async(f"Enter the new content for {filepath}: ")
+                result = await get_senior_developer().run_tool("EditFileTool", filepath=filepath, content=content, start_marker=start_marker, end_marker=end_marker)
+                print(result)
+                continue
+
+            elif command.startswith("/new "):
+                filepath = command.split("/new ", 1)[1].strip()
+                await get_senior_developer().run_tool("WriteFileTool", filepath=filepath, content="")
+                continue
+
+            elif command.startswith("/search "):
+                query = command.split("/search ", 1)[1].strip()
+                search_results = await get_senior_developer().run_tool("SearchTool", query=query)
+                print(f"Search results: {search_results}")
+                continue
+
+            elif command.startswith("/ask "):
+                query = command.split("/ask ", 1)[1].strip()
+                browser = get_console_agent("browser")
+                prompt, dropped_links = await browser.perplexica_prompt(query, [])
+                await print_stream(browser.answer_stream(prompt), label="Browser")
+                for link in dropped_links:
+                    print(f"Could not load {link['url']}: {link['reason']}")
+                continue
+
+            elif command.startswith("/plan "):
+                # Plan -> suggest chain with both answers streamed as they are generated
+                idea = command.split("/plan ", 1)[1].strip()
+                planner = get_console_agent("planner")
+                draft = await print_stream(planner.draft_plan_stream(idea), label="Planner")
+                try:
+                    plan = json.loads(draft["text"])
+                except ValueError:
+                    print("Planner did not return a JSON plan.")
+                    continue
+                review = await print_stream(get_console_agent("suggester").review_plan_stream(plan), label="Suggester")
+                try:
+                    planner.plan = planner.incorporate_suggestions(dict(plan), json.loads(review["text"]))
+                except (ValueError, KeyError, TypeError):
+                    planner.plan = plan
+                    print("Suggester did not return usable suggestions; keeping the draft plan.")
+                continue
+
+            elif command.startswith("/init "):
+                project_name, directory = command.split("/init ", 1)[1].strip().split()
+                result = await get_senior_developer().run_tool("InitializeProjectTool", project_name=project_name, directory=directory)
+                print(result)
+                continue
+
+            elif command.startswith("/checkdir "):
+                directory = command.split("/checkdir ", 1)[1].strip()
+                result = await get_senior_developer().run_tool("CheckDirectoryTool", directory=directory)
+                print(result)
+                continue
+
+            elif command.startswith("/install "):
+                requirements_file = command.split("/install ", 1)[1].strip()
+                result = await get_senior_developer().run_tool("InstallDependenciesTool", requirements_file=requirements_file)
+                print(result)
+                continue
+
+            elif command.startswith("/debug "):
+                filepath = command.split("/debug ", 1)[1].strip()
+                result = await get_senior_developer().run_tool("DebugTool", filepath=filepath)
+                print(result)
+                continue
+
+            elif command.startswith("/check "):
+                directory = command.split("/check ", 1)[1].strip()
+                result = await get_senior_developer().run_tool("CheckCodeAlignmentTool", directory=directory)
+                print(result)
+                continue
+
+            elif command == "exit":
+                print("Exiting...")
+                if senior_developer is not None:
+                    senior_developer.tool_runtime.shutdown()
+                close_development_agencies()
+                break
 
-        elif command.startswith("/search "):
-            query = command.split("/search ", 1)[1].strip()
-            search_results = await senior_developer.run_tool("SearchTool", query=query)
-            print(f"Search results: {search_results}")
-            continue
-
-        elif command.startswith("/init "):
-            project_name, directory = command.split("/init ", 1)[1].strip().split()
-            result = await senior_developer.run_tool("InitializeProjectTool", project_name=project_name, directory=directory)
-            print(result)
-            continue
-
-        elif command.startswith("/checkdir "):
-            directory = command.split("/checkdir ", 1)[1].strip()
-            result = await senior_developer.run_tool("CheckDirectoryTool", directory=directory)
-            print(result)
-            continue
-
-        elif command.startswith("/install "):
-            requirements_file = command.split("/install ", 1)[1].strip()
-            result = await senior_developer.run_tool("InstallDependenciesTool", requirements_file=requirements_file)
-            print(result)
-            continue
-
-        elif command.startswith("/debug "):
-            filepath = command.split("/debug ", 1)[1].strip()
-            result = await senior_developer.run_tool("DebugTool", filepath=filepath)
-            print(result)
-            continue
-
-        elif command.startswith("/check "):
-            directory = command.split("/check ", 1)[1].strip()
-            result = await senior_developer.run_tool("CheckCodeAlignmentTool", directory=directory)
-            print(result)
-            continue
-
-        elif command == "exit":
-            print("Exiting...")
-            break
-
-        else:
-            response = await senior_developer.run_tool("SomeDefaultTool", command=command)
-            print(f"Assistant: {response}")
+            else:
+                response = await get_senior_developer().run_tool("SomeDefaultTool", command=command)
+                print(f"Assistant: {response}")
 
 # Run the main loop
 async def main():
@@ -1,10 +1,12 @@
 # agents/suggester_agent.py
 from agency_swarm.agents import Agent
-from litellm import completion
+from utils.llm_gateway import astream
+from utils.token_stream import collect
+from utils.tracing import traced
 import json
 
 
-review_prompt = f"""
+review_prompt = """
 
 You are the **Suggester Agent** within a collaborative team of AI agents focused on converting user-provided ideas into detailed and optimized project plans. Your primary responsibility is to review and enhance the project plans created by the Planning Agent, offering improvements and ensuring that the plan is as effective and efficient as possible. You may also collaborate with the **Browsing Agent** to gather additional information as needed.
 
@@ -35,7 +37,7 @@ You are the **Suggester Agent** within a collaborative team of AI agents focused
 (Context: "Your role as the Suggester Agent is pivotal in fine-tuning the project plan. By providing insightful recommendations and working closely with the Planning and Browsing Agents, you help ensure the project's success through thoughtful and strategic planning.")
 
 
-        Review the following project plan and suggest improvements: {json.dumps(plan)}"""
+        Review the following project plan and suggest improvements: {plan}"""
         
 class SuggesterAgent(Agent):
     def __init__(self, **kwargs):
@@ -46,17 +48,21 @@ class SuggesterAgent(Agent):
             **kwargs
         )
 
-    async def review_plan(self, plan):
-        review_response = await completion(
+    def review_plan_stream(self, plan):
+        # Tokens of the review as the model produces them
+        return astream(
             model="groq/llama-3.1-70b-versatile",
-            messages=[{"role": "Planner_agent", "content": review_prompt}]
+            messages=[{"role": "user", "content": review_prompt.format(plan=json.dumps(plan))}]
         )
 
-        # Assuming the response from the completion function is a valid JSON string
-        suggestions = json.loads(review_response['choices'][0]['message']['content'])
+    @traced()
+    async def review_plan(self, plan):
+        # Assuming the completion is a valid JSON string
+        suggestions = json.loads(await collect(self.review_plan_stream(plan)))
 
         return json.dumps({"suggestions": suggestions})
 
+    @traced()
     async def get_additional_info(self, query):
         # Communicate with BrowsingAgent to get additional information
         browsing_response = await self.agency.get_completion(
@@ -65,6 +71,7 @@ class SuggesterAgent(Agent):
         )
         return browsing_response
 
+    @traced()
     async def run(self, input_data):
         input_json = json.loads(input_data)
         action = input_json.get('action')
@@ -0,0 +1,332 @@
+# benchmarks/agent_bench.py
+#
+# End-to-end agent benchmark that never leaves the machine: litellm calls are
+# answered from benchmarks/fixtures/llm.json and SearxNG / page fetches from
+# benchmarks/fixtures/http.json (see benchmarks/replay.py), each after an injected,
+# seeded latency. Drives BrowsingAgent.perplexica_agent (search and link paths),
+# PlannerAgent.run and DevelopmentAgency.collect_code and reports p50/p95 latency,
+# throughput and peak traced memory per scenario.
+#
+# Caches live in a throwaway directory. Unless --warm is given, every search and
+# page cache lookup misses (results are still stored), so each run does the same
+# work however many others are in flight and runs on different commits compare.
+# The per-host rate limit is lifted, since replayed hosts cannot be overloaded.
+# With --baseline it doubles as a regression check like startup_bench.py: the
+# exit code is 1 when a scenario's p50 or p95 is more than --tolerance above it.
+#
+# Usage:
+#     python -m benchmarks.agent_bench [--scenarios perplexica_search,planner_run] [--iterations 20]
+#                                      [--concurrency 4] [--llm-latency 0.3] [--http-latency 0.05]
+#                                      [--json results.json] [--baseline agents.json] [--save]
+#     python -m benchmarks.agent_bench --record [--live-url FIXTURE_PREFIX=LIVE_PREFIX ...]
+#
+# The HTTP fixtures are hand-written against placeholder hosts (searxng.bench.local,
+# *.bench.example). --record refreshes the LLM fixtures from Groq, and an HTTP
+# fixture only when --live-url maps its URL to a real endpoint. The SearxNG
+# placeholder maps to SEARXNG_INSTANCE by default; unmapped hosts keep replaying
+# their stored entries.
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.replay import Latency, ReplayLLM, ReplaySession, load_fixture, save_fixture
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEARXNG_URL = "http://searxng.bench.local"
+SCENARIOS = "perplexica_search,perplexica_links,planner_run,collect_code"
+
+SEARCH_QUERY = "How do I find what slows down an asyncio application?"
+LINKS_QUERY = ("Summarize https://docs.bench.example/asyncio-dev https://blog.bench.example/profiling-asyncio "
+               "https://news.bench.example/python-performance")
+PLAN_IDEA = "A todo app for small teams with realtime sync and offline mode"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    # Nearest rank, so p95 of 20 runs is the 19th slowest rather than an interpolation
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+class LocalAgency:
+    """In-process stand-in for the agency_swarm Agency the planner talks through."""
+
+    def __init__(self, agents: Dict[str, Any]):
+        self.agents = agents
+
+    def get_agent(self, name: str) -> Any:
+        return self.agents[name]
+
+    async def get_completion(self, message: str, recipient_agent: Any = None) -> str:
+        if recipient_agent is self.agents["BrowsingAgent"]:
+            data = json.loads(message)
+            if "query" not in data:
+                # Research requests carry an action instead of a query
+                action = data.pop("action", "research")
+                message = json.dumps({"query": f"{action}: {json.dumps(data)}", "chat_history": []})
+        return await recipient_agent.run(message)
+
+
+class Bench:
+    """Builds the agents once, wired to the replay stand-ins."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.llm = ReplayLLM(
+            load_fixture("llm.json"),
+            Latency(args.llm_latency, args.jitter, args.seed),
+            token_latency=args.token_latency,
+            live=self.live_litellm() if args.record else None,
+        )
+        self.llm.install()
+        self.http_entries = load_fixture("http.json")
+        self.session = ReplaySession(
+            self.http_entries, Latency(args.http_latency, args.jitter, args.seed + 1),
+            chunk_latency=args.chunk_latency, live_urls=self.live_urls() if args.record else None
+        )
+
+        from agent.browsing_agent import BrowsingAgent
+        from agent.planner_agent import PlannerAgent
+        from agent.suggester_agent import SuggesterAgent
+        from utils import llm_gateway
+        from utils.search_fanout import build_fanout
+
+        if not args.warm:
+            # Every completion reaches the replayed provider
+            llm_gateway._gateway = llm_gateway.CompletionGateway(None)
+
+        self.browser = BrowsingAgent()
+        self.browser.http.rate_per_host = self.browser.http.burst_per_host = 1e9
+        self.browser.http._session = self.session
+        self.browser.search_backend = build_fanout([SEARXNG_URL], self.browser.http, duckduckgo=False)
+        if not args.warm:
+            # Lookups miss instead of the caches being cleared, which would race with runs in flight
+            self.browser.search_cache.get = lambda key: None
+            self.browser.page_cache.lookup = lambda url: None
+
+        self.planner = PlannerAgent()
+        self.planner.agency = LocalAgency({"SuggesterAgent": SuggesterAgent(), "BrowsingAgent": self.browser})
+        self.plan = load_fixture("plan.json")
+
+    def live_urls(self) -> Dict[str, str]:
+        from config.config import SEARXNG_INSTANCE
+        live_urls = {SEARXNG_URL: SEARXNG_INSTANCE.rstrip("/")}
+        for mapping in self.args.live_url or []:
+            prefix, _, live_prefix = mapping.partition("=")
+            if not live_prefix:
+                raise SystemExit(f"Expected --live-url FIXTURE_PREFIX=LIVE_PREFIX, got {mapping!r}")
+            live_urls[prefix] = live_prefix
+        return live_urls
+
+    @staticmethod
+    def live_litellm():
+        # litellm is installed when recording, but the replay stand-in takes its module name
+        import litellm
+        return litellm
+
+    async def start_recording(self):
+        import aiohttp
+        self.session.live = aiohttp.ClientSession()
+
+    async def stop_recording(self):
+        await self.session.live.close()
+        save_fixture("llm.json", self.llm.rules)
+        save_fixture("http.json", self.http_entries)
+        print(f"Recorded {self.llm.recorded} LLM responses and {self.session.recorded} HTTP responses")
+
+    def scenarios(self) -> Dict[str, Callable[[], Awaitable[Any]]]:
+        return {
+            "perplexica_search": lambda: self.browser.perplexica_agent(SEARCH_QUERY, []),
+            "perplexica_links": lambda: self.browser.perplexica_agent(LINKS_QUERY, []),
+            "planner_run": lambda: self.planner.run(PLAN_IDEA),
+            "collect_code": self.collect_code,
+        }
+
+    async def collect_code(self):
+        from dev_agency_template.development_agency import DevelopmentAgency, VerifierAgent
+        agency = DevelopmentAgency(VerifierAgent(), [self.developer(i) for i in range(self.args.developers)])
+        agency.receive_plan(self.plan)
+        try:
+            # collect_code runs its own event loop, so it gets a thread like any blocking caller
+            submission = await asyncio.to_thread(agency.collect_code)
+        finally:
+            agency.close()
+        if len(submission.files) != len(self.plan["tasks"]):
+            raise RuntimeError(f"collect_code returned {len(submission.files)} of {len(self.plan['tasks'])} files")
+        return submission
+
+    def developer(self, index: int):
+        from dev_agency_template.development_agency import ExpertDeveloperAgent
+        latency = Latency(self.args.llm_latency, self.args.jitter, self.args.seed + 2 + index)
+
+        class ReplayDeveloper(ExpertDeveloperAgent):
+            # work_on_task stands for one LLM round trip per task
+            def work_on_task(self, task):
+                latency.wait_blocking()
+                return super().work_on_task(task)
+
+        return ReplayDeveloper()
+
+    async def run(self, name: str, func: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        args = self.args
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies: List[float] = []
+        errors: List[str] = []
+
+        async def once(record: bool):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await func()
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                    return
+                if record:
+                    latencies.append(time.perf_counter() - start)
+
+        for _ in range(args.warmup):
+            await once(record=False)
+        llm_calls, http_requests = self.llm.calls, self.session.requests
+        start = time.perf_counter()
+        await asyncio.gather(*[once(record=True) for _ in range(args.iterations)])
+        wall = time.perf_counter() - start
+        llm_calls, http_requests = self.llm.calls - llm_calls, self.session.requests - http_requests
+
+        # Memory is traced in a separate pass so tracemalloc's overhead stays out of the timings
+        tracemalloc.start()
+        await asyncio.gather(*[once(record=False) for _ in range(args.concurrency)])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if not latencies:
+            return {"errors": len(errors), "first_error": errors[0] if errors else None}
+        return {
+            "iterations": len(latencies),
+            "concurrency": args.concurrency,
+            "p50_ms": percentile(latencies, 0.5) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "mean_ms": statistics.mean(latencies) * 1000,
+            "throughput_per_s": len(latencies) / wall,
+            "peak_kb": peak / 1024,
+            "llm_calls_per_run": llm_calls / args.iterations,
+            "http_requests_per_run": http_requests / args.iterations,
+            "errors": len(errors),
+            "first_error": errors[0] if errors else None,
+        }
+
+
+async def run_all(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    bench = Bench(args)
+    if args.record:
+        await bench.start_recording()
+    scenarios = bench.scenarios()
+    results = {}
+    try:
+        for name in (s.strip() for s in args.scenarios.split(",") if s.strip()):
+            if name not in scenarios:
+                raise SystemExit(f"Unknown scenario {name}; choose from {SCENARIOS}")
+            results[name] = await bench.run(name, scenarios[name])
+            report(name, results[name])
+    finally:
+        if args.record:
+            await bench.stop_recording()
+        await bench.browser.close()
+    return results
+
+
+def report(name: str, result: Dict[str, Any]):
+    if "p50_ms" not in result:
+        print(f"{name}: every run failed ({result['first_error']})")
+        return
+    print(
+        f"{name}: p50 {result['p50_ms']:.1f} ms  p95 {result['p95_ms']:.1f} ms  "
+        f"{result['throughput_per_s']:.2f} runs/s  peak {result['peak_kb']:.0f} KB  "
+        f"({result['iterations']} runs x{result['concurrency']}, "
+        f"{result['llm_calls_per_run']:.1f} LLM calls, {result['http_requests_per_run']:.1f} HTTP requests per run)"
+    )
+    if result["errors"]:
+        print(f"    {result['errors']} failed runs, first: {result['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agents offline against recorded fixtures.")
+    parser.add_argument("--scenarios", default=SCENARIOS, help="Comma separated scenarios to run")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="Runs in flight at once")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds per LLM call (or to first token)")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Seconds between streamed tokens")
+    parser.add_argument("--http-latency", type=float, default=0.05, help="Seconds to response headers")
+    parser.add_argument("--chunk-latency", type=float, default=0.0, help="Seconds between body chunks")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Extra random latency as a fraction of the base")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--developers", type=int, default=4, help="Developer agents for collect_code")
+    parser.add_argument("--warm", action="store_true", help="Keep LLM, search and page caches between runs")
+    parser.add_argument("--record", action="store_true", help="Refresh the fixtures from the live services")
+    parser.add_argument("--live-url", action="append", metavar="FIXTURE_PREFIX=LIVE_PREFIX",
+                        help="Record fixture URLs starting with FIXTURE_PREFIX from LIVE_PREFIX instead")
+    parser.add_argument("--json", default=None, help="Write the results to this file")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the baseline")
+    parser.add_argument("--save", action="store_true", help="Write the results to --baseline")
+    args = parser.parse_args()
+
+    # Throwaway caches and in-memory traces; both are read when the repo modules are first imported
+    os.environ["AGENMICROX_CACHE_DIR"] = tempfile.mkdtemp(prefix="agenmicrox-bench-")
+    os.environ["TRACE_FILE"] = ""
+    sys.path.insert(0, os.path.join(ROOT, "dev_agency_template"))
+
+    results = asyncio.run(run_all(args))
+    output = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items()
+                     if key not in ("json", "baseline", "save", "record", "live_url", "tolerance")},
+        "scenarios": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+
+    failures = [name for name, result in results.items() if "p50_ms" not in result]
+    if args.baseline and os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("settings") != output["settings"]:
+            print(f"Note: baseline {baseline.get('commit')} was run with different settings")
+        for name, result in results.items():
+            before = baseline.get("scenarios", {}).get(name, {})
+            for metric in ("p50_ms", "p95_ms"):
+                if metric in before and metric in result and result[metric] > before[metric] * (1 + args.tolerance):
+                    print(f"{name}: regression in {metric}: {result[metric]:.1f} ms "
+                          f"vs {before[metric]:.1f} ms at {baseline.get('commit')}")
+                    failures.append(name)
+
+    if args.save and args.baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/edit_file_bench.py
+#
+# Compares the streaming patch engine in utils/patch_engine.py against the
+# previous EditFileTool approach (readlines, scan every line for both markers,
+# rewrite the whole file) on generated multi-MB files.
+#
+# Usage:
+#     python -m benchmarks.edit_file_bench [--sizes 1,8,32] [--repeat N]
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from utils.patch_engine import AnchoredEdit, parse_unified_diff, patch_file
+
+
+def marker_edit(filepath: str, content: str, start_marker: str, end_marker: str):
+    # The previous EditFileTool.run, kept verbatim as the baseline
+    with open(filepath, 'r', encoding='utf-8') as file:
+        lines = file.readlines()
+
+    start_idx = None
+    end_idx = None
+    for idx, line in enumerate(lines):
+        if start_marker in line:
+            start_idx = idx
+        if end_marker and end_marker in line:
+            end_idx = idx
+
+    if start_idx is not None:
+        if end_idx is not None:
+            lines = lines[:start_idx + 1] + [content + '\n'] + lines[end_idx:]
+        else:
+            lines[start_idx] = content + '\n'
+        with open(filepath, 'w', encoding='utf-8') as file:
+            file.writelines(lines)
+
+
+def make_file(path: str, size_mb: int) -> int:
+    line = "value = compute(previous_value, factor) + offset  # filler line\n"
+    count = size_mb * 1024 * 1024 // len(line)
+    middle = count // 2
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            if i == middle:
+                f.write("# BEGIN GENERATED\n")
+            elif i == middle + 2:
+                f.write("# END GENERATED\n")
+            else:
+                f.write(line)
+    return middle
+
+
+def measure(func: Callable[[], None], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_ms": statistics.median(timings) * 1000, "peak_kb": peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EditFileTool strategies.")
+    parser.add_argument("--sizes", default="1,8,32", help="Comma separated file sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size MB':>8}  {'strategy':<22}{'median ms':>12}{'peak KB':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size_mb in (int(size) for size in args.sizes.split(",")):
+            path = os.path.join(directory, f"file_{size_mb}.py")
+            middle = make_file(path, size_mb)
+            line_no = middle  # 1-based, the filler line just above the markers
+            diff = (
+                f"@@ -{line_no},1 +{line_no},1 @@\n"
+                "-value = compute(previous_value, factor) + offset  # filler line\n"
+                "+value = compute(previous_value, factor) + offset  # filler line\n"
+            )
+
+            strategies = {
+                "markers (readlines)": lambda: marker_edit(path, "generated = True", "# BEGIN GENERATED",
+                                                           "# END GENERATED"),
+                "anchored (streaming)": lambda: patch_file(
+                    path, edits=[AnchoredEdit("# BEGIN GENERATED", "generated = True", "# END GENERATED")]),
+                "unified diff": lambda: patch_file(path, hunks=parse_unified_diff(diff)),
+            }
+            for label, func in strategies.items():
+                result = measure(func, args.repeat)
+                print(f"{size_mb:>8}  {label:<22}{result['median_ms']:>12.1f}{result['peak_kb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/html_extract_bench.py
+#
+# Compares the streaming extractor in utils/html_extract.py against the previous
+# full-document BeautifulSoup(html.parser).get_text path.
+#
+# Usage:
+#     python -m benchmarks.html_extract_bench [pages_dir] [--repeat N]
+#
+# pages_dir is a directory of saved .html pages. Without it a synthetic corpus of
+# small, medium and multi-MB pages is generated.
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from utils.html_extract import extract_text, etree
+
+
+def synthetic_corpus() -> List[Tuple[str, bytes]]:
+    nav = "<nav><ul>" + "".join(f"<li><a href='/{i}'>Link {i}</a></li>" for i in range(200)) + "</ul></nav>"
+    script = "<script>" + "var data = {};" * 2000 + "</script>"
+    paragraph = "<p>Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit, sed do eiusmod tempor.</p>"
+    corpus = []
+    for name, paragraphs in (("small", 50), ("medium", 2000), ("large", 40000)):
+        html = (
+            f"<html><head><title>{name}</title><style>body {{}}</style>{script}</head>"
+            f"<body>{nav}<main><article>{paragraph * paragraphs}</article></main>"
+            f"<footer>{nav}</footer></body></html>"
+        )
+        corpus.append((name, html.encode("utf-8")))
+    return corpus
+
+
+def load_corpus(directory: str) -> List[Tuple[str, bytes]]:
+    return [(path.name, path.read_bytes()) for path in sorted(Path(directory).glob("*.htm*"))]
+
+
+def beautifulsoup_path(html: bytes) -> str:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html.decode("utf-8", errors="replace"), "html.parser")
+    return soup.get_text(separator="\n", strip=True)
+
+
+def streaming_path(backend: str) -> Callable[[bytes], str]:
+    def run(html: bytes) -> str:
+        return extract_text(html, "utf-8", backend=backend)["text"]
+    return run
+
+
+def measure(func: Callable[[bytes], str], html: bytes, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    text = func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_ms": statistics.median(timings) * 1000, "peak_kb": peak / 1024, "chars": len(text)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML text extraction backends.")
+    parser.add_argument("pages_dir", nargs="?", help="Directory of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.pages_dir) if args.pages_dir else synthetic_corpus()
+    paths = {"streaming[html.parser]": streaming_path("html.parser")}
+    if etree is not None:
+        paths["streaming[lxml]"] = streaming_path("lxml")
+    try:
+        import bs4  # noqa: F401
+        paths["beautifulsoup"] = beautifulsoup_path
+    except ImportError:
+        print("beautifulsoup4 not installed, skipping the baseline path")
+
+    print(f"{'page':<24}{'size KB':>10}  {'path':<24}{'median ms':>12}{'peak KB':>12}{'chars':>10}")
+    for name, html in corpus:
+        for label, func in paths.items():
+            result = measure(func, html, args.repeat)
+            print(f"{name[:23]:<24}{len(html) / 1024:>10.1f}  {label:<24}"
+                  f"{result['median_ms']:>12.2f}{result['peak_kb']:>12.1f}{result['chars']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# benchmarks/replay.py
+#
+# Local stand-ins for Groq (through litellm) and for SearxNG / web pages, serving
+# recorded fixtures with injected latency so agent benchmarks run offline and
+# produce numbers that are comparable across commits.
+#
+# LLM fixtures (fixtures/llm.json) are a list of rules; a request is answered by
+# the first rule whose `match` strings all occur in its messages. HTTP fixtures
+# (fixtures/http.json) are answered by the first entry whose `match` string
+# occurs in the URL. Both can be refreshed from the live services with
+# `record=True`, which stores each live answer on the rule it matched. The HTTP
+# fixtures use placeholder hosts, so a request is only recorded when `live_urls`
+# maps its URL to a real endpoint; the rest keep replaying the stored entry.
+
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+import types
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> Any:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fixture(name: str, data: Any):
+    with open(os.path.join(FIXTURES_DIR, name), "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+class Latency:
+    """
+    Injected delay: `base` seconds plus up to `jitter` (a fraction of base) at random.
+
+    Draws come from a seeded generator so two runs with the same seed sleep the same
+    amounts in the same order.
+    """
+
+    def __init__(self, base: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.base = base
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self.lock:
+            return self.base * (1 + self.jitter * self.random.random())
+
+    async def wait(self):
+        delay = self.sample()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait_blocking(self):
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def message_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(message.get("content") or "") for message in messages)
+
+
+class ReplayLLM:
+    """
+    Answers litellm `acompletion` / `completion` calls from recorded rules.
+
+    Streaming requests get the recorded content split into word tokens, the
+    first after `latency`, the rest `token_latency` apart.
+
+    Args:
+        rules (dict): Parsed fixtures/llm.json.
+        latency (Latency): Delay before the response (or the first token).
+        token_latency (float): Seconds between streamed tokens.
+        live (module): Real litellm module to record from, None to replay only.
+    """
+
+    def __init__(self, rules: Dict[str, Any], latency: Latency, token_latency: float = 0.0, live: Any = None):
+        self.rules = rules
+        self.latency = latency
+        self.token_latency = token_latency
+        self.live = live
+        self.calls = 0
+        self.tokens = 0
+        self.recorded = 0
+
+    def match(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        text = message_text(messages)
+        for rule in self.rules["rules"]:
+            if all(part in text for part in rule["match"]):
+                return rule
+        return self.rules["default"]
+
+    def response(self, rule: Dict[str, Any], model: str) -> Dict[str, Any]:
+        usage = dict(rule.get("usage") or {})
+        self.calls += 1
+        self.tokens += usage.get("total_tokens", 0)
+        return {
+            "id": f"replay-{self.calls}",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": rule["content"]},
+                         "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    def record(self, rule: Dict[str, Any], response: Any):
+        data = response.model_dump() if hasattr(response, "model_dump") else dict(response)
+        rule["content"] = data["choices"][0]["message"]["content"]
+        rule["usage"] = {key: value for key, value in (data.get("usage") or {}).items()
+                         if key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+        self.recorded += 1
+
+    @staticmethod
+    def chunk(i: int, word: str) -> Dict[str, Any]:
+        return {"choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+
+    async def stream(self, content: str) -> AsyncIterator[Dict[str, Any]]:
+        for i, word in enumerate(content.split(" ")):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield self.chunk(i, word)
+
+    def stream_blocking(self, content: str) -> Iterator[Dict[str, Any]]:
+        for i, word in enumerate(content.split(" ")):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            yield self.chunk(i, word)
+
+    async def acompletion(self, model: str, messages: List[Dict[str, Any]], stream: bool = False, **kwargs):
+        rule = self.match(messages)
+        if self.live is not None:
+            response = await self.live.acompletion(model=model, messages=messages, **kwargs)
+            self.record(rule, response)
+        else:
+            await self.latency.wait()
+        response = self.response(rule, model)
+        if stream:
+            return self.stream(rule["content"])
+        return response
+
+    def completion(self, model: str, messages: List[Dict[str, Any]], stream: bool = False, **kwargs):
+        rule = self.match(messages)
+        if self.live is not None:
+            self.record(rule, self.live.completion(model=model, messages=messages, **kwargs))
+        else:
+            self.latency.wait_blocking()
+        response = self.response(rule, model)
+        if stream:
+            return self.stream_blocking(rule["content"])
+        return response
+
+    def install(self):
+        """Make `from litellm import acompletion` resolve to this stand-in."""
+        module = types.ModuleType("litellm")
+        module.acompletion = self.acompletion
+        module.completion = self.completion
+        sys.modules["litellm"] = module
+
+
+class ReplayContent:
+    def __init__(self, body: bytes, chunk_latency: float = 0.0):
+        self.body = body
+        self.position = 0
+        self.chunk_latency = chunk_latency
+
+    async def read(self, n: int = -1) -> bytes:
+        end = len(self.body) if n < 0 else self.position + n
+        data = self.body[self.position:end]
+        self.position += len(data)
+        return data
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        while self.position < len(self.body):
+            if self.chunk_latency:
+                await asyncio.sleep(self.chunk_latency)
+            yield await self.read(n)
+
+
+class ReplayResponse:
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, charset: Optional[str] = "utf-8",
+                 chunk_latency: float = 0.0):
+        self.status = status
+        self.headers = headers
+        self.charset = charset
+        self.body = body
+        self.content = ReplayContent(body, chunk_latency)
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self) -> str:
+        return self.body.decode(self.charset or "utf-8", errors="replace")
+
+    async def json(self) -> Any:
+        return json.loads(self.body)
+
+    def release(self):
+        pass
+
+
+class ReplaySession:
+    """
+    Stands in for the aiohttp.ClientSession of an HttpClient.
+
+    Args:
+        entries (list): Parsed fixtures/http.json.
+        latency (Latency): Delay before each response's headers.
+        chunk_latency (float): Seconds between body chunks.
+        live (aiohttp.ClientSession): Real session to record from, None to replay only.
+        live_urls (dict): Fixture URL prefix -> live URL prefix it is recorded from.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], latency: Latency, chunk_latency: float = 0.0,
+                 live: Any = None, live_urls: Optional[Dict[str, str]] = None):
+        self.entries = entries
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.live = live
+        self.live_urls = live_urls or {}
+        self.closed = False
+        self.requests = 0
+        self.recorded = 0
+
+    def match(self, url: str) -> Optional[Dict[str, Any]]:
+        for entry in self.entries:
+            if entry["match"] in url:
+                return entry
+        return None
+
+    @staticmethod
+    def body_of(entry: Dict[str, Any]) -> bytes:
+        if "json" in entry:
+            return json.dumps(entry["json"]).encode("utf-8")
+        return entry.get("body", "").encode("utf-8")
+
+    def live_url(self, url: str) -> Optional[str]:
+        for prefix, live_prefix in self.live_urls.items():
+            if url.startswith(prefix):
+                return live_prefix + url[len(prefix):]
+        return None
+
+    async def record(self, entry: Optional[Dict[str, Any]], method: str, url: str, live_url: str,
+                     **kwargs) -> Dict[str, Any]:
+        # Stored under the fixture URL, so replay keeps matching it
+        async with self.live.request(method, live_url, **kwargs) as response:
+            body = await response.read()
+            content_type = response.headers.get("Content-Type", "")
+            if entry is None:
+                entry = {"match": url}
+                self.entries.append(entry)
+            entry.pop("json", None)
+            entry.pop("body", None)
+            entry["status"] = response.status
+            entry["headers"] = {"Content-Type": content_type}
+            if "json" in content_type:
+                entry["json"] = json.loads(body)
+            else:
+                entry["body"] = body.decode(response.charset or "utf-8", errors="replace")
+        self.recorded += 1
+        return entry
+
+    async def request(self, method: str, url: str, timeout: Any = None, **kwargs) -> ReplayResponse:
+        self.requests += 1
+        entry = self.match(url)
+        live_url = self.live_url(url) if self.live is not None else None
+        if live_url is not None:
+            entry = await self.record(entry, method, url, live_url, **kwargs)
+        else:
+            await self.latency.wait()
+        if entry is None:
+            return ReplayResponse(404, {"Content-Type": "text/plain"}, b"not recorded")
+        return ReplayResponse(
+            entry.get("status", 200), dict(entry.get("headers") or {}), self.body_of(entry),
+            chunk_latency=self.chunk_latency
+        )
+
+    async def close(self):
+        self.closed = True
@@ -0,0 +1,109 @@
+# benchmarks/startup_bench.py
+#
+# Measures what importing the entry points costs, using `python -X importtime`
+# in a fresh interpreter per run, and lists the slowest imports. With --budget-ms
+# or --baseline it doubles as a regression check: the exit code is 1 when the
+# median import time is over budget or more than --tolerance above the baseline.
+#
+# Usage:
+#     python -m benchmarks.startup_bench [--modules main,agent.senior_developer] [--repeat N]
+#                                        [--budget-ms 300] [--baseline startup.json] [--save]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+DEFAULT_MODULES = "main,agent.senior_developer,agent.browsing_agent,agent.planner_agent,agent.suggester_agent"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Cumulative and self microseconds per module from -X importtime output."""
+    cumulative: Dict[str, int] = {}
+    self_time: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, total, name = line[len("import time:"):].split("|", 2)
+        name = name.rstrip()
+        depth = len(name) - len(name.lstrip())
+        if depth <= 1:
+            # Only top-level imports so nested modules are not counted twice
+            cumulative[name.strip()] = int(total)
+        self_time[name.strip()] = int(own)
+    return cumulative, self_time
+
+
+def importtime(statement: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"{statement} failed: {error}")
+    return result.stderr
+
+
+def measure(module: str, startup: Set[str]) -> Tuple[float, Dict[str, int]]:
+    # Modules the bare interpreter already imports (site, encodings, ...) are not the module's cost
+    cumulative, self_time = parse_importtime(importtime(f"import {module}"))
+    total = sum(micros for name, micros in cumulative.items() if name not in startup)
+    return total / 1000, {name: micros for name, micros in self_time.items() if name not in startup}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time of the entry points.")
+    parser.add_argument("--modules", default=DEFAULT_MODULES, help="Comma separated modules to import")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when a module's median exceeds this")
+    parser.add_argument("--baseline", default=None, help="JSON file with median ms per module")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the baseline")
+    parser.add_argument("--save", action="store_true", help="Write the medians to --baseline")
+    args = parser.parse_args()
+
+    baseline: Dict[str, float] = {}
+    if args.baseline and os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    startup = set(parse_importtime(importtime("pass"))[1])
+    medians: Dict[str, float] = {}
+    failures: List[str] = []
+    for module in (m.strip() for m in args.modules.split(",") if m.strip()):
+        try:
+            runs = [measure(module, startup) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(e)
+            failures.append(module)
+            continue
+        median = statistics.median(total for total, _ in runs)
+        medians[module] = median
+        print(f"{module}: median {median:.1f} ms over {args.repeat} runs")
+
+        slowest = sorted(runs[-1][1].items(), key=lambda item: -item[1])[:args.top]
+        for name, micros in slowest:
+            print(f"    {micros / 1000:>8.1f} ms  {name}")
+
+        if args.budget_ms is not None and median > args.budget_ms:
+            print(f"    over budget: {median:.1f} ms > {args.budget_ms:.1f} ms")
+            failures.append(module)
+        if module in baseline and median > baseline[module] * (1 + args.tolerance):
+            print(f"    regression: {median:.1f} ms vs baseline {baseline[module]:.1f} ms")
+            failures.append(module)
+
+    if args.save and args.baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(medians, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,5 +8,86 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_API_BASE = "https://api.groq.com/openai/v1"
 
 SEARXNG_INSTANCE = os.getenv("SEARXNG_INSTANCE", "https://searx.be")  # Replace with your preferred SearxNG instance or use an environment variable
+SEARXNG_INSTANCES = [i.strip() for i in os.getenv("SEARXNG_INSTANCES", SEARXNG_INSTANCE).split(",") if i.strip()]  # comma separated, queried together
+
+# Credibility verification in BrowsingAgent.verify_content
+VERIFY_CONCURRENCY = int(os.getenv("VERIFY_CONCURRENCY", "5"))  # max LLM verification calls in flight
+VERIFY_TIMEOUT = float(os.getenv("VERIFY_TIMEOUT", "30"))  # seconds per verification call
+VERIFY_BATCH_SIZE = int(os.getenv("VERIFY_BATCH_SIZE", "4"))  # short documents per prompt, 1 disables batching
+VERIFY_BATCH_MAX_CHARS = int(os.getenv("VERIFY_BATCH_MAX_CHARS", "1500"))  # documents longer than this are verified alone
+
+# Page fetching in BrowsingAgent.fetch_document
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", str(2 * 1024 * 1024)))  # bodies are cut at this size
+PAGE_CHUNK_SIZE = int(os.getenv("PAGE_CHUNK_SIZE", "65536"))  # bytes read and parsed per step
+
+# Fetching <links> in BrowsingAgent.perplexica_agent
+LINK_FETCH_CONCURRENCY = int(os.getenv("LINK_FETCH_CONCURRENCY", "4"))  # pages fetched at once
+LINK_FETCH_DEADLINE = float(os.getenv("LINK_FETCH_DEADLINE", "20"))  # seconds before unfinished links are dropped
+
+# Prompt context packing for compare_documents / perplexica_agent
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))  # estimated tokens of document text per prompt
+CONTEXT_CHUNK_TOKENS = int(os.getenv("CONTEXT_CHUNK_TOKENS", "256"))  # estimated tokens per chunk
+
+# Senior developer tool execution
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "120"))  # seconds per tool call
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "8"))  # threads for blocking tools
+SUBPROCESS_MAX_CONCURRENT = int(os.getenv("SUBPROCESS_MAX_CONCURRENT", "2"))  # pip / debug processes at once
+INSTALL_TIMEOUT = float(os.getenv("INSTALL_TIMEOUT", "900"))  # seconds per pip install
+DEBUG_TIMEOUT = float(os.getenv("DEBUG_TIMEOUT", "300"))  # seconds per debug run
+
+# config/settings.yml is re-checked for changes at most this often (seconds)
+SETTINGS_RELOAD_INTERVAL = float(os.getenv("SETTINGS_RELOAD_INTERVAL", "1"))
+
+# Local caches (search results, pages, LLM responses)
+CACHE_DIR = os.getenv("AGENMICROX_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "86400"))  # seconds
+SEARCH_CACHE_MEMORY_SIZE = int(os.getenv("SEARCH_CACHE_MEMORY_SIZE", "256"))  # entries
+SEARCH_CACHE_DISK_SIZE = int(os.getenv("SEARCH_CACHE_DISK_SIZE", "5000"))  # entries
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "2000"))  # urls
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 86400)))  # seconds
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "256"))  # entries
+LLM_CACHE_DISK_SIZE = int(os.getenv("LLM_CACHE_DISK_SIZE", "20000"))  # entries
+
+# Image URL validation (utils/image_probe.py)
+IMAGE_VERDICT_TTL = float(os.getenv("IMAGE_VERDICT_TTL", str(7 * 86400)))  # seconds a verdict is reused
+IMAGE_INVALID_TTL = float(os.getenv("IMAGE_INVALID_TTL", "600"))  # seconds an HTTP error or non-image verdict is reused
+IMAGE_SNIFF_BYTES = int(os.getenv("IMAGE_SNIFF_BYTES", "64"))  # bytes fetched to check magic numbers
+IMAGE_VALIDATE_CONCURRENCY = int(os.getenv("IMAGE_VALIDATE_CONCURRENCY", "8"))  # probes in flight
+
+# Search fan-out across SearxNG instances and DuckDuckGo
+SEARCH_QUORUM = int(os.getenv("SEARCH_QUORUM", "20"))  # unique results that end a search early
+SEARCH_DEADLINE = float(os.getenv("SEARCH_DEADLINE", "4"))  # seconds to wait for providers
+SEARCH_SLOW_LATENCY = float(os.getenv("SEARCH_SLOW_LATENCY", "3"))  # average seconds before a provider is demoted
+SEARCH_DEMOTE_TIME = float(os.getenv("SEARCH_DEMOTE_TIME", "30"))  # first demotion, doubles on repeat
+SEARCH_MAX_DEMOTE_TIME = float(os.getenv("SEARCH_MAX_DEMOTE_TIME", "600"))  # longest demotion
+SEARCH_DDG_MAX_RESULTS = int(os.getenv("SEARCH_DDG_MAX_RESULTS", "30"))
+
+# Outgoing HTTP guard (utils/http_client.py); circuit ban times come from settings.yml search section
+HTTP_RATE_PER_HOST = float(os.getenv("HTTP_RATE_PER_HOST", "5"))  # requests per second per host
+HTTP_BURST_PER_HOST = float(os.getenv("HTTP_BURST_PER_HOST", "10"))  # requests per host in a burst
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))  # extra attempts on connection errors and 429/5xx
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))  # seconds, doubled per attempt
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "8"))  # seconds
+HTTP_FAILURE_THRESHOLD = int(os.getenv("HTTP_FAILURE_THRESHOLD", "3"))  # consecutive failures that open a circuit
+HTTP_DEADLINE = float(os.getenv("HTTP_DEADLINE", "15"))  # seconds per request, retries and body included
+
+# Tracing (utils/tracing.py); traces stay in memory for /trace, and are also exported
+# as OTLP/JSON lines when TRACE_FILE is set, e.g. TRACE_FILE=.cache/traces/spans.jsonl
+SERVICE_NAME = os.getenv("SERVICE_NAME", "agenmicrox")
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))  # TRACE_FILE is rotated to <file>.1 past this size
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "20"))  # finished traces kept in memory for /trace
+
+# Multi-session server (server.py)
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "16"))  # requests processed concurrently
+SERVER_QUEUE_SIZE = int(os.getenv("SERVER_QUEUE_SIZE", "256"))  # requests waiting for a worker
+SERVER_QUEUE_WAIT = float(os.getenv("SERVER_QUEUE_WAIT", "5"))  # seconds to wait for room before answering 503
+SESSION_MAX_IN_FLIGHT = int(os.getenv("SESSION_MAX_IN_FLIGHT", "2"))  # queued or running requests per session
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "1000"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "3600"))  # idle seconds before a session is dropped
+SESSION_HISTORY_TURNS = int(os.getenv("SESSION_HISTORY_TURNS", "20"))  # user/assistant pairs kept per session
 
 # Add more configuration variables as needed
@@ -0,0 +1,238 @@
+# config/settings.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.config import CACHE_DIR, SETTINGS_RELOAD_INTERVAL
+
+SETTINGS_PATH = Path(__file__).resolve().parent / "settings.yml"
+
+SECTION_START = re.compile(r"^([A-Za-z_][\w-]*)\s*:")
+ANCHOR = re.compile(r"(?:^|[\s\[,])&([\w-]+)(?=[\s\],]|$)", re.M)
+ALIAS = re.compile(r"(?:^|[\s\[,:])\*([\w-]+)(?=[\s\],]|$)", re.M)
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Raw text of every top-level key, in file order; comments before the first key are dropped."""
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in text.splitlines(keepends=True):
+        match = SECTION_START.match(line)
+        if match:
+            current = sections.setdefault(match.group(1), [])
+        if current is not None:
+            current.append(line)
+    return {name: "".join(lines) for name, lines in sections.items()}
+
+
+class Settings:
+    """
+    Lazily parsed view of a YAML settings file, one top-level section at a time.
+
+    The file is split into its top-level sections as text and only the sections
+    that are asked for are parsed (sections using YAML aliases are parsed
+    together with the sections defining the anchors). Parsed sections are kept
+    in a JSON snapshot keyed on the file's mtime and size and on each section's
+    content hash, so later processes usually skip YAML entirely.
+
+    The file is re-checked at most every `check_interval` seconds; when it has
+    changed, only sections whose text changed are dropped and re-parsed.
+
+    Args:
+        path (str): YAML file to read.
+        snapshot_path (str): JSON snapshot location, None to keep everything in memory.
+        check_interval (float): Seconds between checks for a modified file.
+    """
+
+    def __init__(self, path: str, snapshot_path: Optional[str] = None, check_interval: float = 1.0):
+        self.path = str(path)
+        self.snapshot_path = snapshot_path
+        self.check_interval = check_interval
+        self.lock = threading.RLock()
+        self.file_stat: Optional[Tuple[int, int]] = None
+        self.last_check = 0.0
+        self.texts: Optional[Dict[str, str]] = None
+        self.dependencies: Dict[str, List[str]] = {}
+        self.hashes: Dict[str, str] = {}
+        self.values: Dict[str, Any] = {}
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.parsed = 0
+        self.reloads = 0
+
+    def current_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load_snapshot(self) -> Dict[str, Any]:
+        if self.snapshot is None:
+            self.snapshot = {"stat": None, "names": None, "sections": {}}
+            if self.snapshot_path:
+                try:
+                    with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if data.get("path") == self.path:
+                        self.snapshot = data
+                except (OSError, ValueError):
+                    pass
+        return self.snapshot
+
+    def save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        snapshot = dict(self.snapshot, path=self.path)
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.snapshot_path)
+        except OSError:
+            pass
+
+    def snapshot_is_current(self) -> bool:
+        snapshot = self.load_snapshot()
+        return snapshot["stat"] is not None and tuple(snapshot["stat"]) == self.file_stat
+
+    def read_sections(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.texts = split_sections(f.read())
+        anchors = {}
+        for name, text in self.texts.items():
+            for anchor in ANCHOR.findall(text):
+                anchors.setdefault(anchor, name)
+        self.dependencies = {
+            name: sorted({anchors[alias] for alias in ALIAS.findall(text)
+                          if alias in anchors and anchors[alias] != name}, key=list(self.texts).index)
+            for name, text in self.texts.items()
+        }
+        self.hashes = {}
+        for name, text in self.texts.items():
+            digest = hashlib.sha256()
+            for dependency in self.dependencies[name]:
+                digest.update(self.texts[dependency].encode("utf-8"))
+            digest.update(text.encode("utf-8"))
+            self.hashes[name] = digest.hexdigest()
+
+        snapshot = self.load_snapshot()
+        snapshot["stat"] = list(self.file_stat)
+        snapshot["names"] = list(self.texts)
+        snapshot["sections"] = {
+            name: entry for name, entry in snapshot["sections"].items() if self.hashes.get(name) == entry["hash"]
+        }
+
+    def parse(self, name: str) -> Any:
+        import yaml
+        document = "".join(self.texts[dependency] for dependency in self.dependencies[name]) + self.texts[name]
+        self.parsed += 1
+        return (yaml.safe_load(document) or {}).get(name)
+
+    def refresh(self):
+        now = time.monotonic()
+        if self.file_stat is not None and now - self.last_check < self.check_interval:
+            return
+        self.last_check = now
+        file_stat = self.current_stat()
+        if file_stat == self.file_stat:
+            return
+        first_load = self.file_stat is None
+        self.file_stat = file_stat
+        if first_load and self.snapshot_is_current():
+            return
+        # Changed on disk (or no usable snapshot): keep only sections whose text is unchanged
+        old_hashes = dict(self.hashes)
+        self.read_sections()
+        for name in list(self.values):
+            if self.hashes.get(name) != old_hashes.get(name):
+                del self.values[name]
+        if not first_load:
+            self.reloads += 1
+        self.save_snapshot()
+
+    def section(self, name: str, default: Any = None) -> Any:
+        with self.lock:
+            self.refresh()
+            if name in self.values:
+                return self.values[name]
+
+            snapshot = self.load_snapshot()
+            if self.texts is None and self.snapshot_is_current():
+                # Fast path: nothing has changed since the snapshot was written
+                if name not in snapshot["names"]:
+                    return default
+                if name in snapshot["sections"]:
+                    entry = snapshot["sections"][name]
+                    self.hashes[name] = entry["hash"]
+                    self.values[name] = entry["value"]
+                    return entry["value"]
+                self.read_sections()
+
+            if name not in self.texts:
+                return default
+            entry = snapshot["sections"].get(name)
+            if entry is not None and entry["hash"] == self.hashes[name]:
+                value = entry["value"]
+            else:
+                value = self.parse(name)
+                try:
+                    # Values JSON cannot reproduce exactly (!!binary, int keys) stay in memory only
+                    storable = json.loads(json.dumps(value)) == value
+                except (TypeError, ValueError):
+                    storable = False
+                if storable:
+                    snapshot["sections"][name] = {"hash": self.hashes[name], "value": value}
+                    self.save_snapshot()
+            self.values[name] = value
+            return value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.section(name, default)
+
+    def __getitem__(self, name: str) -> Any:
+        missing = object()
+        value = self.section(name, missing)
+        if value is missing:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.keys()
+
+    def keys(self) -> List[str]:
+        with self.lock:
+            self.refresh()
+            if self.texts is None and self.snapshot_is_current():
+                return list(self.load_snapshot()["names"])
+            if self.texts is None:
+                self.read_sections()
+            return list(self.texts)
+
+    def reload(self):
+        """Check the file for changes now instead of waiting for `check_interval`."""
+        with self.lock:
+            self.last_check = 0.0
+            self.refresh()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"parsed_sections": self.parsed, "cached_sections": len(self.values), "reloads": self.reloads}
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = Settings(
+                SETTINGS_PATH,
+                snapshot_path=os.path.join(CACHE_DIR, "settings", "settings.json"),
+                check_interval=SETTINGS_RELOAD_INTERVAL
+            )
+        return _settings
@@ -1,4 +1,8 @@
+import asyncio
+import time
 from models import Plan, CodeSubmission, Task, CodeFile
+from scheduler import TaskScheduler
+from verification import VerificationEngine
 from agency_swarm.agent import Agent 
 from agency_swarm.agency import Agency 
 class ExpertDeveloperAgent(Agent):
@@ -20,47 +24,115 @@ class VerifierAgent(Agent):
         self.modal="groq/llama-3.1-70b-versatile"
         self.instructions=""
         self.memory = {}
+        self.engine = VerificationEngine()
+        self.last_report = None
+
+    def check_plan_alignment(self, code_file: CodeFile, plan: Plan) -> list:
+        task = plan.get_task(code_file.task_id)
+        if task and f"# Code for {task.description}" not in code_file.code:
+            return [f"Code does not implement task {task.task_id}: {task.description}"]
+        return []
+
+    def merge_alignment(self, result: dict, plan: Plan, code_file: CodeFile) -> dict:
+        alignment_errors = self.check_plan_alignment(code_file, plan)
+        if alignment_errors:
+            result = dict(result, ok=False, errors=result["errors"] + alignment_errors)
+        return result
+
+    async def verify_submission(self, code_submission: CodeSubmission, plan: Plan) -> dict:
+        report = await self.engine.verify(code_submission.files)
+        files = {code_file.file_name: code_file for code_file in code_submission.files}
+        report["files"] = [self.merge_alignment(result, plan, files[result["file_name"]]) for result in report["files"]]
+        report["ok"] = all(result["ok"] for result in report["files"])
+        self.last_report = report
+        return report
+
+    async def verify_stream(self, code_files, plan: Plan):
+        # Files are checked as soon as the developers hand them in
+        files = {}
+
+        async def remember(stream):
+            async for code_file in stream:
+                files[code_file.file_name] = code_file
+                yield code_file
+
+        local_modules = [task.task_id for task in plan.tasks]
+        async for result in self.engine.verify_stream(remember(code_files), local_modules):
+            yield self.merge_alignment(result, plan, files[result["file_name"]])
 
     def verify_code(self, plan_json, code_json):
-        pass
+        plan = Plan.parse_raw(plan_json)
+        code_submission = CodeSubmission.parse_raw(code_json)
+        return asyncio.run(self.verify_submission(code_submission, plan))
 
-    def verify_and_finalize_code(self, code_submission: CodeSubmission) -> bool:
-        for file in code_submission.files:
-            task = next((t for t in plan.tasks if t.task_id == file.task_id), None)
-            if task:
-                if f"# Code for {task.description}" not in file.code:
-                    return False
-        return True
+    def verify_and_finalize_code(self, code_submission: CodeSubmission, plan: Plan) -> bool:
+        return asyncio.run(self.verify_submission(code_submission, plan))["ok"]
+
+    def close(self):
+        # Stops the verification process pool; it is started again on the next check
+        self.engine.close()
 
 class DevelopmentAgency(Agency):
     def __init__(self, verifier_agent, developer_agents):
         self.verifier_agent = verifier_agent
         self.developer_agents = developer_agents
         self.plan = None
+        self.scheduler = None
 
-    def receive_plan(self, plan_json: str):
-        self.plan = Plan.parse_raw(plan_json)
-        for developer in self.developer_agents:
-            for task in self.plan.tasks:
-                developer.memory['current_task'] = task
-                break
+    def receive_plan(self, plan_json):
+        if isinstance(plan_json, dict):
+            self.plan = Plan.parse_obj(plan_json)
+        else:
+            self.plan = Plan.parse_raw(plan_json)
+        self.scheduler = None
 
-    def collect_code(self) -> CodeSubmission:
-        submitted_files = []
-        for developer in self.developer_agents:
-            task = developer.memory.get('current_task')
-            if task:
-                code_file = developer.work_on_task(task)
-                submitted_files.append(code_file)
+    async def stream_code(self):
+        # Every task of the plan, spread over all developers; files are yielded as they finish
+        self.scheduler = TaskScheduler(self.plan, self.developer_agents)
+        async for code_file in self.scheduler.stream():
+            yield code_file
+
+    async def collect_code_async(self) -> CodeSubmission:
+        submitted_files = [code_file async for code_file in self.stream_code()]
         return CodeSubmission(
             project_name=self.plan.project_name,
             files=submitted_files
         )
 
+    def collect_code(self) -> CodeSubmission:
+        return asyncio.run(self.collect_code_async())
+
+    async def collect_and_verify(self):
+        # Verification of early files overlaps with generation of later ones
+        start = time.perf_counter()
+        submitted_files = []
+        results = []
+
+        async def collect():
+            async for code_file in self.stream_code():
+                submitted_files.append(code_file)
+                yield code_file
+
+        async for result in self.verifier_agent.verify_stream(collect(), self.plan):
+            results.append(result)
+
+        code_submission = CodeSubmission(project_name=self.plan.project_name, files=submitted_files)
+        report = VerificationEngine.report(results, time.perf_counter() - start)
+        self.verifier_agent.last_report = report
+        return code_submission, report
+
+    def failed_tasks(self) -> dict:
+        if self.scheduler is None:
+            return {}
+        return {task_id: failure.error for task_id, failure in self.scheduler.failures.items()}
+
     def handle_message(self, message: str):
         # Process a message sent from the Senior Developer Agent
         pass
 
     def verify_and_finalize_code(self, code_submission: CodeSubmission) -> bool:
-        return self.verifier_agent.verify_and_finalize_code(code_submission)
+        return self.verifier_agent.verify_and_finalize_code(code_submission, self.plan)
+
+    def close(self):
+        self.verifier_agent.close()
       
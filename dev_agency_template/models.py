@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Dict
+from pydantic import BaseModel, PrivateAttr
+from typing import List, Dict, Optional
 
 class Task(BaseModel):
     task_id: str
@@ -15,6 +15,36 @@ class CodeFile(BaseModel):
 class Plan(BaseModel):
     project_name: str
     tasks: List[Task]
+    _task_index: Optional[Dict[str, Task]] = PrivateAttr(default=None)
+    _function_index: Optional[Dict[str, List[Task]]] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context):
+        # Built once when the plan is parsed, so lookups stay O(1) for large plans
+        self.build_indexes()
+
+    def build_indexes(self):
+        self._task_index = {}
+        self._function_index = {}
+        for task in self.tasks:
+            self._task_index.setdefault(task.task_id, task)
+            for function in task.functions:
+                self._function_index.setdefault(function, []).append(task)
+
+    def task_index(self) -> Dict[str, Task]:
+        if self._task_index is None:
+            self.build_indexes()
+        return self._task_index
+
+    def function_index(self) -> Dict[str, List[Task]]:
+        if self._function_index is None:
+            self.build_indexes()
+        return self._function_index
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        return self.task_index().get(task_id)
+
+    def tasks_for_function(self, function: str) -> List[Task]:
+        return self.function_index().get(function, [])
 
 class CodeSubmission(BaseModel):
     project_name: str
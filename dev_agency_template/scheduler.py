@@ -0,0 +1,139 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Set
+
+from models import Plan, Task, CodeFile
+
+
+def task_dependencies(task: Task) -> List[str]:
+    # Dependencies are listed in Task.details as "depends_on": "1, 2"
+    depends_on = task.details.get("depends_on", "")
+    return [task_id.strip() for task_id in depends_on.split(",") if task_id.strip()]
+
+
+class TaskFailure:
+    def __init__(self, task: Task, error: str, attempts: int):
+        self.task = task
+        self.error = error
+        self.attempts = attempts
+
+
+class TaskScheduler:
+    """
+    Distributes every task of a Plan over a pool of developer agents.
+
+    Each developer is a worker pulling from a shared queue; a task is queued once
+    all tasks listed in its `depends_on` detail have produced a file. Failed tasks
+    are retried with exponential backoff, and tasks whose dependencies failed are
+    skipped. Finished CodeFiles are streamed as soon as they are ready.
+
+    Args:
+        plan (Plan): The plan whose tasks are scheduled.
+        developers (list): ExpertDeveloperAgent instances, one worker each.
+        max_retries (int): Extra attempts for a task whose work_on_task raised.
+        retry_delay (float): Seconds before the first retry, doubled on each attempt.
+    """
+
+    def __init__(self, plan: Plan, developers: list, max_retries: int = 2, retry_delay: float = 0.5):
+        self.plan = plan
+        self.developers = developers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # A task id listed twice is scheduled once, as its first entry (like Plan.get_task)
+        self.tasks: Dict[str, Task] = plan.task_index()
+        self.dependencies: Dict[str, Set[str]] = {
+            task_id: {dep for dep in task_dependencies(task) if dep in self.tasks}
+            for task_id, task in self.tasks.items()
+        }
+        self.dependents: Dict[str, List[str]] = {task_id: [] for task_id in self.tasks}
+        for task_id, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents[dep].append(task_id)
+        self.failures: Dict[str, TaskFailure] = {}
+        self.check_cycles()
+
+    def check_cycles(self):
+        visiting, done = set(), set()
+
+        def visit(task_id: str, path: List[str]):
+            if task_id in done:
+                return
+            if task_id in visiting:
+                raise ValueError(f"Task dependency cycle: {' -> '.join(path + [task_id])}")
+            visiting.add(task_id)
+            for dep in self.dependencies[task_id]:
+                visit(dep, path + [task_id])
+            visiting.discard(task_id)
+            done.add(task_id)
+
+        for task_id in self.tasks:
+            visit(task_id, [])
+
+    async def run_task(self, developer, task: Task) -> CodeFile:
+        attempt = 0
+        while True:
+            try:
+                developer.memory['current_task'] = task
+                # work_on_task is blocking, keep it off the event loop
+                return await asyncio.to_thread(developer.work_on_task, task)
+            except Exception:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self.retry_delay * (2 ** attempt))
+                attempt += 1
+            finally:
+                developer.memory.pop('current_task', None)
+
+    async def stream(self) -> AsyncIterator[CodeFile]:
+        if not self.developers:
+            raise ValueError("No developer agents available to work on the plan.")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue()
+        remaining = {task_id: len(deps) for task_id, deps in self.dependencies.items()}
+        pending = len(self.tasks)
+
+        for task_id, task in self.tasks.items():
+            if not remaining[task_id]:
+                queue.put_nowait(task)
+
+        async def worker(developer):
+            while True:
+                task = await queue.get()
+                try:
+                    code_file = await self.run_task(developer, task)
+                    await results.put((task, code_file, None))
+                except Exception as e:
+                    await results.put((task, None, e))
+                finally:
+                    queue.task_done()
+
+        def skip_dependents(task_id: str, reason: str) -> int:
+            skipped = 0
+            for dependent in self.dependents[task_id]:
+                if dependent in self.failures:
+                    continue
+                self.failures[dependent] = TaskFailure(self.tasks[dependent], reason, 0)
+                skipped += 1 + skip_dependents(dependent, reason)
+            return skipped
+
+        workers = [asyncio.ensure_future(worker(developer)) for developer in self.developers]
+        try:
+            while pending:
+                task, code_file, error = await results.get()
+                pending -= 1
+                if error is not None:
+                    self.failures[task.task_id] = TaskFailure(task, str(error), self.max_retries + 1)
+                    pending -= skip_dependents(task.task_id, f"Dependency {task.task_id} failed")
+                    continue
+                for dependent in self.dependents[task.task_id]:
+                    remaining[dependent] -= 1
+                    if not remaining[dependent] and dependent not in self.failures:
+                        queue.put_nowait(self.tasks[dependent])
+                yield code_file
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def run(self) -> List[CodeFile]:
+        return [code_file async for code_file in self.stream()]
@@ -0,0 +1,213 @@
+import ast
+import asyncio
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from models import CodeFile
+
+try:
+    from pyflakes.api import check as pyflakes_check
+    from pyflakes.reporter import Reporter as PyflakesReporter
+except ImportError:  # pyflakes is optional, a basic unused-import check is used instead
+    pyflakes_check = None
+
+
+class CollectingStream:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def write(self, text: str):
+        if text.strip():
+            self.lines.append(text.strip())
+
+    def flush(self):
+        pass
+
+
+def check_syntax(file_name: str, code: str):
+    try:
+        return ast.parse(code, filename=file_name), None
+    except SyntaxError as e:
+        return None, f"SyntaxError at line {e.lineno}: {e.msg}"
+
+
+def check_imports(tree: ast.AST, local_modules: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Broken local and relative imports are errors. Third-party modules that do not
+    resolve here are only warnings: they are judged against this interpreter, not the
+    project the code is written for, which may well list them in its requirements.
+    """
+    local_modules = set(local_modules)
+    errors, warnings = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.level:
+            # `from . import a` and `from .a import b` both need a local module `a`
+            names = [node.module] if node.module else [alias.name for alias in node.names]
+            for name in names:
+                if name.split(".")[0] not in local_modules:
+                    errors.append(f"Import error at line {node.lineno}: local module '{name}' not found")
+            continue
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            top = name.split(".")[0]
+            if top in local_modules or top in sys.builtin_module_names:
+                continue
+            try:
+                found = importlib.util.find_spec(top) is not None
+            except (ImportError, ValueError):
+                found = False
+            if not found:
+                warnings.append(f"Line {node.lineno}: module '{top}' is not installed here, "
+                                f"make sure it is in the project's requirements")
+    return errors, warnings
+
+
+def check_lint(file_name: str, code: str, tree: ast.AST) -> List[str]:
+    if pyflakes_check is not None:
+        out, err = CollectingStream(), CollectingStream()
+        pyflakes_check(code, file_name, PyflakesReporter(out, err))
+        return out.lines + err.lines
+
+    imported = {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name != "*":
+                    imported[(alias.asname or alias.name).split(".")[0]] = node.lineno
+    used = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    used |= {node.value.id for node in ast.walk(tree)
+             if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)}
+    return [f"{file_name}:{line}: '{name}' imported but unused"
+            for name, line in imported.items() if name not in used]
+
+
+def check_file(file_name: str, code: str, local_modules: List[str]) -> Dict[str, Any]:
+    """Syntax, import and lint checks for one file; runs inside a worker process."""
+    start = time.perf_counter()
+    errors: List[str] = []
+    warnings: List[str] = []
+    if file_name.endswith(".py"):
+        tree, syntax_error = check_syntax(file_name, code)
+        if syntax_error:
+            errors.append(syntax_error)
+        else:
+            import_errors, import_warnings = check_imports(tree, local_modules)
+            errors.extend(import_errors)
+            warnings.extend(import_warnings)
+            warnings.extend(check_lint(file_name, code, tree))
+    return {
+        "file_name": file_name,
+        "ok": not errors,
+        "errors": errors,
+        "warnings": warnings,
+        "duration": time.perf_counter() - start,
+    }
+
+
+class VerificationEngine:
+    """
+    Verifies CodeFiles in a process pool, one file per job.
+
+    Results are cached on the hash of the file name, its content and the set of
+    local modules, so files that are unchanged in a resubmitted CodeSubmission are
+    not checked again.
+
+    Args:
+        max_workers (int): Size of the process pool, defaults to the CPU count.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.cache: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def content_hash(code_file: CodeFile, local_modules: List[str]) -> str:
+        digest = hashlib.sha256()
+        digest.update(code_file.file_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(code_file.code.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(",".join(local_modules).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def local_modules_for(files: Iterable[CodeFile], extra: Iterable[str] = ()) -> List[str]:
+        modules = set(extra)
+        for code_file in files:
+            if code_file.file_name.endswith(".py"):
+                modules.add(os.path.splitext(os.path.basename(code_file.file_name))[0])
+        return sorted(modules)
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.executor
+
+    async def verify_file(self, code_file: CodeFile, local_modules: List[str]) -> Dict[str, Any]:
+        key = self.content_hash(code_file, local_modules)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dict(cached, task_id=code_file.task_id, cached=True)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self.get_executor(), check_file, code_file.file_name, code_file.code, local_modules
+        )
+        self.cache[key] = result
+        return dict(result, task_id=code_file.task_id, cached=False)
+
+    async def verify(self, files: List[CodeFile], extra_modules: Iterable[str] = ()) -> Dict[str, Any]:
+        start = time.perf_counter()
+        local_modules = self.local_modules_for(files, extra_modules)
+        results = await asyncio.gather(*[self.verify_file(code_file, local_modules) for code_file in files])
+        return self.report(list(results), time.perf_counter() - start)
+
+    async def verify_stream(self, files: AsyncIterator[CodeFile],
+                            extra_modules: Iterable[str] = ()) -> AsyncIterator[Dict[str, Any]]:
+        """Verify files while they are still being produced, yielding each result when done."""
+        local_modules = sorted(set(extra_modules))
+        done: asyncio.Queue = asyncio.Queue()
+        jobs = []
+        yielded = 0
+
+        async def run(code_file: CodeFile):
+            try:
+                result = await self.verify_file(code_file, local_modules)
+            except Exception as e:
+                result = {"file_name": code_file.file_name, "task_id": code_file.task_id, "ok": False,
+                          "errors": [f"Verification error: {e}"], "warnings": [], "duration": 0.0, "cached": False}
+            await done.put(result)
+
+        async for code_file in files:
+            jobs.append(asyncio.ensure_future(run(code_file)))
+            while not done.empty():
+                yielded += 1
+                yield done.get_nowait()
+        while yielded < len(jobs):
+            yielded += 1
+            yield await done.get()
+
+    @staticmethod
+    def report(results: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+        return {
+            "ok": all(result["ok"] for result in results),
+            "files": results,
+            "cached": sum(1 for result in results if result["cached"]),
+            "duration": duration,
+        }
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -1,14 +1,25 @@
 # main.py
-from agency_swarm import Agency, set_openai_client
-from agent.planner_agent import PlannerAgent
-from agent.suggester_agent import SuggesterAgent
-from agent.browsing_agent import BrowsingAgent
+import asyncio
+import json
 import os
-from openai import OpenAI
-from astra_assistants import patch
-from agent.senior_developer import SeniorDeveloperAgent
+import sys
+
+# dev_agency_template modules import each other as top-level modules (`from models import ...`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "dev_agency_template"))
+
+
+def build_agencies():
+    # Heavy dependencies (agency_swarm, openai, astra_assistants, litellm, aiohttp)
+    # are only imported once a command actually needs the agents
+    from agency_swarm import Agency, set_openai_client
+    from openai import OpenAI
+    from astra_assistants import patch
+    from agent.planner_agent import PlannerAgent
+    from agent.suggester_agent import SuggesterAgent
+    from agent.browsing_agent import BrowsingAgent
+    from agent.senior_developer import get_senior_developer
+    from dev_agency_template.development_agency import VerifierAgent
 
-def main():
     # Set the OpenAI key
     client = patch(OpenAI())
     set_openai_client(client)
@@ -17,13 +28,14 @@ def main():
     planner = PlannerAgent()
     suggester = SuggesterAgent()
     browser = BrowsingAgent()
-    senior_developer = SeniorDeveloperAgent()
+    verifier = VerifierAgent()
+    senior_developer = get_senior_developer()
 
     # Initialize the agency with the agent communication chart
     planner_agency = Agency(
         agency_chart=[
            # Top-level agent
-            planner,       
+            planner,
             [planner, suggester],   # Communication between planner and suggester
             [planner, browser],     # Communication between planner and browser
             [suggester, browser]    # Communication between suggester and browser
@@ -34,7 +46,7 @@ def main():
     frontend_dev_agency = Agency(
         agency_chart=[
            # Top-level agent
-            verifier,       
+            verifier,
             [planner, suggester],   # Communication between planner and suggester
             [planner, browser],     # Communication between planner and browser
             [suggester, browser]    # Communication between suggester and browser
@@ -50,20 +62,55 @@ def main():
             [senior_developer, frontend_dev_agency],
         ]
     )
+    return {
+        "planner": planner,
+        "browser": browser,
+        "senior_developer": senior_developer,
+        "verifier": verifier,
+        "planner_agency": planner_agency,
+        "agency": agency,
+    }
+
+
+async def console():
+    # One event loop for the whole session: the agents' pooled HTTP session and the
+    # tool runtime stay bound to it between commands
+    agents = None
     while True:
         # Get user input
-        user_input = input("Please provide your query or command: ")
+        user_input = await asyncio.to_thread(input, "Please provide your query or command: ")
+
+        if user_input == "exit":
+            print("Exiting...")
+            if agents is not None:
+                from agent.senior_developer import close_development_agencies
+                agents["senior_developer"].tool_runtime.shutdown()
+                agents["verifier"].close()
+                close_development_agencies()
+                await agents["browser"].close()
+            break
+
+        if user_input.startswith("/trace"):
+            # Slowest spans of the last traced agent call, e.g. `/trace 20`
+            from utils.tracing import trace_report
+            arg = user_input.split("/trace", 1)[1].strip()
+            print(trace_report(int(arg) if arg.isdigit() else 10))
+            continue
+
+        if agents is None:
+            agents = await asyncio.to_thread(build_agencies)
+        senior_developer = agents["senior_developer"]
 
         if user_input.startswith("/create agency "):
             try:
-                _, agency_name, num_devs = user_input.split(" ")
-                result = senior_developer.run_tool("CreateAgencyTool", agency_name=agency_name, num_developers=int(num_devs))
+                _, _, agency_name, num_devs = user_input.split(" ")
+                result = await senior_developer.run_tool("CreateAgencyTool", agency_name=agency_name, num_developers=int(num_devs))
                 print(result)
             except ValueError:
                 print("Invalid input. Use: /create agency <agency_name> <num_devs>")
 
         elif user_input.startswith("/assign plan "):
-            _, agency_name = user_input.split(" ", 2)
+            agency_name = user_input.split(" ", 2)[2]
             # Example plan provided directly for simplicity
             plan = {
                 "project_name": "Example Project",
@@ -71,39 +118,46 @@ def main():
                     {"task_id": "1", "description": "Create example feature", "functions": ["example_function"], "details": {}}
                 ]
             }
-            result = senior_developer.run_tool("AssignPlanToAgencyTool", agency_name=agency_name, plan=edited_plan)
+            result = await senior_developer.run_tool("AssignPlanToAgencyTool", agency_name=agency_name, plan=plan)
             print(result)
 
         elif user_input.startswith("/implement code "):
-            _, agency_name = user_input.split(" ", 2)
-            result = senior_developer.run_tool("ImplementCodeTool", agency_name=agency_name)
+            agency_name = user_input.split(" ", 2)[2]
+            result = await senior_developer.run_tool("ImplementCodeTool", agency_name=agency_name)
             print(result)
 
         elif user_input.startswith("/add functionality/") or user_input.startswith("/add improvement/"):
-            result = senior_developer.run_tool("HandleTerminalCommandTool", command=user_input)
+            result = await senior_developer.run_tool("HandleTerminalCommandTool", command=user_input)
             print(result)
 
         elif user_input == "/list agencies/":
-            result = senior_developer.run_tool("HandleTerminalCommandTool", command=user_input)
+            result = await senior_developer.run_tool("HandleTerminalCommandTool", command=user_input)
             print(result)
 
-        elif user_input == "exit":
-            print("Exiting...")
-            break
         elif user_input == "/search/":
             # Optionally, interact with specific agents like the browser
             browser_input = json.dumps({"query": user_input, "chat_history": []})
-            browser_result = agency.get_completion(browser_input, recipient_agent=browser)
+            browser_result = await asyncio.to_thread(
+                agents["agency"].get_completion, browser_input, recipient_agent=agents["browser"]
+            )
             print("Browsing agent result:", browser_result)
-            
+
         else:
-            # Run the agency to handle the input as a general query
-            planner_result = planner_agency.get_completion(user_input, recipient_agent=planner)
+            # Run the agency to handle the input as a general query; get_completion blocks
+            planner_result = await asyncio.to_thread(
+                agents["planner_agency"].get_completion, user_input, recipient_agent=agents["planner"]
+            )
             print("Planner agent result:", planner_result)
 
-            plan_to_code = agency.get_completion(planner_result, recipient_agent=senior_developer)
-            plan_for_devs = json.dumps({"plan_for_frontend":[], "plan_for_backend":[])
-            
+            plan_to_code = await asyncio.to_thread(
+                agents["agency"].get_completion, planner_result, recipient_agent=senior_developer
+            )
+            plan_for_devs = json.dumps({"plan_for_frontend": [], "plan_for_backend": []})
+
+
+def main():
+    asyncio.run(console())
+
+
 if __name__ == "__main__":
     main()
-            
@@ -0,0 +1,284 @@
+# server.py
+#
+# Multi-session front end for the agency: many users share one set of agents,
+# each with their own chat history, instead of taking turns at main.py's prompt.
+#
+#     POST   /sessions                      -> {"session_id": ...}
+#     GET    /sessions/{id}                 -> chat history and requests in flight
+#     DELETE /sessions/{id}
+#     POST   /sessions/{id}/messages        {"kind": "ask" | "plan", "content": ..., "stream": false}
+#                                           -> {"response": ...}, plus "dropped_links" for "ask"
+#     GET    /sessions/{id}/ws, GET /ws     WebSocket, one JSON request per message, tokens streamed back
+#     GET    /stats
+#
+# Usage:
+#     python server.py [--host 127.0.0.1] [--port 8080]
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from aiohttp import WSMsgType, web
+
+from config.config import (
+    SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_QUEUE_SIZE, SERVER_QUEUE_WAIT,
+    SESSION_MAX_IN_FLIGHT, SESSION_MAX_COUNT, SESSION_TTL, SESSION_HISTORY_TURNS
+)
+from utils.sessions import RequestDispatcher, ServerBusy, Session, SessionBusy, SessionStore, UnknownSession
+
+
+class AgencyHandlers:
+    """Request kinds served from the agents built by main.build_agencies, shared by every session."""
+
+    def __init__(self):
+        self.agents: Optional[Dict[str, Any]] = None
+        self.lock = asyncio.Lock()
+        # agency_swarm keeps one thread per agent pair and cannot run it concurrently,
+        # so plan requests from different sessions take turns on the planner agency
+        self.plan_lock = asyncio.Lock()
+
+    async def get_agents(self) -> Dict[str, Any]:
+        async with self.lock:
+            if self.agents is None:
+                from main import build_agencies
+                # Heavy imports and client setup stay off the event loop
+                self.agents = await asyncio.to_thread(build_agencies)
+        return self.agents
+
+    async def ask(self, session: Session, content: str, emit) -> Dict[str, Any]:
+        browser = (await self.get_agents())["browser"]
+        prompt, dropped_links = await browser.perplexica_prompt(content, list(session.chat_history))
+        parts = []
+        async for token in browser.answer_stream(prompt):
+            parts.append(token)
+            await emit(token)
+        return {"response": "".join(parts), "dropped_links": dropped_links}
+
+    @staticmethod
+    def history_instructions(chat_history: List[Dict[str, str]]) -> Optional[str]:
+        # The agency's thread is shared, so each session's own history goes with its message
+        if not chat_history:
+            return None
+        turns = "\n".join(f"{turn['role'].capitalize()}: {turn['content']}" for turn in chat_history)
+        return f"Conversation with this user so far:\n{turns}"
+
+    async def plan(self, session: Session, content: str, emit) -> str:
+        agents = await self.get_agents()
+        instructions = self.history_instructions(list(session.chat_history))
+        async with self.plan_lock:
+            # Agency.get_completion blocks, so it runs on a thread like in main.py's loop
+            run = asyncio.ensure_future(asyncio.to_thread(
+                agents["planner_agency"].get_completion, content,
+                recipient_agent=agents["planner"], additional_instructions=instructions
+            ))
+            try:
+                return await asyncio.shield(run)
+            except asyncio.CancelledError:
+                # The thread cannot be stopped; keep the agency until its run is over
+                await asyncio.wait([run])
+                raise
+
+    def handlers(self):
+        return {"ask": self.ask, "plan": self.plan}
+
+
+def error_status(error: Exception) -> int:
+    if isinstance(error, UnknownSession):
+        return 404
+    if isinstance(error, SessionBusy):
+        return 429
+    if isinstance(error, ServerBusy):
+        return 503
+    return 400
+
+
+def error_response(error: Exception) -> web.Response:
+    headers = {}
+    if isinstance(error, SessionBusy):
+        headers["Retry-After"] = "1"
+    elif isinstance(error, ServerBusy):
+        headers["Retry-After"] = str(max(1, round(error.retry_in)))
+    message = f"Unknown session {error.args[0]}" if isinstance(error, UnknownSession) else str(error)
+    return web.json_response({"error": message}, status=error_status(error), headers=headers)
+
+
+class SessionServer:
+    """
+    aiohttp application over a SessionStore and a RequestDispatcher.
+
+    Args:
+        handlers (dict): Request kind -> async handler(session, content, emit), the agency's by default.
+        store (SessionStore): Sessions, a new store sized from config by default.
+        dispatcher (RequestDispatcher): Worker pool, a new one sized from config by default.
+    """
+
+    def __init__(self, handlers: Optional[Dict[str, Any]] = None, store: Optional[SessionStore] = None,
+                 dispatcher: Optional[RequestDispatcher] = None):
+        self.store = store or SessionStore(
+            max_sessions=SESSION_MAX_COUNT, ttl=SESSION_TTL,
+            max_in_flight=SESSION_MAX_IN_FLIGHT, history_turns=SESSION_HISTORY_TURNS
+        )
+        self.dispatcher = dispatcher or RequestDispatcher(
+            handlers or AgencyHandlers().handlers(),
+            workers=SERVER_WORKERS, queue_size=SERVER_QUEUE_SIZE, queue_wait=SERVER_QUEUE_WAIT
+        )
+        self.janitor: Optional[asyncio.Task] = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.post("/sessions", self.create_session),
+            web.get("/sessions/{id}", self.get_session),
+            web.delete("/sessions/{id}", self.delete_session),
+            web.post("/sessions/{id}/messages", self.post_message),
+            web.get("/sessions/{id}/ws", self.websocket),
+            web.get("/ws", self.websocket),
+            web.get("/stats", self.stats),
+        ])
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+    async def on_startup(self, app: web.Application):
+        self.dispatcher.start()
+        self.janitor = asyncio.ensure_future(self.expire_sessions())
+
+    async def on_cleanup(self, app: web.Application):
+        if self.janitor is not None:
+            self.janitor.cancel()
+        await self.dispatcher.stop()
+
+    async def expire_sessions(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.store.ttl / 10))
+            self.store.expire()
+
+    async def create_session(self, request: web.Request) -> web.Response:
+        try:
+            session = self.store.create()
+        except ServerBusy as e:
+            return error_response(e)
+        return web.json_response({"session_id": session.session_id}, status=201)
+
+    async def get_session(self, request: web.Request) -> web.Response:
+        try:
+            return web.json_response(self.store.get(request.match_info["id"]).to_dict())
+        except UnknownSession as e:
+            return error_response(e)
+
+    async def delete_session(self, request: web.Request) -> web.Response:
+        if not self.store.delete(request.match_info["id"]):
+            return error_response(UnknownSession(request.match_info["id"]))
+        return web.Response(status=204)
+
+    async def post_message(self, request: web.Request) -> web.StreamResponse:
+        try:
+            body = await request.json()
+            kind, content = body.get("kind", "ask"), str(body["content"])
+        except (ValueError, KeyError, AttributeError):
+            return error_response(ValueError("Expected a JSON object with 'content'"))
+        try:
+            session = self.store.get(request.match_info["id"])
+            submitted = await self.dispatcher.submit(session, kind, content)
+        except (UnknownSession, SessionBusy, ServerBusy, ValueError) as e:
+            return error_response(e)
+
+        try:
+            if not body.get("stream"):
+                try:
+                    return web.json_response(await submitted.result())
+                except RuntimeError as e:
+                    return web.json_response({"error": str(e)}, status=500)
+
+            # Newline-delimited JSON events, written as the tokens arrive
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+            while True:
+                event, value = await submitted.next_event()
+                await response.write((json.dumps(event_message(event, value)) + "\n").encode("utf-8"))
+                if event != "token":
+                    break
+            await response.write_eof()
+            return response
+        except (asyncio.CancelledError, ConnectionResetError):
+            submitted.cancel()
+            raise
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        try:
+            session = self.store.get(request.match_info["id"]) if "id" in request.match_info else self.store.create()
+        except (UnknownSession, ServerBusy) as e:
+            return error_response(e)
+
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        send_lock = asyncio.Lock()
+        relays: Set[asyncio.Task] = set()
+        submitted = set()
+
+        async def send(message: Dict[str, Any]):
+            async with send_lock:
+                await ws.send_json(message)
+
+        async def relay(message_id: Any, item):
+            try:
+                while True:
+                    event, value = await item.next_event()
+                    await send(dict(event_message(event, value), id=message_id))
+                    if event != "token":
+                        return
+            finally:
+                submitted.discard(item)
+
+        await send({"type": "session", "session_id": session.session_id})
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json.loads(message.data)
+                    message_id, kind, content = data.get("id"), data.get("kind", "ask"), str(data["content"])
+                except (ValueError, KeyError, AttributeError):
+                    await send({"type": "error", "id": None, "status": 400,
+                                "error": "Expected a JSON object with 'content'"})
+                    continue
+                try:
+                    # Waiting here for room in the queue also stops reading from this socket
+                    item = await self.dispatcher.submit(session, kind, content)
+                except (SessionBusy, ServerBusy, ValueError) as e:
+                    await send({"type": "error", "id": message_id, "status": error_status(e), "error": str(e)})
+                    continue
+                submitted.add(item)
+                task = asyncio.ensure_future(relay(message_id, item))
+                relays.add(task)
+                task.add_done_callback(relays.discard)
+        finally:
+            # The client is gone: queued requests are dropped and running ones stopped
+            for item in list(submitted):
+                item.cancel()
+            for task in list(relays):
+                task.cancel()
+        return ws
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.dispatcher.stats(), sessions=len(self.store.sessions)))
+
+
+def event_message(event: str, value: Any) -> Dict[str, Any]:
+    if event == "token":
+        return {"type": "token", "text": value}
+    if event == "done":
+        return {"type": "done", **value}
+    return {"type": "error", "status": 500, "error": value}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the agency to many concurrent sessions.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    args = parser.parse_args()
+    web.run_app(SessionServer().app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
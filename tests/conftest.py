@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# The repo is not an installed package; its modules import as `utils.x`, `agent.x`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,73 @@
+# tests/test_file_transaction.py
+import os
+
+import pytest
+
+from utils import file_transaction
+from utils.file_transaction import FileTransaction, write_file
+
+
+def read(path) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_writes_changed_files_and_skips_unchanged(tmp_path):
+    (tmp_path / "same.txt").write_text("same")
+    transaction = FileTransaction()
+    transaction.add(str(tmp_path / "same.txt"), "same")
+    transaction.add(str(tmp_path / "new" / "deep" / "file.txt"), "new")
+    result = transaction.commit()
+    assert result == {"written": [str(tmp_path / "new" / "deep" / "file.txt")], "unchanged": [str(tmp_path / "same.txt")]}
+    assert read(tmp_path / "new" / "deep" / "file.txt") == "new"
+    assert write_file(str(tmp_path / "same.txt"), "same") is False
+    assert sorted(os.listdir(tmp_path)) == ["new", "same.txt"]
+
+
+def test_replaced_file_keeps_its_mode(tmp_path):
+    script = tmp_path / "run.sh"
+    script.write_text("echo old\n")
+    os.chmod(script, 0o750)
+    assert write_file(str(script), "echo new\n") is True
+    assert read(script) == "echo new\n"
+    assert os.stat(script).st_mode & 0o7777 == 0o750
+
+
+def test_symlink_is_kept_and_its_target_written(tmp_path):
+    (tmp_path / "real").mkdir()
+    target = tmp_path / "real" / "config.py"
+    target.write_text("old")
+    link = tmp_path / "config.py"
+    link.symlink_to(target)
+    assert write_file(str(link), "new") is True
+    assert link.is_symlink()
+    assert read(target) == "new"
+    assert sorted(os.listdir(tmp_path / "real")) == ["config.py"]
+
+
+def test_failed_commit_restores_everything(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("a")
+    transaction = FileTransaction()
+    transaction.add(str(tmp_path / "a.txt"), "A")
+    transaction.add(str(tmp_path / "b.txt"), "B")
+    transaction.add(str(tmp_path / "sub" / "c.txt"), "C")
+
+    replace = os.replace
+
+    def failing_replace(src, dst):
+        if str(dst).endswith("c.txt"):
+            raise OSError("disk full")
+        replace(src, dst)
+
+    monkeypatch.setattr(file_transaction.os, "replace", failing_replace)
+    with pytest.raises(OSError, match="disk full"):
+        transaction.commit()
+    monkeypatch.undo()
+    assert sorted(os.listdir(tmp_path)) == ["a.txt"]
+    assert read(tmp_path / "a.txt") == "a"
+
+
+def test_refuses_to_replace_a_directory(tmp_path):
+    (tmp_path / "dir").mkdir()
+    with pytest.raises(IsADirectoryError):
+        write_file(str(tmp_path / "dir"), "x")
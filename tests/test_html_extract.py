@@ -0,0 +1,130 @@
+# tests/test_html_extract.py
+import asyncio
+
+import pytest
+
+from utils.html_extract import HtmlTextExtractor, etree, extract_document, extract_text
+from utils.page_cache import PageCache
+
+BACKENDS = ["html.parser", pytest.param("lxml", marks=pytest.mark.skipif(etree is None, reason="lxml not installed"))]
+
+PAGE = b"""<html><head><title>The  Title</title><script>var x = 1;</script></head>
+<body><nav><a href="/">Home</a></nav>
+<div role="navigation"><p>menu</p><div>nested <div>deeper</div></div></div>
+<p>First   paragraph</p><p>Second <b>bold</b> paragraph</p>
+<footer>Copyright</footer></body></html>"""
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, n: int):
+        for start in range(0, len(self.body), n):
+            yield self.body[start:start + n]
+
+
+class FakeResponse:
+    charset = "utf-8"
+
+    def __init__(self, body: bytes):
+        self.content = FakeContent(body)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_extracts_title_and_blocks_without_boilerplate(backend):
+    page = extract_text(PAGE, backend=backend)
+    assert page["title"] == "The Title"
+    assert page["text"] == "First paragraph\nSecond bold paragraph"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("tag", [
+    '<img aria-hidden="true" src="x.png">',
+    '<input role="search" name="q">',
+    '<link role="navigation" href="/">',
+    '<img aria-hidden="true" src="x.png"/>',
+])
+def test_skipped_void_element_does_not_hide_the_rest_of_the_page(backend, tag):
+    html = f"<body><p>Before</p>{tag}<p>After</p></body>".encode()
+    assert extract_text(html, backend=backend)["text"] == "Before\nAfter"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_chunk_boundaries_do_not_change_the_text(backend):
+    html = "<p>Grüße aus Köln</p>".encode("utf-8") * 50
+    whole = extract_text(html, backend=backend)["text"]
+    assert extract_text(html, chunk_size=7, backend=backend)["text"] == whole
+    assert whole.splitlines()[0] == "Grüße aus Köln"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_headers_and_forms_inside_the_content_are_kept(backend):
+    html = b"""<body><header>Site banner</header><main><article>
+<header><h1>Article title</h1></header><p>Body</p>
+<form><p>Enter your name</p><button>Send</button></form>
+</article></main><header>Trailing banner</header></body>"""
+    assert extract_text(html, backend=backend)["text"] == "Article title\nBody\nEnter your name"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("head", [
+    b'<meta charset="windows-1252">',
+    b"<meta http-equiv='Content-Type' content='text/html; charset=ISO-8859-1'>",
+])
+def test_charset_is_sniffed_from_meta_when_the_response_has_none(backend, head):
+    html = b"<html><head>" + head + "</head><body><p>Caf\xe9 cr\xe8me</p></body></html>".encode("latin-1")
+    assert extract_text(html, backend=backend)["text"] == "Café crème"
+    assert extract_text(html, encoding="utf-8", backend="html.parser")["text"] != "Café crème"
+
+
+def test_sniffing_falls_back_to_utf8():
+    html = "<p>Grüße</p>".encode("utf-8")
+    assert extract_text(html, backend="html.parser")["text"] == "Grüße"
+    assert extract_text(b'<meta charset="nonsense"><p>x</p>', backend="html.parser")["text"] == "x"
+    assert extract_text(b'<meta charset="utf-16"><p>x</p>', backend="html.parser")["text"] == "x"
+
+
+def test_blocks_are_returned_as_they_complete():
+    extractor = HtmlTextExtractor(backend="html.parser")
+    assert extractor.feed(b"<p>one</p><p>tw") == ["one"]
+    assert extractor.feed(b"o</p>") == ["two"]
+    assert extractor.close() == []
+
+
+def test_extract_document_caps_the_body():
+    body = b"<p>" + b"a" * 1000 + b"</p>"
+    page = asyncio.run(extract_document(FakeResponse(body), max_bytes=100, chunk_size=64))
+    assert page["truncated"] is True
+    assert page["text"] == "a" * 97
+    assert page["digest"] == PageCache.digest(body[:100])
+
+
+def test_page_cache_shares_text_and_revalidates(tmp_path):
+    cache = PageCache(str(tmp_path), max_entries=2)
+    try:
+        digest = PageCache.digest(b"<p>same</p>")
+        assert cache.store("https://a.example/", digest, "A", "same", etag='"v1"') == digest
+        cache.store("https://b.example/", digest, "B", "same")
+
+        entry = cache.lookup("https://a.example/")
+        assert entry["pageContent"] == "same"
+        assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+        assert cache.lookup("https://missing.example/") is None
+
+        cache.mark_revalidated("https://a.example/")
+        other = PageCache.digest(b"<p>other</p>")
+        cache.store("https://c.example/", other, "C", "other")
+        # b was least recently used; its text is still referenced by a
+        assert cache.lookup("https://b.example/") is None
+        assert cache.lookup("https://a.example/")["pageContent"] == "same"
+        assert cache.db.execute("SELECT COUNT(*) FROM extracted").fetchone()[0] == 2
+
+        # Evicting a, the last URL with that digest, drops its text too
+        cache.mark_revalidated("https://c.example/")
+        cache.store("https://d.example/", other, "D", "other")
+        assert cache.lookup("https://a.example/") is None
+        assert cache.db.execute("SELECT COUNT(*) FROM extracted").fetchone()[0] == 1
+        assert cache.stats() == {"revalidated": 2, "stored": 4}
+    finally:
+        cache.close()
@@ -0,0 +1,111 @@
+# tests/test_http_client.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("dotenv")
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from utils.http_client import HttpClient  # noqa: E402
+
+
+async def serve():
+    # Answers with the client port of the connection, so reuse is visible
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(text=str(request.transport.get_extra_info("peername")[1]))
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+async def fetch(client: HttpClient, url: str) -> str:
+    async with client.request("GET", url) as response:
+        return await response.text()
+
+
+def test_requests_share_one_session_and_connection():
+    async def main():
+        server = await serve()
+        url = str(server.make_url("/"))
+        try:
+            async with HttpClient() as client:
+                session = await client.get_session()
+                ports = [await fetch(client, url) for _ in range(3)]
+                ports += await asyncio.gather(*[fetch(client, url) for _ in range(3)])
+                assert await client.get_session() is session
+                return ports
+        finally:
+            await server.close()
+
+    ports = asyncio.run(main())
+    # Sequential requests reuse the kept-alive connection; concurrent ones open at most one each
+    assert len(set(ports[:3])) == 1
+    assert len(set(ports)) <= 3
+
+
+def test_pool_is_sized_from_settings(tmp_path):
+    from config.settings import Settings
+    path = tmp_path / "settings.yml"
+    path.write_text(
+        "outgoing:\n  pool_connections: 7\n  pool_maxsize: 3\n  max_request_timeout: 2.5\n"
+        "search:\n  ban_time_on_fail: 9\n  max_ban_time_on_fail: 90\n"
+    )
+    settings = Settings(str(path))
+    client = HttpClient.from_settings(settings.get("outgoing", {}), settings.get("search", {}))
+
+    async def main():
+        session = await client.get_session()
+        try:
+            return session.connector.limit, session.connector.limit_per_host, session.timeout.total
+        finally:
+            await client.close()
+
+    assert asyncio.run(main()) == (7, 3, 2.5)
+    assert (client.ban_time, client.max_ban_time) == (9, 90)
+
+
+def test_defaults_when_settings_are_missing():
+    client = HttpClient.from_settings({})
+    assert (client.pool_connections, client.pool_maxsize, client.request_timeout) == (100, 20, None)
+
+
+def test_close_and_context_manager_close_the_session():
+    async def main():
+        async with HttpClient() as client:
+            session = await client.get_session()
+            assert not client.closed
+        assert session.closed and client.closed
+
+        client = HttpClient()
+        session = await client.get_session()
+        await client.close()
+        await client.close()  # closing twice is harmless
+        return session.closed, client.closed
+
+    assert asyncio.run(main()) == (True, True)
+
+
+def test_session_is_rebuilt_after_close():
+    async def main():
+        server = await serve()
+        url = str(server.make_url("/"))
+        client = HttpClient()
+        try:
+            first = await client.get_session()
+            await fetch(client, url)
+            await client.close()
+            assert await fetch(client, url)
+            second = await client.get_session()
+            assert second is not first and not second.closed
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(main())
+
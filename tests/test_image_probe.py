@@ -0,0 +1,76 @@
+# tests/test_image_probe.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("dotenv")
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from utils.cache import TieredCache  # noqa: E402
+from utils.http_client import HttpClient  # noqa: E402
+from utils.image_probe import ImageValidator  # noqa: E402
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 56
+
+
+async def serve():
+    async def split_png(request: web.Request) -> web.StreamResponse:
+        # No image Content-Type, and the signature arrives in two writes
+        response = web.StreamResponse(headers={"Content-Type": "application/octet-stream"})
+        await response.prepare(request)
+        await response.write(PNG[:3])
+        await asyncio.sleep(0.05)
+        await response.write(PNG[3:])
+        await response.write_eof()
+        return response
+
+    async def missing(request: web.Request) -> web.Response:
+        return web.Response(status=404)
+
+    app = web.Application()
+    # HEAD is answered with 405, which sends the validator to the Range probe
+    app.router.add_get("/split.png", split_png, allow_head=False)
+    app.router.add_get("/missing.png", missing)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def test_range_probe_waits_for_the_whole_signature():
+    async def main():
+        server = await serve()
+        try:
+            async with HttpClient() as client:
+                return await ImageValidator(client).validate(str(server.make_url("/split.png")))
+        finally:
+            await server.close()
+
+    result = asyncio.run(main())
+    assert result["valid"] and result["format"] == "png"
+    assert result["method"] == "GET range"
+
+
+def test_invalid_verdicts_go_to_the_short_lived_cache():
+    cache = TieredCache(None, ttl=3600)
+    invalid_cache = TieredCache(None, ttl=3600)
+
+    async def main():
+        server = await serve()
+        try:
+            async with HttpClient() as client:
+                validator = ImageValidator(client, cache, invalid_cache=invalid_cache)
+                ok = await validator.validate(str(server.make_url("/split.png")))
+                missing = str(server.make_url("/missing.png"))
+                first = await validator.validate(missing)
+                assert await validator.validate(missing) == first
+                return ok, first, missing
+        finally:
+            await server.close()
+
+    ok, missing_verdict, missing = asyncio.run(main())
+    assert not missing_verdict["valid"] and missing_verdict["reason"] == "HTTP 404"
+    assert cache.get(ok["url"]) == ok and cache.get(missing) is None
+    assert invalid_cache.get(missing) == missing_verdict and invalid_cache.get(ok["url"]) is None
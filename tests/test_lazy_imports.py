@@ -0,0 +1,54 @@
+# tests/test_lazy_imports.py
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = {"litellm", "agency_swarm", "aiohttp", "openai", "astra_assistants", "prompt_toolkit"}
+
+
+def imported_after(statement: str):
+    # A fresh interpreter per check, so modules imported by other tests do not count
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, json\n{statement}\nprint(json.dumps(sorted(sys.modules)))"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return set(json.loads(result.stdout.splitlines()[-1])) & HEAVY
+
+
+def test_main_imports_no_heavy_dependencies():
+    assert imported_after("import main") == set()
+
+
+requires_agency_swarm = pytest.mark.skipif(importlib.util.find_spec("agency_swarm") is None,
+                                           reason="agency_swarm not installed")
+
+
+@pytest.fixture(scope="module")
+def agency_swarm_imports():
+    # The agents subclass agency_swarm's Agent and BaseTool, so whatever agency_swarm
+    # loads itself (openai, for one) is not the agents' doing
+    return imported_after("import agency_swarm")
+
+
+@requires_agency_swarm
+@pytest.mark.parametrize("module,allowed", [
+    ("agent.senior_developer", set()),
+    ("agent.planner_agent", set()),
+    ("agent.suggester_agent", set()),
+    # The browsing agent holds the pooled aiohttp session and catches its errors
+    ("agent.browsing_agent", {"aiohttp"}),
+])
+def test_agents_defer_llm_and_client_imports(module, allowed, agency_swarm_imports):
+    assert imported_after(f"import {module}") - agency_swarm_imports <= allowed
+
+
+@requires_agency_swarm
+def test_senior_developer_is_built_on_first_use(agency_swarm_imports):
+    statement = "import agent.senior_developer as s\nassert s.senior_developer is None"
+    assert imported_after(statement) - agency_swarm_imports == set()
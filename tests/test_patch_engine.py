@@ -0,0 +1,100 @@
+# tests/test_patch_engine.py
+import difflib
+import os
+import random
+
+import pytest
+
+from utils.patch_engine import AnchoredEdit, PatchError, parse_unified_diff, patch_file
+
+ORIGINAL = "".join(f"line {i}\n" for i in range(1, 11))
+
+
+def unified_diff(old: str, new: str, context: int) -> str:
+    return "".join(difflib.unified_diff(old.splitlines(True), new.splitlines(True), "a", "b", n=context))
+
+
+def write(tmp_path, text: str, newline: str = "\n") -> str:
+    path = tmp_path / "file.txt"
+    path.write_bytes(text.replace("\n", newline).encode())
+    return str(path)
+
+
+@pytest.mark.parametrize("context", [0, 3])
+def test_insert_after_line(tmp_path, context):
+    new = ORIGINAL.replace("line 5\n", "line 5\ninserted\n")
+    diff = unified_diff(ORIGINAL, new, context)
+    if context == 0:
+        assert "@@ -5,0 +6 @@" in diff
+    path = write(tmp_path, ORIGINAL)
+    patch_file(path, hunks=parse_unified_diff(diff))
+    assert open(path).read() == new
+
+
+def test_insert_at_start_of_file_with_zero_context(tmp_path):
+    new = "first\n" + ORIGINAL
+    diff = unified_diff(ORIGINAL, new, 0)
+    assert "@@ -0,0 +1 @@" in diff
+    path = write(tmp_path, ORIGINAL)
+    patch_file(path, hunks=parse_unified_diff(diff))
+    assert open(path).read() == new
+
+
+@pytest.mark.parametrize("context", [0, 1, 3])
+def test_random_edits_round_trip(tmp_path, context):
+    rng = random.Random(context)
+    for _ in range(50):
+        lines = ORIGINAL.splitlines(True)
+        for _ in range(rng.randint(1, 4)):
+            i = rng.randrange(len(lines) + 1)
+            action = rng.choice(["insert", "delete", "replace"])
+            if action == "insert" or i == len(lines):
+                lines.insert(i, f"new {rng.random()}\n")
+            elif action == "delete":
+                del lines[i]
+            else:
+                lines[i] = f"changed {rng.random()}\n"
+        new = "".join(lines)
+        if new == ORIGINAL:
+            continue
+        path = write(tmp_path, ORIGINAL)
+        patch_file(path, hunks=parse_unified_diff(unified_diff(ORIGINAL, new, context)))
+        assert open(path).read() == new
+
+
+def test_crlf_line_endings_are_kept(tmp_path):
+    new = ORIGINAL.replace("line 3\n", "line three\n")
+    path = write(tmp_path, ORIGINAL, "\r\n")
+    patch_file(path, hunks=parse_unified_diff(unified_diff(ORIGINAL, new, 3)))
+    assert open(path, "rb").read() == new.replace("\n", "\r\n").encode()
+
+
+def test_context_mismatch_leaves_file_untouched(tmp_path):
+    diff = unified_diff(ORIGINAL.replace("line 4\n", "line four\n"), ORIGINAL.replace("line 4\n", "line 4!\n"), 3)
+    path = write(tmp_path, ORIGINAL)
+    os.chmod(path, 0o755)
+    with pytest.raises(PatchError, match="Context mismatch at line 4"):
+        patch_file(path, hunks=parse_unified_diff(diff))
+    assert open(path).read() == ORIGINAL
+    assert os.listdir(tmp_path) == ["file.txt"]
+
+
+def test_overlapping_hunks_are_rejected():
+    diff = "@@ -2,2 +2,2 @@\n-line 2\n+two\n line 3\n@@ -3,1 +3,1 @@\n-line 3\n+three\n"
+    with pytest.raises(PatchError, match="Overlapping"):
+        parse_unified_diff(diff)
+
+
+def test_anchored_edits(tmp_path):
+    path = write(tmp_path, ORIGINAL)
+    os.chmod(path, 0o755)
+    patch_file(path, edits=[
+        AnchoredEdit("line 2", "between", end_marker="line 5"),
+        AnchoredEdit("line 9", "nine"),
+    ])
+    assert open(path).read().splitlines() == [
+        "line 1", "line 2", "between", "line 5", "line 6", "line 7", "line 8", "nine", "line 10"
+    ]
+    assert os.stat(path).st_mode & 0o777 == 0o755
+    with pytest.raises(PatchError, match="not found"):
+        patch_file(path, edits=[AnchoredEdit("missing", "x")])
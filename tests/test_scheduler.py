@@ -0,0 +1,72 @@
+# tests/test_scheduler.py
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip("pydantic")
+# dev_agency_template modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dev_agency_template"))
+
+from models import CodeFile, Plan, Task  # noqa: E402
+from scheduler import TaskScheduler  # noqa: E402
+
+
+def task(task_id: str, depends_on: str = "") -> Task:
+    details = {"depends_on": depends_on} if depends_on else {}
+    return Task(task_id=task_id, description=f"Task {task_id}", functions=[], details=details)
+
+
+class FakeDeveloper:
+    def __init__(self, failing=(), log=None):
+        self.memory = {}
+        self.failing = set(failing)
+        self.log = log if log is not None else []
+        self.lock = threading.Lock()
+
+    def work_on_task(self, task: Task) -> CodeFile:
+        with self.lock:
+            self.log.append(task.task_id)
+        if task.task_id in self.failing:
+            raise RuntimeError(f"{task.task_id} failed")
+        return CodeFile(file_name=f"{task.task_id}.py", code="", task_id=task.task_id)
+
+
+def run(plan: Plan, developers, **kwargs):
+    scheduler = TaskScheduler(plan, developers, retry_delay=0, **kwargs)
+    files = asyncio.run(asyncio.wait_for(scheduler.run(), timeout=5))
+    return scheduler, [code_file.file_name for code_file in files]
+
+
+def test_dependencies_finish_before_their_dependents():
+    log = []
+    plan = Plan(project_name="p", tasks=[task("c", "a, b"), task("a"), task("b", "a")])
+    scheduler, files = run(plan, [FakeDeveloper(log=log), FakeDeveloper(log=log)])
+    assert files == ["a.py", "b.py", "c.py"]
+    assert log == ["a", "b", "c"]
+    assert scheduler.failures == {}
+
+
+def test_duplicate_task_ids_are_scheduled_once():
+    plan = Plan(project_name="p", tasks=[task("a"), task("b", "a"), task("a")])
+    _, files = run(plan, [FakeDeveloper(), FakeDeveloper()])
+    assert files == ["a.py", "b.py"]
+
+
+def test_failed_task_skips_its_dependents_without_hanging():
+    log = []
+    plan = Plan(project_name="p", tasks=[task("a"), task("b", "a"), task("bad"), task("c", "bad, b"), task("a")])
+    scheduler, files = run(plan, [FakeDeveloper({"bad"}, log)], max_retries=1)
+    assert sorted(files) == ["a.py", "b.py"]
+    assert log.count("bad") == 2
+    assert "c" not in log
+    assert scheduler.failures["bad"].attempts == 2
+    assert scheduler.failures["c"].error == "Dependency bad failed"
+
+
+def test_dependency_cycle_is_rejected():
+    plan = Plan(project_name="p", tasks=[task("a", "b"), task("b", "a")])
+    with pytest.raises(ValueError, match="cycle"):
+        TaskScheduler(plan, [FakeDeveloper()])
@@ -0,0 +1,88 @@
+# tests/test_search_fanout.py
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("dotenv")
+
+from utils.search_fanout import (  # noqa: E402
+    ProviderStats, SearchFanout, SearchProvider, canonical_url, result_dict
+)
+
+
+class StaticProvider(SearchProvider):
+    """Returns fixed results after `delay` seconds, or raises `error`."""
+
+    def __init__(self, name: str, urls: List[str], delay: float = 0.0, error: Optional[Exception] = None):
+        self.name = name
+        self.results = [{"title": url, "url": url, "content": f"{name} snippet"} for url in urls]
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def search(self, query: str, opts: Any = None) -> Dict[str, Any]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"results": [result_dict(result) for result in self.results], "suggestions": [f"{self.name} hint"]}
+
+
+def search(fanout: SearchFanout, **kwargs) -> Dict[str, Any]:
+    return asyncio.run(fanout.search("query", **kwargs))
+
+
+def test_provider_must_implement_search():
+    with pytest.raises(TypeError):
+        SearchProvider()
+
+
+def test_canonical_url_ignores_cosmetic_differences():
+    assert canonical_url("https://www.Example.com:443/a/?utm_source=x&b=2&a=1#top") == \
+        canonical_url("http://example.com/a?a=1&b=2&fbclid=y")
+    assert canonical_url("https://example.com/a") != canonical_url("https://example.com/b")
+
+
+def test_results_are_merged_and_ranked_by_agreement():
+    fanout = SearchFanout([
+        StaticProvider("one", ["https://a.example/", "https://b.example/"]),
+        StaticProvider("two", ["https://www.b.example", "https://c.example/"], delay=0.01),
+    ], quorum=10, deadline=1.0)
+    data = search(fanout)
+    assert [result["url"] for result in data["results"]] == [
+        "https://b.example/", "https://a.example/", "https://c.example/"
+    ]
+    assert data["results"][0]["engines"] == ["one", "two"]
+    assert data["suggestions"] == ["one hint", "two hint"]
+    assert "error" not in data
+
+
+def test_quorum_returns_without_waiting_for_slow_providers():
+    slow = StaticProvider("slow", ["https://slow.example/"], delay=5.0)
+    fanout = SearchFanout([StaticProvider("fast", ["https://a.example/", "https://b.example/"]), slow],
+                          quorum=2, deadline=5.0)
+    data = search(fanout)
+    assert data["duration"] < 1.0
+    assert data["providers"]["slow"] == "cancelled (quorum reached)"
+    # Cancelled for the quorum, not failed: the slow provider is still queried next time
+    assert fanout.provider_stats["slow"].demoted_until == 0.0
+
+
+def test_failing_and_late_providers_are_demoted_then_retried_when_all_are():
+    broken = StaticProvider("broken", [], error=RuntimeError("503"))
+    late = StaticProvider("late", ["https://late.example/"], delay=1.0)
+    fanout = SearchFanout([broken, late], quorum=5, deadline=0.1, demote_time=60)
+    data = search(fanout)
+    assert data["providers"] == {"broken": "error: 503", "late": "deadline"}
+    assert data["error"].startswith("broken: error: 503")
+
+    # Both are demoted, so both are queried anyway
+    search(fanout)
+    assert (broken.calls, late.calls) == (2, 2)
+
+    healthy = StaticProvider("healthy", ["https://ok.example/"])
+    fanout.providers.append(healthy)
+    fanout.provider_stats["healthy"] = ProviderStats()
+    assert [p.name for p in fanout.active_providers()] == ["healthy"]
@@ -0,0 +1,78 @@
+# tests/test_server.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from server import AgencyHandlers  # noqa: E402
+from utils.sessions import Session  # noqa: E402
+
+
+class FakeAgency:
+    def __init__(self):
+        self.calls = []
+        self.running = 0
+        self.overlapped = False
+        self.lock = threading.Lock()
+
+    def get_completion(self, message, recipient_agent=None, additional_instructions=None):
+        with self.lock:
+            self.running += 1
+            self.overlapped |= self.running > 1
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+            self.calls.append((message, additional_instructions))
+        return f"plan for {message}"
+
+
+def handlers_with(agency: FakeAgency) -> AgencyHandlers:
+    handlers = AgencyHandlers()
+    handlers.agents = {"planner_agency": agency, "planner": object()}
+    return handlers
+
+
+def test_plan_requests_take_turns_on_the_shared_agency():
+    agency = FakeAgency()
+    handlers = handlers_with(agency)
+    sessions = [Session(f"s{i}") for i in range(3)]
+
+    async def main():
+        return await asyncio.gather(*[handlers.plan(session, session.session_id, None) for session in sessions])
+
+    assert asyncio.run(main()) == ["plan for s0", "plan for s1", "plan for s2"]
+    assert not agency.overlapped
+
+
+def test_plan_passes_the_session_history():
+    agency = FakeAgency()
+    handlers = handlers_with(agency)
+    session = Session("s")
+    asyncio.run(handlers.plan(session, "first", None))
+    session.add_turn("first", "plan for first")
+    asyncio.run(handlers.plan(session, "second", None))
+
+    assert agency.calls[0] == ("first", None)
+    message, instructions = agency.calls[1]
+    assert message == "second"
+    assert "User: first" in instructions and "Assistant: plan for first" in instructions
+
+
+def test_cancelled_plan_keeps_the_agency_until_its_thread_ends():
+    agency = FakeAgency()
+    handlers = handlers_with(agency)
+
+    async def main():
+        first = asyncio.ensure_future(handlers.plan(Session("a"), "a", None))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await handlers.plan(Session("b"), "b", None)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
+    assert not agency.overlapped
+    assert [message for message, _ in agency.calls] == ["a", "b"]
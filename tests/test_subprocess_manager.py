@@ -0,0 +1,54 @@
+# tests/test_subprocess_manager.py
+import asyncio
+import sys
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from utils.subprocess_manager import InstallCache, SubprocessManager  # noqa: E402
+
+
+def key(tmp_path, content: str, **files) -> str:
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    (tmp_path / "requirements.txt").write_text(content)
+    return InstallCache.key(str(tmp_path / "requirements.txt"), sys.executable)
+
+
+def test_key_ignores_comments_whitespace_and_order(tmp_path):
+    assert key(tmp_path, "aiohttp\nlitellm==1.0\n") == \
+        key(tmp_path, "# deps\n  litellm==1.0   # pinned\n\naiohttp\n")
+
+
+def test_key_keeps_url_fragments(tmp_path):
+    one = key(tmp_path, "pkg @ https://example.com/pkg.zip#sha256=aaa\n")
+    two = key(tmp_path, "pkg @ https://example.com/pkg.zip#sha256=bbb\n")
+    assert one != two
+    assert key(tmp_path, "git+https://example.com/a.git#egg=a\n") != key(tmp_path, "git+https://example.com/a.git#egg=b\n")
+
+
+def test_key_follows_nested_requirement_and_constraint_files(tmp_path):
+    (tmp_path / "sub").mkdir()
+    before = key(tmp_path, "-r base.txt\n--constraint=sub/pins.txt\n",
+                 **{"base.txt": "aiohttp\n-r sub/extra.txt\n", "sub/extra.txt": "lxml\n", "sub/pins.txt": "lxml<6\n"})
+    # Nested paths resolve relative to the including file
+    assert InstallCache.requirement_lines(str(tmp_path / "requirements.txt")) == ["aiohttp", "lxml", "-c lxml<6"]
+    (tmp_path / "sub" / "extra.txt").write_text("lxml\nhttpx\n")
+    assert InstallCache.key(str(tmp_path / "requirements.txt"), sys.executable) != before
+    (tmp_path / "sub" / "extra.txt").write_text("lxml\n")
+    (tmp_path / "sub" / "pins.txt").write_text("lxml<5\n")
+    assert InstallCache.key(str(tmp_path / "requirements.txt"), sys.executable) != before
+
+
+def test_key_survives_include_cycles(tmp_path):
+    key(tmp_path, "-ra.txt\nflask\n", **{"a.txt": "-r requirements.txt\nrequests\n"})
+    assert sorted(InstallCache.requirement_lines(str(tmp_path / "requirements.txt"))) == ["flask", "requests"]
+
+
+def test_run_reports_exit_code_and_timeout():
+    manager = SubprocessManager()
+    result = asyncio.run(manager.run([sys.executable, "-c", "import sys; print('out'); sys.exit(3)"], on_output=None))
+    assert (result.returncode, result.stdout, result.ok) == (3, ["out"], False)
+    result = asyncio.run(manager.run([sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2, on_output=None))
+    assert result.timed_out and not result.ok
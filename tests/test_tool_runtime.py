@@ -0,0 +1,106 @@
+# tests/test_tool_runtime.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from utils.tool_runtime import ToolRuntime  # noqa: E402
+from utils.tracing import Tracer, current_span, span  # noqa: E402
+
+
+class Tool:
+    def __init__(self, **kwargs):
+        if "bad" in kwargs:
+            raise ValueError("bad argument")
+        self.kwargs = kwargs
+
+
+class SleepTool(Tool):
+    def run(self):
+        time.sleep(self.kwargs.get("seconds", 0))
+        return threading.current_thread().name
+
+
+class AsyncTool(Tool):
+    async def run(self):
+        await asyncio.sleep(self.kwargs.get("seconds", 0))
+        return threading.current_thread().name
+
+
+class FailingTool(Tool):
+    def run(self):
+        raise RuntimeError("tool crashed")
+
+
+class SpanTool(Tool):
+    def run(self):
+        with span("inside") as s:
+            return s.parent.name if s.parent else None
+
+
+@pytest.fixture
+def runtime():
+    runtime = ToolRuntime([SleepTool, AsyncTool, FailingTool, SpanTool], max_workers=4, timeout=2.0,
+                          timeouts={"AsyncTool": 0.1})
+    yield runtime
+    runtime.shutdown()
+
+
+def test_blocking_tools_run_off_the_loop_and_async_tools_on_it(runtime):
+    async def main():
+        return await runtime.run("SleepTool"), await runtime.run("AsyncTool")
+
+    blocking, awaited = asyncio.run(main())
+    assert blocking.startswith("tool")
+    assert awaited == "MainThread"
+
+
+def test_errors_are_returned_as_messages(runtime):
+    async def main():
+        return [
+            await runtime.run("MissingTool"),
+            await runtime.run("SleepTool", bad=True),
+            await runtime.run("AsyncTool", seconds=1),
+        ]
+
+    assert asyncio.run(main()) == [
+        "Error: Unknown tool 'MissingTool'.",
+        "Error: Invalid arguments for SleepTool: bad argument",
+        "Error: AsyncTool timed out after 0.1 seconds.",
+    ]
+
+
+def test_run_many_is_concurrent_and_keeps_call_order(runtime):
+    calls = [("SleepTool", {"seconds": 0.2}) for _ in range(4)] + [("FailingTool", {})]
+    start = time.perf_counter()
+    results = asyncio.run(runtime.run_many(calls))
+    assert time.perf_counter() - start < 0.6
+    assert all(result.startswith("tool") for result in results[:4])
+    assert results[4] == "Error: tool crashed"
+
+
+def test_cancel_all_stops_waiting_for_tools_in_flight(runtime):
+    async def main():
+        call = asyncio.ensure_future(runtime.run("AsyncTool", seconds=1, timeout=5))
+        await asyncio.sleep(0.05)
+        assert runtime.cancel_all() == 1
+        return await call
+
+    assert asyncio.run(main()) == "Error: AsyncTool was cancelled."
+
+
+def test_spans_inside_blocking_tools_nest_under_the_tool_span(runtime, monkeypatch):
+    from utils import tracing
+    tracer = Tracer()
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+
+    async def main():
+        with span("caller"):
+            return await runtime.run("SpanTool")
+
+    assert asyncio.run(main()) == "tool.run"
+    assert [s.name for s in tracer.last_trace()] == ["inside", "tool.run", "caller"]
+    assert current_span.get() is None
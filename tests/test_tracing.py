@@ -0,0 +1,34 @@
+# tests/test_tracing.py
+import json
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from utils.tracing import Tracer, trace_report  # noqa: E402
+
+
+def test_trace_file_is_rotated_past_max_bytes(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(str(path), max_bytes=1)
+    for name in ["first", "second", "third"]:
+        with tracer.span(name):
+            pass
+
+    def names(file):
+        return [json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"]
+                for line in file.read_text().splitlines()]
+
+    assert names(path) == ["third"]
+    assert names(tmp_path / "spans.jsonl.1") == ["second"]
+
+
+def test_trace_report_shows_the_last_trace():
+    tracer = Tracer(None, keep=2)
+    assert trace_report(tracer=tracer) == "No traced command yet."
+    with tracer.span("command", command="/plan x"):
+        with tracer.span("llm"):
+            pass
+    report = trace_report(tracer=tracer)
+    assert report.splitlines()[0].endswith(": /plan x")
+    assert "llm  (in command)" in report
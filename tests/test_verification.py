@@ -0,0 +1,55 @@
+# tests/test_verification.py
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pydantic")
+# dev_agency_template modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dev_agency_template"))
+
+from models import CodeFile  # noqa: E402
+from verification import VerificationEngine, check_file  # noqa: E402
+
+
+def test_missing_third_party_module_is_a_warning():
+    result = check_file("app.py", "import surely_not_installed_pkg\n\nsurely_not_installed_pkg.run()\n", [])
+    assert result["ok"]
+    assert result["errors"] == []
+    assert any("surely_not_installed_pkg" in warning for warning in result["warnings"])
+
+
+def test_local_and_relative_imports_are_checked_against_the_submission():
+    local = ["app", "helpers"]
+    assert check_file("app.py", "from . import helpers\nfrom .helpers import f\nimport helpers\n", local)["errors"] == []
+
+    result = check_file("app.py", "from .missing import f\nfrom . import gone\n", local)
+    assert not result["ok"]
+    assert len(result["errors"]) == 2
+    assert "'missing'" in result["errors"][0] and "'gone'" in result["errors"][1]
+
+
+def test_syntax_error_is_an_error():
+    result = check_file("app.py", "def broken(:\n", [])
+    assert not result["ok"]
+    assert result["errors"][0].startswith("SyntaxError")
+
+
+def test_close_stops_the_process_pool():
+    engine = VerificationEngine(max_workers=1)
+    files = [CodeFile(file_name="a.py", code="x = 1\n", task_id="a")]
+    report = asyncio.run(engine.verify(files))
+    assert report["ok"]
+    executor = engine.executor
+    assert executor is not None
+
+    engine.close()
+    assert engine.executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+    # The next check starts a new pool
+    engine.cache.clear()
+    assert asyncio.run(engine.verify(files))["ok"]
+    engine.close()
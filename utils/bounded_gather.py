@@ -0,0 +1,66 @@
+# utils/bounded_gather.py
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class GatherOutcome:
+    """Result of one item: `ok` with `result`, or dropped with a `reason`."""
+
+    def __init__(self, item: Any, result: Any = None, reason: Optional[str] = None, duration: float = 0.0):
+        self.item = item
+        self.result = result
+        self.reason = reason
+        self.duration = duration
+
+    @property
+    def ok(self) -> bool:
+        return self.reason is None
+
+
+async def gather_bounded(items: List[Any], worker: Callable[[Any], Awaitable[Any]], max_in_flight: int = 4,
+                         deadline: Optional[float] = None) -> List[GatherOutcome]:
+    """
+    Run `worker(item)` for every item with at most `max_in_flight` running at once.
+
+    Unlike a bare asyncio.gather, one failing item never fails the others (its
+    exception becomes the outcome's reason), and after `deadline` seconds the
+    remaining items are cancelled and reported as dropped, so the caller can
+    carry on with partial results. Outcomes are returned in item order.
+    """
+    semaphore = asyncio.Semaphore(max_in_flight)
+    started: Dict[int, float] = {}
+    outcomes: List[Optional[GatherOutcome]] = [None] * len(items)
+
+    async def run(index: int, item: Any):
+        async with semaphore:
+            started[index] = time.perf_counter()
+            try:
+                result = await worker(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                outcomes[index] = GatherOutcome(item, reason=f"{type(e).__name__}: {e}",
+                                                duration=time.perf_counter() - started[index])
+                return
+            outcomes[index] = GatherOutcome(item, result, duration=time.perf_counter() - started[index])
+
+    tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)]
+    if not tasks:
+        return []
+    _, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    now = time.perf_counter()
+    for index, item in enumerate(items):
+        if outcomes[index] is None:
+            if index in started:
+                outcomes[index] = GatherOutcome(item, reason=f"deadline of {deadline}s reached while in flight",
+                                                duration=now - started[index])
+            else:
+                outcomes[index] = GatherOutcome(item, reason=f"deadline of {deadline}s reached before start")
+    return outcomes
@@ -0,0 +1,142 @@
+# utils/cache.py
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class TieredCache:
+    """
+    Two-tier key/value cache: an in-memory LRU in front of an SQLite table.
+
+    Values must be JSON serializable. Entries older than `ttl` seconds are treated
+    as missing and removed on access. Both tiers are size capped and evict the
+    least recently used entries first, so the disk tier survives restarts without
+    growing unbounded.
+
+    Args:
+        path (str): Path of the SQLite database file, or None for a memory-only cache.
+        table (str): Table name, so several caches can share one database file.
+        ttl (float): Seconds an entry stays valid, None to never expire.
+        memory_size (int): Maximum number of entries kept in memory.
+        disk_size (int): Maximum number of entries kept on disk.
+    """
+
+    def __init__(self, path: Optional[str], table: str = "cache", ttl: Optional[float] = 3600,
+                 memory_size: int = 256, disk_size: int = 10000):
+        self.table = table
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.db = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self.db.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed)")
+            self.db.commit()
+
+    def expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self.expired(created, now):
+                    self.memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.memory[key]
+
+            if self.db is not None:
+                row = self.db.execute(
+                    f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created = json.loads(row[0]), row[1]
+                    if not self.expired(created, now):
+                        self.db.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+                        self.db.commit()
+                        self.remember(key, value, created)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return value
+                    self.db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self.db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self.lock:
+            self.remember(key, value, now)
+            if self.db is not None:
+                self.db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+                self.evict_disk()
+                self.db.commit()
+
+    def delete(self, key: str):
+        with self.lock:
+            self.memory.pop(key, None)
+            if self.db is not None:
+                self.db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.db.commit()
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            if self.db is not None:
+                self.db.execute(f"DELETE FROM {self.table}")
+                self.db.commit()
+
+    def remember(self, key: str, value: Any, created: float):
+        self.memory[key] = (value, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def evict_disk(self):
+        count = self.db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if count > self.disk_size:
+            self.db.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed ASC LIMIT ?)",
+                (count - self.disk_size,)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.hits - self.disk_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
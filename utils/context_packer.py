@@ -0,0 +1,152 @@
+# utils/context_packer.py
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+
+WORD = re.compile(r"\w+")
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough count (~4 characters per token), good enough for budgeting prompts
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def tokenize(text: str) -> List[str]:
+    return WORD.findall(text.lower())
+
+
+class ContextPacker:
+    """
+    Packs retrieved documents into a prompt context of bounded size.
+
+    Every document is split into chunks of roughly `chunk_tokens` tokens, the
+    chunks are ranked against the query with BM25, near-identical chunks coming
+    from different sources are dropped, and the best chunks are kept until
+    `token_budget` is spent. Chunks keep the 1-based number of the document they
+    came from, so `[number]` citations still point at the right source.
+
+    Args:
+        token_budget (int): Maximum estimated tokens of document text to keep.
+        chunk_tokens (int): Target chunk size in estimated tokens.
+        dedupe_threshold (float): Shingle Jaccard similarity above which two chunks are duplicates.
+    """
+
+    def __init__(self, token_budget: int = 6000, chunk_tokens: int = 256, dedupe_threshold: float = 0.8,
+                 k1: float = 1.5, b: float = 0.75):
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self.dedupe_threshold = dedupe_threshold
+        self.k1 = k1
+        self.b = b
+
+    def chunk(self, text: str) -> List[str]:
+        limit = self.chunk_tokens * CHARS_PER_TOKEN
+        chunks = []
+        current: List[str] = []
+        size = 0
+        for line in text.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            # Lines longer than a chunk are split on word boundaries
+            pieces = [line]
+            if len(line) > limit:
+                pieces, piece = [], []
+                for word in line.split():
+                    if piece and sum(len(w) + 1 for w in piece) + len(word) > limit:
+                        pieces.append(" ".join(piece))
+                        piece = []
+                    piece.append(word)
+                if piece:
+                    pieces.append(" ".join(piece))
+            for piece in pieces:
+                if current and size + len(piece) > limit:
+                    chunks.append("\n".join(current))
+                    current, size = [], 0
+                current.append(piece)
+                size += len(piece) + 1
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
+    def bm25(self, query: str, chunk_terms: List[List[str]]) -> List[float]:
+        terms = set(tokenize(query))
+        if not terms or not chunk_terms:
+            return [0.0] * len(chunk_terms)
+        avg_len = sum(len(t) for t in chunk_terms) / len(chunk_terms) or 1.0
+        df = Counter()
+        for t in chunk_terms:
+            df.update(terms.intersection(t))
+        n = len(chunk_terms)
+
+        scores = []
+        for t in chunk_terms:
+            tf = Counter(t)
+            score = 0.0
+            for term in terms:
+                if not tf[term]:
+                    continue
+                idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+                norm = tf[term] + self.k1 * (1 - self.b + self.b * len(t) / avg_len)
+                score += idf * tf[term] * (self.k1 + 1) / norm
+            scores.append(score)
+        return scores
+
+    @staticmethod
+    def shingles(terms: List[str], size: int = 5) -> Set[Tuple[str, ...]]:
+        if len(terms) < size:
+            return {tuple(terms)}
+        return {tuple(terms[i:i + size]) for i in range(len(terms) - size + 1)}
+
+    def is_duplicate(self, shingles: Set[Tuple[str, ...]], kept: List[Set[Tuple[str, ...]]]) -> bool:
+        for other in kept:
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= self.dedupe_threshold:
+                return True
+        return False
+
+    def pack(self, docs: List[Dict[str, Any]], query: str) -> List[Tuple[int, str]]:
+        """
+        Returns (source number, packed text) pairs in source order. Documents that
+        contribute no chunk are left out, the numbering of the others is unchanged.
+        """
+        chunks = []
+        for source, doc in enumerate(docs, start=1):
+            for position, text in enumerate(self.chunk(doc.get("pageContent") or "")):
+                chunks.append({"source": source, "position": position, "text": text, "terms": tokenize(text)})
+
+        scores = self.bm25(query, [c["terms"] for c in chunks])
+        # Highest score first; ties keep earlier sources and earlier chunks first
+        order = sorted(range(len(chunks)), key=lambda i: (-scores[i], chunks[i]["source"], chunks[i]["position"]))
+
+        selected = []
+        kept_shingles: List[Set[Tuple[str, ...]]] = []
+        used = 0
+        for i in order:
+            chunk = chunks[i]
+            cost = estimate_tokens(chunk["text"])
+            if used + cost > self.token_budget:
+                continue
+            shingles = self.shingles(chunk["terms"])
+            if self.is_duplicate(shingles, kept_shingles):
+                continue
+            kept_shingles.append(shingles)
+            selected.append(chunk)
+            used += cost
+
+        by_source: Dict[int, List[Dict[str, Any]]] = {}
+        for chunk in selected:
+            by_source.setdefault(chunk["source"], []).append(chunk)
+
+        packed = []
+        for source in sorted(by_source):
+            parts = sorted(by_source[source], key=lambda c: c["position"])
+            text = parts[0]["text"]
+            for previous, part in zip(parts, parts[1:]):
+                separator = "\n" if part["position"] == previous["position"] + 1 else "\n...\n"
+                text += separator + part["text"]
+            packed.append((source, text))
+        return packed
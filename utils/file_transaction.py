@@ -0,0 +1,156 @@
+# utils/file_transaction.py
+
+import hashlib
+import os
+import stat
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def matches_disk(path: str, data: bytes) -> bool:
+    # Size first, so most changed files are detected without reading them
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return content_hash(f.read()) == content_hash(data)
+    except OSError:
+        return False
+
+
+class FileTransaction:
+    """
+    Writes a batch of files all-or-nothing.
+
+    Every file is first staged as a temporary file next to its target (same
+    directory, so the final rename never crosses a filesystem), staging runs in a
+    thread pool, and files whose content already matches what is on disk are left
+    untouched. Commit swaps the staged files in with atomic `os.replace` calls; if
+    any step fails, files already replaced are restored from their backups and
+    newly created files and directories are removed.
+
+    Symlinks are resolved when a file is added, so the file they point at is
+    replaced and the link itself is kept; a replaced file keeps its permissions.
+
+    Args:
+        max_workers (int): Threads used to stage files in parallel.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self.files: Dict[str, bytes] = {}
+        self.txn_id = uuid.uuid4().hex[:12]
+
+    def add(self, path: str, content: str, encoding: str = 'utf-8'):
+        self.files[os.path.realpath(path)] = content.encode(encoding)
+
+    def temp_path(self, path: str, kind: str) -> str:
+        directory, name = os.path.split(path)
+        return os.path.join(directory, f".{name}.{self.txn_id}.{kind}")
+
+    def stage(self, path: str, data: bytes) -> str:
+        staged = self.temp_path(path, "tmp")
+        try:
+            with open(staged, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(path):
+                # Otherwise the replacement would get the umask default, e.g. losing +x
+                os.chmod(staged, stat.S_IMODE(os.stat(path).st_mode))
+        except BaseException:
+            if os.path.exists(staged):
+                os.remove(staged)
+            raise
+        return staged
+
+    def make_dirs(self, paths: List[str]) -> List[str]:
+        created = []
+        for directory in sorted({os.path.dirname(path) for path in paths}):
+            missing = []
+            while directory and not os.path.isdir(directory):
+                missing.append(directory)
+                directory = os.path.dirname(directory)
+            for d in reversed(missing):
+                os.mkdir(d)
+                created.append(d)
+        return created
+
+    def commit(self) -> Dict[str, List[str]]:
+        for path in self.files:
+            if os.path.isdir(path):
+                raise IsADirectoryError(f"Cannot write file over directory: {path}")
+        changed = [path for path, data in self.files.items() if not matches_disk(path, data)]
+        unchanged = [path for path in self.files if path not in changed]
+        if not changed:
+            return {"written": [], "unchanged": unchanged}
+
+        created_dirs: List[str] = []
+        staged: Dict[str, str] = {}
+        backups: Dict[str, Optional[str]] = {}
+        try:
+            created_dirs = self.make_dirs(changed)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {path: pool.submit(self.stage, path, self.files[path]) for path in changed}
+                errors = []
+                for path, future in futures.items():
+                    try:
+                        staged[path] = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                if errors:
+                    raise errors[0]
+
+            for path in changed:
+                if os.path.exists(path):
+                    backup = self.temp_path(path, "bak")
+                    os.replace(path, backup)
+                    backups[path] = backup
+                else:
+                    backups[path] = None
+                os.replace(staged[path], path)
+                del staged[path]
+        except BaseException:
+            self.rollback(backups, staged, created_dirs)
+            raise
+
+        # The new files are in place; leftover backups are only clutter
+        for backup in backups.values():
+            if backup:
+                try:
+                    os.remove(backup)
+                except OSError:
+                    pass
+        return {"written": changed, "unchanged": unchanged}
+
+    def rollback(self, backups: Dict[str, Optional[str]], staged: Dict[str, str], created_dirs: List[str]):
+        for path, backup in backups.items():
+            try:
+                if backup:
+                    os.replace(backup, path)
+                elif os.path.exists(path):
+                    os.remove(path)
+            except OSError:
+                pass
+        for temp in staged.values():
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+        for directory in reversed(created_dirs):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+
+
+def write_file(path: str, content: str, encoding: str = 'utf-8') -> bool:
+    """Atomically write a single file; returns False when the content was already on disk."""
+    transaction = FileTransaction(max_workers=1)
+    transaction.add(path, content, encoding)
+    return bool(transaction.commit()["written"])
@@ -0,0 +1,127 @@
+# utils/host_guard.py
+
+import random
+import time
+from typing import Any, Dict, Optional
+
+
+class HostUnavailable(Exception):
+    """Raised without touching the network while a host's circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} is unavailable after repeated failures, retry in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average, with bursts up to `capacity`.
+
+    `reserve` takes a token immediately and returns how long the caller has to
+    wait for it, so concurrent callers queue up in order without a lock.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after `failure_threshold` consecutive failures.
+
+    The circuit stays open for `ban_time` seconds, the same idea as SearxNG's
+    `ban_time_on_fail`; each time a trial request fails the ban doubles, up to
+    `max_ban_time`. Once the ban expires a single trial request is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, ban_time: float = 5.0, max_ban_time: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.ban_time = ban_time
+        self.max_ban_time = max_ban_time
+        self.failures = 0
+        self.bans = 0
+        self.open_until = 0.0
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.bans == 0:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half-open"
+
+    def check(self, host: str):
+        state = self.state
+        if state == "open":
+            raise HostUnavailable(host, self.open_until - time.monotonic())
+        if state == "half-open":
+            if self.trial_in_flight:
+                raise HostUnavailable(host, 0.0)
+            self.trial_in_flight = True
+
+    def record_success(self):
+        self.failures = 0
+        self.bans = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.failure_threshold:
+            self.bans += 1
+            ban = min(self.ban_time * 2 ** (self.bans - 1), self.max_ban_time)
+            self.open_until = time.monotonic() + ban
+            self.failures = 0
+        self.trial_in_flight = False
+
+
+class HostGuard:
+    """Rate limit and circuit breaker for one host, plus counters for `stats`."""
+
+    def __init__(self, host: str, rate: float, burst: float, failure_threshold: int,
+                 ban_time: float, max_ban_time: float):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, ban_time, max_ban_time)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.throttled = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "throttled_seconds": self.throttled,
+            "circuit": self.breaker.state,
+        }
+
+
+def backoff_delay(attempt: int, base: float, maximum: float, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff; a numeric Retry-After header wins when present."""
+    if retry_after:
+        try:
+            return min(float(retry_after), maximum)
+        except ValueError:
+            pass
+    return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
@@ -0,0 +1,264 @@
+# utils/html_extract.py
+
+import codecs
+import hashlib
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional, html.parser is used as the fallback backend
+    etree = None
+
+# Elements whose whole subtree is boilerplate and is dropped as soon as it opens
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "footer", "aside", "button", "select",
+}
+SKIP_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search", "menu"}
+
+# A <header> is the site banner at page level but a title block inside the content
+CONTENT_TAGS = {"article", "main"}
+
+# Elements that end the current text block
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd",
+    "h1", "h2", "h3", "h4", "h5", "h6", "br", "hr", "tr", "td", "th", "table",
+    "pre", "blockquote", "figcaption", "caption", "body",
+}
+
+# Elements that never get an end tag from html.parser, so they cannot open a skipped subtree
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+
+WHITESPACE = re.compile(r"\s+")
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+BOMS = [(codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")]
+
+
+def sniff_encoding(head: bytes) -> Optional[str]:
+    """Charset of a body served without one, from its byte order mark or a <meta> tag in `head`."""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = META_CHARSET.search(head[:4096])
+    if not match:
+        return None
+    try:
+        encoding = codecs.lookup(match.group(1).decode("ascii")).name
+    except LookupError:
+        return None
+    # A page that could declare a charset in ASCII is not UTF-16, whatever it says
+    return "utf-8" if encoding.startswith("utf-16") else encoding
+
+
+class TextSink:
+    """
+    Parser target shared by both backends: receives start/end/data events and
+    turns them into whitespace-normalized text blocks.
+    """
+
+    def __init__(self):
+        self.blocks: List[str] = []
+        self.buffer: List[str] = []
+        self.skip_tag: Optional[str] = None
+        self.skip_depth = 0
+        self.content_depth = 0
+        self.in_title = False
+        self.title_parts: List[str] = []
+
+    def start(self, tag: str, attrib: Dict[str, Any]):
+        tag = tag.lower()
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth += 1
+            return
+        if tag == "title":
+            self.in_title = True
+            return
+        if tag not in VOID_TAGS and (
+                tag in SKIP_TAGS or (tag == "header" and not self.content_depth)
+                or (attrib.get("role") or "").lower() in SKIP_ROLES
+                or (attrib.get("aria-hidden") or "").lower() == "true"):
+            self.flush()
+            self.skip_tag = tag
+            self.skip_depth = 0
+            return
+        if tag in CONTENT_TAGS:
+            self.content_depth += 1
+        if tag in BLOCK_TAGS:
+            self.flush()
+
+    def end(self, tag: str):
+        tag = tag.lower()
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                if self.skip_depth:
+                    self.skip_depth -= 1
+                else:
+                    self.skip_tag = None
+            return
+        if tag == "title":
+            self.in_title = False
+            return
+        if tag in CONTENT_TAGS and self.content_depth:
+            self.content_depth -= 1
+        if tag in BLOCK_TAGS:
+            self.flush()
+
+    def data(self, text: str):
+        if self.in_title:
+            self.title_parts.append(text)
+        elif self.skip_tag is None:
+            self.buffer.append(text)
+
+    def comment(self, text: str):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def flush(self):
+        if self.buffer:
+            block = WHITESPACE.sub(" ", "".join(self.buffer)).strip()
+            self.buffer = []
+            if block:
+                self.blocks.append(block)
+
+    def take(self) -> List[str]:
+        blocks, self.blocks = self.blocks, []
+        return blocks
+
+    @property
+    def title(self) -> Optional[str]:
+        title = WHITESPACE.sub(" ", "".join(self.title_parts)).strip()
+        return title or None
+
+
+class StdlibParser(HTMLParser):
+    def __init__(self, sink: TextSink):
+        super().__init__(convert_charrefs=True)
+        self.sink = sink
+
+    def handle_starttag(self, tag, attrs):
+        self.sink.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.sink.start(tag, dict(attrs))
+        self.sink.end(tag)
+
+    def handle_endtag(self, tag):
+        self.sink.end(tag)
+
+    def handle_data(self, data):
+        self.sink.data(data)
+
+
+class HtmlTextExtractor:
+    """
+    Incremental HTML to text extractor.
+
+    Chunks of the raw body are fed as they arrive and finished text blocks are
+    returned right away; no document tree is kept in memory. lxml's event-driven
+    parser is used when installed, the stdlib `html.parser` otherwise.
+
+    Args:
+        encoding (str): Charset used to decode the body; when None it is sniffed from
+            the first chunk, falling back to UTF-8.
+        backend (str): "lxml", "html.parser" or None to pick the fastest available.
+    """
+
+    def __init__(self, encoding: Optional[str] = None, backend: Optional[str] = None):
+        self.encoding = encoding
+        self.sink = TextSink()
+        if backend is None:
+            backend = "lxml" if etree is not None else "html.parser"
+        self.backend = backend
+        self.parser = None
+        self.decoder = None
+        if encoding:
+            self.start_parser(encoding)
+
+    def start_parser(self, encoding: str):
+        self.encoding = encoding
+        if self.backend == "lxml":
+            self.parser = etree.HTMLParser(target=self.sink, encoding=self.encoding, recover=True)
+        else:
+            self.parser = StdlibParser(self.sink)
+            self.decoder = codecs.getincrementaldecoder(self.lookup_encoding())(errors="replace")
+
+    def lookup_encoding(self) -> str:
+        try:
+            return codecs.lookup(self.encoding).name
+        except LookupError:
+            return "utf-8"
+
+    def feed(self, chunk: bytes) -> List[str]:
+        if self.parser is None:
+            self.start_parser(sniff_encoding(chunk) or "utf-8")
+        if self.decoder is not None:
+            self.parser.feed(self.decoder.decode(chunk))
+        else:
+            self.parser.feed(chunk)
+        return self.sink.take()
+
+    def close(self) -> List[str]:
+        if self.parser is None:
+            self.start_parser("utf-8")
+        if self.decoder is not None:
+            self.parser.feed(self.decoder.decode(b"", final=True))
+        self.parser.close()
+        self.sink.close()
+        return self.sink.take()
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.sink.title
+
+
+async def extract_document(response, max_bytes: int = 2_000_000, chunk_size: int = 65536,
+                           backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Read an aiohttp response in chunks up to `max_bytes`, extracting text while
+    reading. Returns the title, the text, the SHA-256 digest of the (possibly
+    truncated) body, and whether the body was cut at the cap. Chunks are dropped
+    once parsed.
+    """
+    extractor = HtmlTextExtractor(response.charset, backend=backend)
+    digest = hashlib.sha256()
+    blocks = []
+    read = 0
+    truncated = False
+    async for chunk in response.content.iter_chunked(chunk_size):
+        if read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - read]
+            truncated = True
+        read += len(chunk)
+        digest.update(chunk)
+        blocks.extend(extractor.feed(chunk))
+        if truncated:
+            break
+    blocks.extend(extractor.close())
+
+    return {
+        "title": extractor.title,
+        "text": "\n".join(blocks),
+        "digest": digest.hexdigest(),
+        "truncated": truncated,
+    }
+
+
+def extract_text(html: bytes, encoding: Optional[str] = None, chunk_size: int = 65536,
+                 backend: Optional[str] = None) -> Dict[str, Any]:
+    """Extract the title and text of an in-memory body, e.g. a saved page."""
+    extractor = HtmlTextExtractor(encoding, backend=backend)
+    blocks = []
+    for start in range(0, len(html), chunk_size):
+        blocks.extend(extractor.feed(html[start:start + chunk_size]))
+    blocks.extend(extractor.close())
+    return {"title": extractor.title, "text": "\n".join(blocks)}
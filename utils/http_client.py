@@ -0,0 +1,222 @@
+# utils/http_client.py
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+import aiohttp
+
+from config.config import (
+    HTTP_RATE_PER_HOST, HTTP_BURST_PER_HOST, HTTP_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX,
+    HTTP_FAILURE_THRESHOLD, HTTP_DEADLINE
+)
+from utils.host_guard import DeadlineExceeded, HostGuard, HostUnavailable, backoff_delay
+from utils.tracing import CLIENT, span
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpStatusError(Exception):
+    def __init__(self, url: str, status: int):
+        super().__init__(f"{url} returned HTTP {status}")
+        self.url = url
+        self.status = status
+
+
+class HttpClient:
+    """
+    Agent-lifetime pooled aiohttp session.
+
+    One TCPConnector is shared by every request made through the client, so
+    keep-alive connections, resolved DNS entries and TLS sessions are reused
+    across searches and link fetches instead of being rebuilt per call.
+
+    Requests made with `request` also go through a per-host guard: a token bucket
+    rate limit, retries with exponential backoff on connection errors and
+    429/5xx responses, a circuit breaker that fails fast for a host that keeps
+    failing, and a deadline covering every attempt, the waits in between and
+    reading the body.
+
+    Args:
+        pool_connections (int): Total number of concurrent connections in the pool.
+        pool_maxsize (int): Maximum number of concurrent connections per host.
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        dns_cache_ttl (int): Seconds a resolved host address is cached.
+        request_timeout (Optional[float]): Default total timeout for a request, None for no limit.
+        rate_per_host (float): Requests per second allowed to one host.
+        burst_per_host (float): Requests one host may receive in a burst.
+        retries (int): Extra attempts after a retryable failure.
+        backoff_base (float): First backoff delay in seconds, doubled per attempt.
+        backoff_max (float): Longest backoff delay in seconds.
+        failure_threshold (int): Consecutive failures that open a host's circuit.
+        ban_time (float): Seconds a circuit stays open the first time.
+        max_ban_time (float): Longest time a circuit stays open.
+        deadline (float): Default seconds a `request` may take overall.
+    """
+
+    def __init__(self, pool_connections: int = 100, pool_maxsize: int = 20,
+                 keepalive_timeout: float = 30.0, dns_cache_ttl: int = 300,
+                 request_timeout: Optional[float] = None,
+                 rate_per_host: float = HTTP_RATE_PER_HOST, burst_per_host: float = HTTP_BURST_PER_HOST,
+                 retries: int = HTTP_RETRIES, backoff_base: float = HTTP_BACKOFF_BASE,
+                 backoff_max: float = HTTP_BACKOFF_MAX, failure_threshold: int = HTTP_FAILURE_THRESHOLD,
+                 ban_time: float = 5.0, max_ban_time: float = 120.0, deadline: float = HTTP_DEADLINE):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.request_timeout = request_timeout
+        self.rate_per_host = rate_per_host
+        self.burst_per_host = burst_per_host
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.ban_time = ban_time
+        self.max_ban_time = max_ban_time
+        self.deadline = deadline
+        self.guards: Dict[str, HostGuard] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_settings(cls, outgoing: Dict[str, Any], search: Optional[Dict[str, Any]] = None) -> "HttpClient":
+        # Sized from the `outgoing` section of config/settings.yml, circuit bans from `search`
+        search = search or {}
+        return cls(
+            pool_connections=outgoing.get('pool_connections', 100),
+            pool_maxsize=outgoing.get('pool_maxsize', 20),
+            request_timeout=outgoing.get('max_request_timeout'),
+            ban_time=search.get('ban_time_on_fail', 5),
+            max_ban_time=search.get('max_ban_time_on_fail', 120),
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session is bound to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_connections,
+                limit_per_host=self.pool_maxsize,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            )
+        return self._session
+
+    def guard(self, host: str) -> HostGuard:
+        if host not in self.guards:
+            self.guards[host] = HostGuard(
+                host, self.rate_per_host, self.burst_per_host, self.failure_threshold,
+                self.ban_time, self.max_ban_time
+            )
+        return self.guards[host]
+
+    async def throttle(self, guard: HostGuard, remaining: float):
+        wait = guard.bucket.reserve()
+        if wait > remaining:
+            guard.bucket.refund()
+            raise DeadlineExceeded(f"Rate limit for {guard.host} would exceed the request deadline")
+        if wait > 0:
+            guard.throttled += wait
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, deadline: Optional[float] = None,
+                      retries: Optional[int] = None, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Guarded request, used as `async with http.request("GET", url) as response`.
+
+        Raises HostUnavailable while the host's circuit is open, DeadlineExceeded
+        when the deadline runs out, and the last error (HttpStatusError for a
+        429/5xx response) once retries are exhausted. Other statuses, e.g. 404,
+        are returned to the caller.
+        """
+        host = urlsplit(url).hostname or url
+        guard = self.guard(host)
+        deadline = self.deadline if deadline is None else deadline
+        retries = self.retries if retries is None else retries
+        session = await self.get_session()
+        start = time.monotonic()
+        attempt = 0
+        tries = 0
+        # Not made current: the caller's body runs while the response is open
+        s = span("http.request", CLIENT, **{"http.method": method, "http.url": url, "server.address": host})
+        try:
+            while True:
+                remaining = deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise DeadlineExceeded(f"Request to {url} exceeded its {deadline}s deadline")
+                try:
+                    guard.breaker.check(host)
+                except HostUnavailable:
+                    guard.rejected += 1
+                    raise
+
+                retry_after = None
+                try:
+                    await self.throttle(guard, remaining)
+                    remaining = deadline - (time.monotonic() - start)
+                    guard.requests += 1
+                    tries += 1
+                    response = await session.request(
+                        method, url, timeout=aiohttp.ClientTimeout(total=remaining), **kwargs
+                    )
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error: Exception = e
+                    if isinstance(e, asyncio.TimeoutError):
+                        error = DeadlineExceeded(f"Request to {url} exceeded its {deadline}s deadline")
+                except BaseException:
+                    # Cancelled or throttled out: a half-open trial must not stay claimed
+                    guard.breaker.trial_in_flight = False
+                    raise
+                else:
+                    s.set("http.status_code", response.status)
+                    if response.status not in RETRY_STATUSES:
+                        guard.breaker.record_success()
+                        try:
+                            yield response
+                        finally:
+                            response.release()
+                        return
+                    retry_after = response.headers.get("Retry-After")
+                    response.release()
+                    error = HttpStatusError(url, response.status)
+
+                guard.failures += 1
+                guard.breaker.record_failure()
+                attempt += 1
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+                if attempt > retries or delay >= deadline - (time.monotonic() - start):
+                    raise error
+                guard.retries += 1
+                await asyncio.sleep(delay)
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                s.record_error(e)
+            raise
+        finally:
+            s.set("http.attempts", tries)
+            s.end()
+
+    def host_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {host: guard.stats() for host, guard in self.guards.items()}
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "HttpClient":
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
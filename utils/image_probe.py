@@ -0,0 +1,146 @@
+# utils/image_probe.py
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from config.config import (
+    CACHE_DIR, IMAGE_VERDICT_TTL, IMAGE_INVALID_TTL, IMAGE_SNIFF_BYTES, IMAGE_VALIDATE_CONCURRENCY
+)
+from utils.bounded_gather import gather_bounded
+from utils.cache import TieredCache
+from utils.host_guard import DeadlineExceeded, HostUnavailable
+from utils.http_client import HttpClient, HttpStatusError
+
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+# Statuses some servers answer HEAD with even though GET works
+HEAD_UNSUPPORTED = {403, 405, 501}
+
+
+def sniff_image(data: bytes) -> Optional[str]:
+    """Image format from the first bytes of a file, None when it is not a known image."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data.startswith(b"BM"):
+        return "bmp"
+    if data.startswith((b"II*\x00", b"MM\x00*")):
+        return "tiff"
+    if data.startswith(b"\x00\x00\x01\x00"):
+        return "ico"
+    if data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis", b"heic", b"heix", b"mif1"):
+        return "avif" if data[8:12].startswith(b"avi") else "heic"
+    head = data.lstrip()[:256].lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head):
+        return "svg"
+    return None
+
+
+class ImageValidator:
+    """
+    Checks whether URLs point at images without downloading them.
+
+    A HEAD request decides when the server reports an image Content-Type. When
+    it does not (or rejects HEAD), a Range request for the first `sniff_bytes`
+    bytes is sniffed for image magic numbers; servers ignoring Range still only
+    have that much read. Verdicts are cached per URL; network errors are not,
+    so a transient failure is retried next time. Invalid verdicts (an HTTP error
+    or bytes that are not an image) go to `invalid_cache`, which should expire
+    sooner, since a broken link or an error page is often fixed later.
+
+    Args:
+        http (HttpClient): Pooled, rate-limited client used for every probe.
+        cache (TieredCache): Verdict store, None to disable caching.
+        sniff_bytes (int): Bytes requested and inspected by the Range fallback.
+        invalid_cache (TieredCache): Store for invalid verdicts, `cache` when None.
+    """
+
+    def __init__(self, http: HttpClient, cache: Optional[TieredCache] = None, sniff_bytes: int = 64,
+                 invalid_cache: Optional[TieredCache] = None):
+        self.http = http
+        self.cache = cache
+        self.invalid_cache = invalid_cache or cache
+        self.sniff_bytes = sniff_bytes
+
+    def verdict(self, url: str, valid: bool, reason: str, image_format: Optional[str] = None,
+                method: Optional[str] = None) -> Dict[str, Any]:
+        return {"url": url, "valid": valid, "format": image_format, "reason": reason, "method": method}
+
+    async def probe_head(self, url: str) -> Optional[Dict[str, Any]]:
+        async with self.http.request("HEAD", url, headers=HEADERS, allow_redirects=True) as response:
+            if response.status in HEAD_UNSUPPORTED:
+                return None
+            if response.status >= 400:
+                return self.verdict(url, False, f"HTTP {response.status}", method="HEAD")
+            content_type = response.headers.get('Content-Type', '').lower()
+            if content_type.startswith('image/'):
+                image_format = content_type[6:].split(';')[0].strip()
+                return self.verdict(url, True, "image content type", image_format, "HEAD")
+        # Missing, generic or misleading type: look at the bytes
+        return None
+
+    async def probe_range(self, url: str) -> Dict[str, Any]:
+        headers = dict(HEADERS, Range=f"bytes=0-{self.sniff_bytes - 1}")
+        async with self.http.request("GET", url, headers=headers) as response:
+            if response.status >= 400:
+                return self.verdict(url, False, f"HTTP {response.status}", method="GET range")
+            # read(n) returns whatever has arrived; the signature may span several packets
+            try:
+                data = await response.content.readexactly(self.sniff_bytes)
+            except asyncio.IncompleteReadError as e:
+                data = e.partial
+        image_format = sniff_image(data)
+        if image_format is None:
+            return self.verdict(url, False, "The URL doesn't point to a valid image.", method="GET range")
+        return self.verdict(url, True, "image signature", image_format, "GET range")
+
+    async def validate(self, url: str) -> Dict[str, Any]:
+        for cache in dict.fromkeys([self.cache, self.invalid_cache]):
+            cached = cache.get(url) if cache is not None else None
+            if cached is not None:
+                return cached
+        try:
+            result = await self.probe_head(url)
+            if result is None:
+                result = await self.probe_range(url)
+        except (HostUnavailable, DeadlineExceeded, HttpStatusError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+            return self.verdict(url, False, f"Network error: {e}")
+        cache = self.cache if result["valid"] else self.invalid_cache
+        if cache is not None:
+            cache.set(url, result)
+        return result
+
+    async def validate_many(self, urls: List[str], max_in_flight: int = 8,
+                            deadline: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        unique = list(dict.fromkeys(urls))
+        outcomes = await gather_bounded(unique, self.validate, max_in_flight=max_in_flight, deadline=deadline)
+        return {
+            outcome.item: outcome.result if outcome.ok else self.verdict(outcome.item, False, outcome.reason)
+            for outcome in outcomes
+        }
+
+
+_validator: Optional[ImageValidator] = None
+
+
+def get_image_validator() -> ImageValidator:
+    # Shared by the image tools so the connection pool and verdict cache outlive a single call
+    global _validator
+    if _validator is None:
+        path = os.path.join(CACHE_DIR, "images.sqlite3")
+        cache = TieredCache(path, table="image_verdicts", ttl=IMAGE_VERDICT_TTL)
+        invalid_cache = TieredCache(path, table="image_invalid_verdicts", ttl=IMAGE_INVALID_TTL)
+        _validator = ImageValidator(HttpClient(), cache, sniff_bytes=IMAGE_SNIFF_BYTES,
+                                    invalid_cache=invalid_cache)
+    return _validator
+
+
+async def validate_images(urls: List[str]) -> Dict[str, Dict[str, Any]]:
+    return await get_image_validator().validate_many(urls, max_in_flight=IMAGE_VALIDATE_CONCURRENCY)
@@ -0,0 +1,267 @@
+# utils/llm_gateway.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from config.config import CACHE_DIR, LLM_CACHE_ENABLED, LLM_CACHE_TTL, LLM_CACHE_MEMORY_SIZE, LLM_CACHE_DISK_SIZE
+from utils.cache import TieredCache
+from utils.tracing import CLIENT, Span, span
+
+DEFAULT_MODEL = "groq/llama-3.1-70b-versatile"
+
+
+def response_to_dict(response: Any) -> Dict[str, Any]:
+    if isinstance(response, dict):
+        return response
+    if hasattr(response, "model_dump"):
+        return response.model_dump()
+    if hasattr(response, "dict"):
+        return response.dict()
+    return dict(response)
+
+
+def chunk_text(chunk: Any) -> str:
+    """Text delta of one streamed chunk, for dict or object shaped chunks."""
+    choices = chunk.get("choices") if isinstance(chunk, dict) else getattr(chunk, "choices", None)
+    if not choices:
+        return ""
+    delta = choices[0].get("delta") if isinstance(choices[0], dict) else getattr(choices[0], "delta", None)
+    if delta is None:
+        return ""
+    content = delta.get("content") if isinstance(delta, dict) else getattr(delta, "content", None)
+    return content or ""
+
+
+def usage_attributes(s: Span, response: Any):
+    usage = response_to_dict(response).get("usage") or {}
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        s.set(f"llm.usage.{key}", usage.get(key))
+
+
+def text_response(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {},
+    }
+
+
+class CompletionGateway:
+    """
+    Single entry point for every litellm completion made by the agents.
+
+    litellm itself is imported on the first live call, not when agents are imported.
+
+    Responses are memoized on an exact match of model, messages, temperature and
+    any other request parameters, in a TieredCache that persists across runs.
+    Streaming requests and calls made with `cache=False` always reach the provider.
+    `astream` is the exception: it yields tokens as they arrive, records the
+    assembled answer, and replays a cached answer as a single chunk.
+
+    Args:
+        cache (TieredCache): Response store, None disables caching.
+    """
+
+    def __init__(self, cache: Optional[TieredCache]):
+        self.cache = cache
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.live_latency = 0.0
+        self.latency_saved = 0.0
+        self.tokens_used = 0
+        self.tokens_saved = 0
+        self.streams = 0
+        self.first_token_latency = 0.0
+
+    @staticmethod
+    def cache_key(model: str, messages: List[Dict[str, Any]], temperature: Optional[float],
+                  params: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "params": params},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if key is None:
+            return None
+        entry = self.cache.get(key)
+        with self.lock:
+            self.calls += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.latency_saved += entry["latency"]
+            self.tokens_saved += entry["tokens"]
+        return entry["response"]
+
+    def record(self, key: Optional[str], response: Any, latency: float):
+        data = response_to_dict(response)
+        tokens = (data.get("usage") or {}).get("total_tokens") or 0
+        with self.lock:
+            if key is None:
+                self.calls += 1
+                self.uncached += 1
+            self.live_latency += latency
+            self.tokens_used += tokens
+        if key is not None:
+            self.cache.set(key, {"response": data, "latency": latency, "tokens": tokens})
+
+    def key_for(self, model: str, messages: List[Dict[str, Any]], temperature: Optional[float],
+                cache: bool, params: Dict[str, Any]) -> Optional[str]:
+        if self.cache is None or not cache or params.get("stream"):
+            return None
+        return self.cache_key(model, messages, temperature, params)
+
+    def request(self, model: str, messages: List[Dict[str, Any]], temperature: Optional[float],
+                params: Dict[str, Any]) -> Dict[str, Any]:
+        kwargs = dict(params, model=model, messages=messages)
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        return kwargs
+
+    async def acomplete(self, messages: List[Dict[str, Any]], model: str = DEFAULT_MODEL,
+                        temperature: Optional[float] = None, cache: bool = True, **params) -> Any:
+        with span("llm.completion", CLIENT, **{"llm.model": model, "llm.stream": bool(params.get("stream"))}) as s:
+            key = self.key_for(model, messages, temperature, cache, params)
+            cached = self.lookup(key)
+            s.set("llm.cache_hit", cached is not None)
+            if cached is not None:
+                usage_attributes(s, cached)
+                return cached
+
+            from litellm import acompletion
+            start = time.perf_counter()
+            response = await acompletion(**self.request(model, messages, temperature, params))
+            if not params.get("stream"):
+                self.record(key, response, time.perf_counter() - start)
+                usage_attributes(s, response)
+            return response
+
+    def complete(self, messages: List[Dict[str, Any]], model: str = DEFAULT_MODEL,
+                 temperature: Optional[float] = None, cache: bool = True, **params) -> Any:
+        with span("llm.completion", CLIENT, **{"llm.model": model, "llm.stream": bool(params.get("stream"))}) as s:
+            key = self.key_for(model, messages, temperature, cache, params)
+            cached = self.lookup(key)
+            s.set("llm.cache_hit", cached is not None)
+            if cached is not None:
+                usage_attributes(s, cached)
+                return cached
+
+            from litellm import completion
+            start = time.perf_counter()
+            response = completion(**self.request(model, messages, temperature, params))
+            if not params.get("stream"):
+                self.record(key, response, time.perf_counter() - start)
+                usage_attributes(s, response)
+            return response
+
+    async def astream(self, messages: List[Dict[str, Any]], model: str = DEFAULT_MODEL,
+                      temperature: Optional[float] = None, cache: bool = True, **params) -> AsyncIterator[str]:
+        params.pop("stream", None)
+        # Not made current: the consumer runs between tokens
+        s = span("llm.completion", CLIENT, **{"llm.model": model, "llm.stream": True})
+        parts: List[str] = []
+        try:
+            key = self.key_for(model, messages, temperature, cache, params)
+            cached = self.lookup(key)
+            s.set("llm.cache_hit", cached is not None)
+            if cached is not None:
+                usage_attributes(s, cached)
+                content = cached["choices"][0]["message"]["content"] or ""
+                if content:
+                    parts.append(content)
+                    yield content
+                return
+
+            from litellm import acompletion
+            start = time.perf_counter()
+            first_token = None
+            response = await acompletion(**self.request(model, messages, temperature, dict(params, stream=True)))
+            async for chunk in response:
+                text = chunk_text(chunk)
+                if not text:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                    s.set("llm.time_to_first_token", first_token)
+                    with self.lock:
+                        self.streams += 1
+                        self.first_token_latency += first_token
+                parts.append(text)
+                yield text
+            # Only complete answers are recorded; a consumer that stops early never gets here
+            self.record(key, text_response(model, "".join(parts)), time.perf_counter() - start)
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                s.record_error(e)
+            raise
+        finally:
+            s.set("llm.chunks", len(parts))
+            s.set("llm.output_chars", sum(len(part) for part in parts))
+            s.end()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            live = self.misses + self.uncached
+            return {
+                "calls": self.calls,
+                "hits": self.hits,
+                "misses": self.misses,
+                "uncached": self.uncached,
+                "hit_rate": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+                "avg_live_latency": self.live_latency / live if live else 0.0,
+                "latency_saved": self.latency_saved,
+                "tokens_used": self.tokens_used,
+                "tokens_saved": self.tokens_saved,
+                "streams": self.streams,
+                "avg_time_to_first_token": self.first_token_latency / self.streams if self.streams else 0.0,
+            }
+
+
+_gateway: Optional[CompletionGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> CompletionGateway:
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            cache = None
+            if LLM_CACHE_ENABLED:
+                cache = TieredCache(
+                    os.path.join(CACHE_DIR, "llm.sqlite3"),
+                    table="completions",
+                    ttl=LLM_CACHE_TTL,
+                    memory_size=LLM_CACHE_MEMORY_SIZE,
+                    disk_size=LLM_CACHE_DISK_SIZE
+                )
+            _gateway = CompletionGateway(cache)
+        return _gateway
+
+
+async def acomplete(messages: List[Dict[str, Any]], model: str = DEFAULT_MODEL,
+                    temperature: Optional[float] = None, cache: bool = True, **params) -> Any:
+    return await get_gateway().acomplete(messages, model=model, temperature=temperature, cache=cache, **params)
+
+
+def complete(messages: List[Dict[str, Any]], model: str = DEFAULT_MODEL,
+             temperature: Optional[float] = None, cache: bool = True, **params) -> Any:
+    return get_gateway().complete(messages, model=model, temperature=temperature, cache=cache, **params)
+
+
+def astream(messages: List[Dict[str, Any]], model: str = DEFAULT_MODEL,
+            temperature: Optional[float] = None, cache: bool = True, **params) -> AsyncIterator[str]:
+    return get_gateway().astream(messages, model=model, temperature=temperature, cache=cache, **params)
+
+
+def stats() -> Dict[str, Any]:
+    return get_gateway().stats()
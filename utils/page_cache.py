@@ -0,0 +1,123 @@
+# utils/page_cache.py
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class PageCache:
+    """
+    Disk-backed, content-addressed store for fetched web pages.
+
+    The extracted text is stored once per SHA-256 digest of the body, so the same
+    page served from several URLs is kept a single time. Each URL keeps the
+    validators (ETag / Last-Modified) needed to revalidate it with a conditional
+    request, so a 304 response does not have to be fetched or parsed again. Raw
+    bodies are not kept: a 200 response is parsed while it streams in, before its
+    digest is known, so a stored body could never save that work.
+
+    Args:
+        root (str): Directory holding the SQLite index.
+        max_entries (int): Maximum number of URLs kept, least recently used are evicted.
+    """
+
+    def __init__(self, root: str, max_entries: int = 2000):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.revalidated = 0
+        self.stored = 0
+
+        self.db = sqlite3.connect(str(self.root / "pages.sqlite3"), check_same_thread=False)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                accessed REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS extracted (
+                digest TEXT PRIMARY KEY,
+                title TEXT,
+                page_content TEXT NOT NULL
+            );
+            """
+        )
+        self.db.commit()
+
+    @staticmethod
+    def digest(body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT p.digest, p.etag, p.last_modified, e.title, e.page_content "
+                "FROM pages p LEFT JOIN extracted e ON e.digest = p.digest WHERE p.url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "digest": row[0],
+            "etag": row[1],
+            "last_modified": row[2],
+            "title": row[3],
+            "pageContent": row[4],
+        }
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry is None or entry["pageContent"] is None:
+            return headers
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def mark_revalidated(self, url: str):
+        with self.lock:
+            self.revalidated += 1
+            self.db.execute("UPDATE pages SET accessed = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+
+    def store(self, url: str, digest: str, title: Optional[str], page_content: str,
+              etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        with self.lock:
+            self.stored += 1
+            self.db.execute(
+                "INSERT OR REPLACE INTO extracted (digest, title, page_content) VALUES (?, ?, ?)",
+                (digest, title, page_content)
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages (url, digest, etag, last_modified, accessed) VALUES (?, ?, ?, ?, ?)",
+                (url, digest, etag, last_modified, time.time())
+            )
+            self.evict()
+            self.db.commit()
+        return digest
+
+    def evict(self):
+        count = self.db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self.db.execute(
+            "DELETE FROM pages WHERE url IN (SELECT url FROM pages ORDER BY accessed ASC LIMIT ?)",
+            (count - self.max_entries,)
+        )
+        # Extracted text is shared between URLs, only drop what nothing points at anymore
+        self.db.execute("DELETE FROM extracted WHERE digest NOT IN (SELECT digest FROM pages)")
+
+    def stats(self) -> Dict[str, int]:
+        return {"revalidated": self.revalidated, "stored": self.stored}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,176 @@
+# utils/patch_engine.py
+
+import os
+import re
+import tempfile
+from typing import IO, Iterator, List, Optional
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(Exception):
+    pass
+
+
+class Hunk:
+    """One unified-diff hunk: `lines` keep their ' ', '-' or '+' prefix."""
+
+    def __init__(self, old_start: int, lines: List[str], old_count: int = 1):
+        self.old_start = old_start
+        self.old_count = old_count
+        self.lines = lines
+
+    @property
+    def offset(self) -> int:
+        """Lines of the original file that come before the hunk."""
+        # An empty old range (`@@ -5,0 +6 @@`, as written by `diff -U0`) inserts after old_start
+        return self.old_start if self.old_count == 0 else self.old_start - 1
+
+
+class AnchoredEdit:
+    """
+    Replace text relative to marker lines.
+
+    With an end marker, the lines between the first line containing `start_marker`
+    and the next line containing `end_marker` are replaced by `content` (both
+    marker lines are kept). Without one, the start marker line itself is replaced.
+    """
+
+    def __init__(self, start_marker: str, content: str, end_marker: Optional[str] = None):
+        self.start_marker = start_marker
+        self.end_marker = end_marker or None
+        self.content = content
+
+
+def parse_unified_diff(diff: str) -> List[Hunk]:
+    hunks: List[Hunk] = []
+    current: Optional[Hunk] = None
+    old_left = new_left = 0
+    for line in diff.splitlines():
+        if current is None or (old_left <= 0 and new_left <= 0):
+            # Outside a hunk: file headers and anything else until the next "@@"
+            match = HUNK_HEADER.match(line)
+            if match:
+                old_left = int(match.group(2)) if match.group(2) is not None else 1
+                current = Hunk(int(match.group(1)), [], old_left)
+                new_left = int(match.group(4)) if match.group(4) is not None else 1
+                hunks.append(current)
+            continue
+        if line.startswith("\\"):  # "\ No newline at end of file"
+            continue
+        if line == "":
+            line = " "
+        kind = line[0]
+        if kind not in " -+":
+            raise PatchError(f"Invalid diff line: {line!r}")
+        current.lines.append(line)
+        if kind in " -":
+            old_left -= 1
+        if kind in " +":
+            new_left -= 1
+    if not hunks:
+        raise PatchError("No hunks found in diff.")
+    if old_left > 0 or new_left > 0:
+        raise PatchError("Diff ends in the middle of a hunk.")
+    hunks.sort(key=lambda hunk: hunk.offset)
+    for previous, hunk in zip(hunks, hunks[1:]):
+        consumed = sum(1 for line in previous.lines if line[0] in " -")
+        if hunk.offset < previous.offset + consumed:
+            raise PatchError(f"Overlapping hunks at line {hunk.old_start}.")
+    return hunks
+
+
+def strip_eol(line: str) -> str:
+    return line.rstrip("\r\n")
+
+
+def line_ending(line: str) -> str:
+    if line.endswith("\r\n"):
+        return "\r\n"
+    return "\n" if line.endswith("\n") else ""
+
+
+def apply_hunks(source: IO[str], target: IO[str], hunks: List[Hunk]):
+    lines: Iterator[str] = iter(source)
+    line_no = 0
+    eol = "\n"
+    for hunk in hunks:
+        # Copy untouched lines up to the hunk
+        while line_no < hunk.offset:
+            line = next(lines, None)
+            if line is None:
+                raise PatchError(f"Hunk at line {hunk.old_start} is past the end of the file.")
+            eol = line_ending(line) or eol
+            target.write(line)
+            line_no += 1
+        for diff_line in hunk.lines:
+            kind, text = diff_line[0], diff_line[1:]
+            if kind == "+":
+                target.write(text + eol)
+                continue
+            line = next(lines, None)
+            line_no += 1
+            if line is None or strip_eol(line) != text:
+                found = "end of file" if line is None else repr(strip_eol(line))
+                raise PatchError(f"Context mismatch at line {line_no}: expected {text!r}, found {found}.")
+            eol = line_ending(line) or eol
+            if kind == " ":
+                target.write(line)
+    for line in lines:
+        target.write(line)
+
+
+def apply_anchored(source: IO[str], target: IO[str], edits: List[AnchoredEdit]):
+    pending = list(edits)
+    skipping = False
+    for line in source:
+        edit = pending[0] if pending else None
+        if skipping:
+            if edit.end_marker in line:
+                target.write(line)
+                pending.pop(0)
+                skipping = False
+            continue
+        if edit is not None and edit.start_marker in line:
+            eol = line_ending(line) or "\n"
+            if edit.end_marker:
+                target.write(line)
+                target.write(edit.content + eol)
+                skipping = True
+            else:
+                target.write(edit.content + eol)
+                pending.pop(0)
+            continue
+        target.write(line)
+    if skipping:
+        raise PatchError(f"End marker {pending[0].end_marker!r} not found after {pending[0].start_marker!r}.")
+    if pending:
+        raise PatchError(f"Start marker {pending[0].start_marker!r} not found.")
+
+
+def patch_file(path: str, hunks: Optional[List[Hunk]] = None, edits: Optional[List[AnchoredEdit]] = None,
+               encoding: str = "utf-8"):
+    """
+    Apply unified-diff hunks or anchored edits to `path` in one streaming pass.
+
+    The result is written to a temporary file in the same directory and only
+    swapped in with `os.replace` once every hunk or edit has been validated, so a
+    failed patch leaves the original file untouched.
+    """
+    if not hunks and not edits:
+        raise PatchError("Nothing to apply.")
+    directory = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding=encoding, newline="") as source:
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".patch")
+        try:
+            with os.fdopen(fd, "w", encoding=encoding, newline="") as target:
+                if hunks:
+                    apply_hunks(source, target, hunks)
+                else:
+                    apply_anchored(source, target, edits)
+            os.chmod(temp_path, os.stat(path).st_mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -0,0 +1,295 @@
+# utils/search_fanout.py
+
+import asyncio
+import importlib.util
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config.config import (
+    SEARXNG_INSTANCES, SEARCH_QUORUM, SEARCH_DEADLINE, SEARCH_SLOW_LATENCY,
+    SEARCH_DEMOTE_TIME, SEARCH_MAX_DEMOTE_TIME, SEARCH_DDG_MAX_RESULTS
+)
+from utils.http_client import HttpClient
+
+
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src"}
+RESULT_FIELDS = ("title", "url", "content", "img_src", "thumbnail_src", "thumbnail", "author", "iframe_src")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Key used to recognise the same page returned by different engines: scheme,
+    "www.", default ports, fragments, tracking parameters, parameter order and a
+    trailing slash are ignored.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", host, path, urlencode(query), ""))
+
+
+def result_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: data.get(field) for field in RESULT_FIELDS}
+
+
+class SearchProvider(ABC):
+    """Base class: `search` returns result dicts with the SearxNG result fields."""
+
+    name = "provider"
+
+    @abstractmethod
+    async def search(self, query: str, opts: Any = None) -> Dict[str, Any]:
+        """Return {"results": [result dicts], "suggestions": [...]}; raise on failure."""
+
+
+class SearxngProvider(SearchProvider):
+    def __init__(self, instance: str, http: HttpClient):
+        self.instance = instance.rstrip("/")
+        self.name = f"searxng:{urlsplit(self.instance).netloc or self.instance}"
+        self.http = http
+
+    async def search(self, query: str, opts: Any = None) -> Dict[str, Any]:
+        params = {"q": query, "format": "json"}
+        if opts is not None:
+            if getattr(opts, "categories", None):
+                params["categories"] = ",".join(opts.categories)
+            if getattr(opts, "engines", None):
+                params["engines"] = ",".join(opts.engines)
+            if getattr(opts, "language", None):
+                params["language"] = opts.language
+            if getattr(opts, "pageno", None):
+                params["pageno"] = str(opts.pageno)
+
+        async with self.http.request("GET", f"{self.instance}/search", params=params) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Failed to fetch data: {response.status}")
+            data = await response.json()
+        return {
+            "results": [result_dict(result) for result in data.get("results", []) if result.get("url")],
+            "suggestions": data.get("suggestions", []),
+        }
+
+
+class DuckDuckGoProvider(SearchProvider):
+    name = "duckduckgo"
+
+    def __init__(self, max_results: int = 30):
+        self.max_results = max_results
+
+    @staticmethod
+    def available() -> bool:
+        # Checked without importing; duckduckgo_search is only loaded by the first search
+        return importlib.util.find_spec("duckduckgo_search") is not None
+
+    async def search(self, query: str, opts: Any = None) -> Dict[str, Any]:
+        if not self.available():
+            raise RuntimeError("duckduckgo_search is not installed")
+        from duckduckgo_search import AsyncDDGS
+        results = await AsyncDDGS(proxy=None).atext(query, max_results=self.max_results)
+        return {
+            "results": [
+                result_dict({"title": result.get("title"), "url": result.get("href"), "content": result.get("body")})
+                for result in results or [] if result.get("href")
+            ],
+            "suggestions": [],
+        }
+
+
+class ProviderStats:
+    """Latency and failure history of one provider, and whether it is currently demoted."""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.latency: Optional[float] = None
+        self.strikes = 0
+        self.demoted_until = 0.0
+
+    def observe(self, latency: float):
+        self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+
+    def demoted(self, now: float) -> bool:
+        return now < self.demoted_until
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "avg_latency": self.latency,
+            "demoted_for": max(0.0, self.demoted_until - now),
+        }
+
+
+class SearchFanout:
+    """
+    Queries several search providers concurrently and merges their results.
+
+    Results are deduplicated by canonical URL; pages returned by more than one
+    provider, or ranked higher, come first. The search returns as soon as
+    `quorum` unique results have arrived or `deadline` seconds have passed,
+    whichever is first, and cancels the providers still running.
+
+    Providers that fail, miss the deadline or average more than `slow_latency`
+    seconds are demoted: they are skipped for `demote_time` seconds, doubling on
+    each repeat up to `max_demote_time`. When every provider is demoted, all are
+    queried anyway.
+
+    Args:
+        providers (List[SearchProvider]): Providers in order of preference.
+        quorum (int): Unique results that are enough to answer.
+        deadline (float): Seconds to wait for providers.
+        slow_latency (float): Average latency above which a provider is demoted.
+        demote_time (float): Initial demotion period in seconds.
+        max_demote_time (float): Longest demotion period in seconds.
+    """
+
+    def __init__(self, providers: List[SearchProvider], quorum: int = 20, deadline: float = 4.0,
+                 slow_latency: float = 3.0, demote_time: float = 30.0, max_demote_time: float = 600.0):
+        self.providers = providers
+        self.quorum = quorum
+        self.deadline = deadline
+        self.slow_latency = slow_latency
+        self.demote_time = demote_time
+        self.max_demote_time = max_demote_time
+        self.provider_stats = {provider.name: ProviderStats() for provider in providers}
+
+    def active_providers(self) -> List[SearchProvider]:
+        now = time.monotonic()
+        active = [p for p in self.providers if not self.provider_stats[p.name].demoted(now)]
+        return active or list(self.providers)
+
+    def demote(self, stats: ProviderStats):
+        stats.strikes += 1
+        period = min(self.demote_time * 2 ** (stats.strikes - 1), self.max_demote_time)
+        stats.demoted_until = time.monotonic() + period
+
+    def record(self, name: str, latency: float, failed: bool = False, timed_out: bool = False):
+        stats = self.provider_stats[name]
+        stats.calls += 1
+        stats.observe(latency)
+        if failed:
+            stats.failures += 1
+        if timed_out:
+            stats.timeouts += 1
+        if failed or timed_out or stats.latency > self.slow_latency:
+            self.demote(stats)
+        else:
+            stats.strikes = 0
+
+    async def timed_search(self, provider: SearchProvider, query: str, opts: Any):
+        start = time.perf_counter()
+        try:
+            data = await provider.search(query, opts)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.record(provider.name, time.perf_counter() - start, failed=True)
+            return provider.name, None, str(e)
+        self.record(provider.name, time.perf_counter() - start)
+        return provider.name, data, None
+
+    async def search(self, query: str, opts: Any = None, quorum: Optional[int] = None,
+                     deadline: Optional[float] = None) -> Dict[str, Any]:
+        quorum = quorum or self.quorum
+        deadline = self.deadline if deadline is None else deadline
+        start = time.perf_counter()
+        tasks = {
+            asyncio.ensure_future(self.timed_search(provider, query, opts)): provider.name
+            for provider in self.active_providers()
+        }
+        merged: Dict[str, Dict[str, Any]] = {}
+        suggestions: List[str] = []
+        status: Dict[str, str] = {}
+        pending = set(tasks)
+        try:
+            while pending and len(merged) < quorum:
+                remaining = deadline - (time.perf_counter() - start)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name, data, error = task.result()
+                    if data is None:
+                        status[name] = f"error: {error}"
+                        continue
+                    status[name] = f"{len(data['results'])} results"
+                    self.merge(merged, name, data["results"])
+                    suggestions.extend(s for s in data.get("suggestions", []) if s not in suggestions)
+        finally:
+            elapsed = time.perf_counter() - start
+            for task in pending:
+                task.cancel()
+                name = tasks[task]
+                if elapsed >= deadline:
+                    # Missed the deadline: counts against the provider
+                    status[name] = "deadline"
+                    self.record(name, elapsed, timed_out=True)
+                else:
+                    status[name] = "cancelled (quorum reached)"
+
+        results = sorted(merged.values(), key=lambda entry: -entry["score"])
+        data = {
+            "results": [entry["result"] for entry in results],
+            "suggestions": suggestions,
+            "providers": status,
+            "duration": time.perf_counter() - start,
+        }
+        if not results and status and all(value.startswith(("error", "deadline")) for value in status.values()):
+            data["error"] = "; ".join(f"{name}: {value}" for name, value in status.items())
+        return data
+
+    def merge(self, merged: Dict[str, Dict[str, Any]], name: str, results: List[Dict[str, Any]]):
+        for rank, result in enumerate(results):
+            key = canonical_url(result["url"])
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = {"result": dict(result, engines=[name]), "score": 1.0 / (rank + 1)}
+                continue
+            entry["score"] += 1.0 / (rank + 1)
+            if name not in entry["result"]["engines"]:
+                entry["result"]["engines"].append(name)
+            # Keep the richest snippet seen for the page
+            if len(result.get("content") or "") > len(entry["result"].get("content") or ""):
+                entry["result"]["content"] = result["content"]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {name: stats.as_dict(now) for name, stats in self.provider_stats.items()}
+
+
+def build_fanout(instances: List[str], http: HttpClient, duckduckgo: bool = True) -> SearchFanout:
+    providers: List[SearchProvider] = [SearxngProvider(instance, http) for instance in instances]
+    if duckduckgo and DuckDuckGoProvider.available():
+        providers.append(DuckDuckGoProvider(max_results=SEARCH_DDG_MAX_RESULTS))
+    return SearchFanout(
+        providers,
+        quorum=SEARCH_QUORUM,
+        deadline=SEARCH_DEADLINE,
+        slow_latency=SEARCH_SLOW_LATENCY,
+        demote_time=SEARCH_DEMOTE_TIME,
+        max_demote_time=SEARCH_MAX_DEMOTE_TIME,
+    )
+
+
+_fanout: Optional[SearchFanout] = None
+
+
+def get_search_backend() -> SearchFanout:
+    # Shared backend for callers without their own HttpClient, e.g. SearchTool
+    global _fanout
+    if _fanout is None:
+        _fanout = build_fanout(SEARXNG_INSTANCES, HttpClient())
+    return _fanout
@@ -0,0 +1,273 @@
+# utils/sessions.py
+
+import asyncio
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from utils.tracing import SERVER, span
+
+# handler(session, content, emit) -> final answer; emit(token) streams partial output.
+# The answer is either the text, or a dict with the text under "response" and extra
+# fields for the client next to it (e.g. dropped_links)
+Handler = Callable[["Session", str, Callable[[str], Awaitable[None]]], Awaitable[Union[str, Dict[str, Any]]]]
+
+
+class ServerBusy(Exception):
+    """The request queue stayed full for longer than the caller was willing to wait."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Server busy, retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class SessionBusy(Exception):
+    """The session already has its maximum number of requests queued or running."""
+
+    def __init__(self, session_id: str, limit: int):
+        super().__init__(f"Session {session_id} already has {limit} requests in flight")
+        self.session_id = session_id
+        self.limit = limit
+
+
+class UnknownSession(KeyError):
+    pass
+
+
+class Session:
+    """
+    One user's conversation: its chat history and the requests it has in flight.
+
+    Args:
+        session_id (str): Identifier handed to the client.
+        max_in_flight (int): Requests the session may have queued or running at once.
+        history_turns (int): Most recent user/assistant turn pairs kept in chat_history.
+    """
+
+    def __init__(self, session_id: str, max_in_flight: int = 2, history_turns: int = 20):
+        self.session_id = session_id
+        self.max_in_flight = max_in_flight
+        self.history_turns = history_turns
+        self.chat_history: List[Dict[str, str]] = []
+        self.in_flight = 0
+        self.created = time.monotonic()
+        self.last_seen = self.created
+
+    def add_turn(self, user: str, assistant: str):
+        self.chat_history += [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+        del self.chat_history[:-2 * self.history_turns]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"session_id": self.session_id, "chat_history": self.chat_history, "in_flight": self.in_flight}
+
+
+class SessionStore:
+    """
+    Sessions by id, expired after `ttl` idle seconds and capped at `max_sessions`.
+
+    A session with requests in flight is never expired.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600.0, max_in_flight: int = 2,
+                 history_turns: int = 20):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_in_flight = max_in_flight
+        self.history_turns = history_turns
+        self.sessions: Dict[str, Session] = {}
+
+    def create(self, session_id: Optional[str] = None) -> Session:
+        self.expire()
+        if session_id in self.sessions:
+            return self.get(session_id)
+        if len(self.sessions) >= self.max_sessions:
+            raise ServerBusy(retry_in=self.ttl / 10)
+        session = Session(session_id or secrets.token_urlsafe(16), self.max_in_flight, self.history_turns)
+        self.sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise UnknownSession(session_id)
+        session.last_seen = time.monotonic()
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+    def expire(self) -> int:
+        cutoff = time.monotonic() - self.ttl
+        expired = [session_id for session_id, session in self.sessions.items()
+                   if session.last_seen < cutoff and not session.in_flight]
+        for session_id in expired:
+            del self.sessions[session_id]
+        return len(expired)
+
+
+class Request:
+    """
+    A queued unit of work. Streamed tokens and the final outcome are read with
+    `next_event` as ("token", text), then ("done", answer) or ("error", message);
+    the answer is a dict with at least "response".
+
+    At most `stream_buffer` tokens wait unread; past that the handler's `emit`
+    blocks, so a slow client slows its own request down instead of growing memory.
+    """
+
+    def __init__(self, session: Session, kind: str, content: str, stream_buffer: int = 256):
+        self.session = session
+        self.kind = kind
+        self.content = content
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.room = asyncio.Semaphore(stream_buffer)
+        self.task: Optional[asyncio.Task] = None
+        self.cancelled = False
+        self.enqueued = time.monotonic()
+
+    async def emit(self, token: str):
+        await self.room.acquire()
+        self.events.put_nowait(("token", token))
+
+    def finish(self, event: str, value: Any):
+        self.events.put_nowait((event, value))
+
+    async def next_event(self):
+        event, value = await self.events.get()
+        if event == "token":
+            self.room.release()
+        return event, value
+
+    async def result(self) -> Dict[str, Any]:
+        """Wait for the answer, skipping streamed tokens; raises RuntimeError on failure."""
+        while True:
+            event, value = await self.next_event()
+            if event == "done":
+                return value
+            if event == "error":
+                raise RuntimeError(value)
+
+    def cancel(self):
+        """Called when the client goes away: drop the request, or stop it if it is running."""
+        self.cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+
+class RequestDispatcher:
+    """
+    Runs session requests on a fixed pool of workers fed by one bounded queue.
+
+    Backpressure happens at two levels: a session with `max_in_flight` requests
+    queued or running gets SessionBusy straight away, so one client cannot fill
+    the queue; and when the queue itself is full, `submit` waits up to
+    `queue_wait` seconds for room before raising ServerBusy. Requests are served
+    in arrival order across all sessions.
+
+    Args:
+        handlers (dict): Request kind -> async handler(session, content, emit).
+        workers (int): Requests processed concurrently.
+        queue_size (int): Requests that may wait for a worker.
+        queue_wait (float): Seconds `submit` waits for room in a full queue.
+    """
+
+    def __init__(self, handlers: Dict[str, Handler], workers: int = 16, queue_size: int = 256,
+                 queue_wait: float = 5.0):
+        self.handlers = handlers
+        self.workers = workers
+        self.queue_wait = queue_wait
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.queue_time = 0.0
+        self.run_time = 0.0
+
+    def start(self):
+        if not self.tasks:
+            self.tasks = [asyncio.ensure_future(self.worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def submit(self, session: Session, kind: str, content: str) -> Request:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown request kind '{kind}', expected one of {sorted(self.handlers)}")
+        if session.in_flight >= session.max_in_flight:
+            self.rejected += 1
+            raise SessionBusy(session.session_id, session.max_in_flight)
+        request = Request(session, kind, content)
+        session.in_flight += 1
+        try:
+            await asyncio.wait_for(self.queue.put(request), timeout=self.queue_wait)
+        except asyncio.TimeoutError:
+            session.in_flight -= 1
+            self.rejected += 1
+            raise ServerBusy(retry_in=self.queue_wait)
+        except BaseException:
+            session.in_flight -= 1
+            raise
+        return request
+
+    async def worker(self):
+        while True:
+            request = await self.queue.get()
+            self.running += 1
+            start = time.monotonic()
+            self.queue_time += start - request.enqueued
+            try:
+                await self.process(request)
+            finally:
+                self.running -= 1
+                self.run_time += time.monotonic() - start
+                request.session.in_flight -= 1
+                self.queue.task_done()
+
+    async def process(self, request: Request):
+        session = request.session
+        if request.cancelled:
+            self.cancelled += 1
+            return
+        with span("server.request", SERVER, **{"session.id": session.session_id, "request.kind": request.kind}) as s:
+            request.task = asyncio.ensure_future(self.handlers[request.kind](session, request.content, request.emit))
+            try:
+                answer = await request.task
+            except asyncio.CancelledError:
+                if not request.cancelled:
+                    # The dispatcher is stopping, not the client
+                    request.finish("error", "Server shutting down")
+                    raise
+                self.cancelled += 1
+                s.set("request.cancelled", True)
+                return
+            except Exception as e:
+                self.failed += 1
+                s.record_error(e)
+                request.finish("error", f"{type(e).__name__}: {e}")
+                return
+        if not isinstance(answer, dict):
+            answer = {"response": answer}
+        session.add_turn(request.content, answer["response"])
+        self.completed += 1
+        request.finish("done", answer)
+
+    def stats(self) -> Dict[str, Any]:
+        served = self.completed + self.failed + self.cancelled
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "avg_queue_time": self.queue_time / served if served else 0.0,
+            "avg_run_time": self.run_time / served if served else 0.0,
+        }
@@ -0,0 +1,229 @@
+# utils/subprocess_manager.py
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from config.config import CACHE_DIR, SUBPROCESS_MAX_CONCURRENT
+
+OutputCallback = Callable[[str, str], None]
+
+# pip's rules: a comment starts at a "#" that begins the line or follows whitespace,
+# so URL fragments like "#egg=name" or "#sha256=..." are kept
+REQUIREMENT_COMMENT = re.compile(r"(^|\s+)#.*$")
+REQUIREMENT_INCLUDE = re.compile(r"^(-r|--requirement|-c|--constraint)(?:\s*=\s*|\s+|(?=[^-\s]))(\S+)$")
+
+
+def print_output(stream: str, line: str):
+    print(f"[{stream}] {line}")
+
+
+class ProcessResult:
+    def __init__(self, args: List[str], returncode: Optional[int], stdout: List[str], stderr: List[str],
+                 duration: float, timed_out: bool = False):
+        self.args = args
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    def tail(self, lines: int = 20) -> str:
+        return "\n".join((self.stdout + self.stderr)[-lines:])
+
+    def summary(self) -> str:
+        if self.timed_out:
+            status = f"timed out after {self.duration:.1f}s"
+        else:
+            status = f"exited with code {self.returncode} in {self.duration:.1f}s"
+        return f"{' '.join(self.args)} {status}"
+
+
+class SubprocessManager:
+    """
+    Runs child processes on the asyncio loop instead of blocking it with os.system.
+
+    stdout and stderr are read concurrently line by line, passed to an output
+    callback as they arrive and kept (up to `max_output_lines` per stream) for the
+    result. A semaphore bounds how many processes run at once, and a process that
+    exceeds its timeout is killed.
+
+    Args:
+        max_concurrent (int): Processes allowed to run at the same time.
+        max_output_lines (int): Lines kept per stream in the ProcessResult.
+    """
+
+    def __init__(self, max_concurrent: int = 2, max_output_lines: int = 2000):
+        self.max_concurrent = max_concurrent
+        self.max_output_lines = max_output_lines
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self.semaphore
+
+    async def read_stream(self, name: str, stream: asyncio.StreamReader, lines: List[str],
+                          on_output: Optional[OutputCallback]):
+        while True:
+            raw = await stream.readline()
+            if not raw:
+                break
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            lines.append(line)
+            if len(lines) > self.max_output_lines:
+                del lines[0]
+            if on_output is not None:
+                on_output(name, line)
+
+    async def run(self, args: List[str], timeout: Optional[float] = None, cwd: Optional[str] = None,
+                  env: Optional[Dict[str, str]] = None,
+                  on_output: Optional[OutputCallback] = print_output) -> ProcessResult:
+        stdout: List[str] = []
+        stderr: List[str] = []
+        async with self.get_semaphore():
+            start = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=env,
+            )
+            readers = asyncio.gather(
+                self.read_stream("stdout", process.stdout, stdout, on_output),
+                self.read_stream("stderr", process.stderr, stderr, on_output),
+            )
+            timed_out = False
+            try:
+                await asyncio.wait_for(asyncio.shield(readers), timeout=timeout)
+                await process.wait()
+            except asyncio.TimeoutError:
+                timed_out = True
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                await asyncio.gather(readers, return_exceptions=True)
+            return ProcessResult(list(args), process.returncode, stdout, stderr,
+                                 time.perf_counter() - start, timed_out)
+
+
+class InstallCache:
+    """
+    Remembers which requirements files were installed successfully.
+
+    The key is the SHA-256 of the requirements content, including the files it
+    pulls in with -r / -c, together with the target interpreter, so installing an
+    unchanged requirements.txt again, from any generated project, is a no-op.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def requirement_lines(requirements_file: str, seen: Optional[Set[str]] = None) -> List[str]:
+        # Comments and blank lines dropped, nested -r / -c files expanded in place
+        seen = seen if seen is not None else set()
+        seen.add(os.path.realpath(requirements_file))
+        with open(requirements_file, "rb") as f:
+            content = f.read().decode(errors="replace")
+        lines = []
+        for line in content.splitlines():
+            line = REQUIREMENT_COMMENT.sub("", line).strip()
+            if not line:
+                continue
+            include = REQUIREMENT_INCLUDE.match(line)
+            if include is None:
+                lines.append(line)
+                continue
+            flag = "-c" if include.group(1) in ("-c", "--constraint") else "-r"
+            # Nested paths are relative to the file that names them, like pip resolves them
+            nested = os.path.join(os.path.dirname(os.path.abspath(requirements_file)), include.group(2))
+            if "://" in include.group(2) or not os.path.isfile(nested):
+                lines.append(f"{flag} {include.group(2)}")
+            elif os.path.realpath(nested) not in seen:
+                prefix = "-c " if flag == "-c" else ""
+                lines.extend(prefix + nested_line for nested_line in InstallCache.requirement_lines(nested, seen))
+        return lines
+
+    @staticmethod
+    def key(requirements_file: str, python: str) -> str:
+        # Normalize so comment, whitespace and ordering edits keep the same key
+        lines = sorted(InstallCache.requirement_lines(requirements_file))
+        digest = hashlib.sha256("\n".join(lines).encode())
+        digest.update(b"\0" + python.encode())
+        return digest.hexdigest()
+
+    def load(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def contains(self, key: str) -> bool:
+        with self.lock:
+            return key in self.load()
+
+    def add(self, key: str, requirements_file: str):
+        with self.lock:
+            entries = self.load()
+            entries[key] = {"requirements_file": os.path.abspath(requirements_file), "installed_at": time.time()}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp, self.path)
+
+
+_manager: Optional[SubprocessManager] = None
+_install_cache: Optional[InstallCache] = None
+
+
+def get_manager() -> SubprocessManager:
+    global _manager
+    if _manager is None:
+        _manager = SubprocessManager(max_concurrent=SUBPROCESS_MAX_CONCURRENT)
+    return _manager
+
+
+def get_install_cache() -> InstallCache:
+    global _install_cache
+    if _install_cache is None:
+        _install_cache = InstallCache(os.path.join(CACHE_DIR, "installs.json"))
+    return _install_cache
+
+
+async def install_requirements(requirements_file: str, timeout: Optional[float] = None,
+                               python: str = sys.executable,
+                               on_output: Optional[OutputCallback] = print_output) -> Optional[ProcessResult]:
+    """
+    pip install a requirements file; returns None when the same requirements were
+    already installed for this interpreter. Built wheels are kept in a shared
+    cache directory so different projects reuse them.
+    """
+    cache = get_install_cache()
+    key = cache.key(requirements_file, python)
+    if cache.contains(key):
+        return None
+    result = await get_manager().run(
+        [python, "-m", "pip", "install", "--cache-dir", os.path.join(CACHE_DIR, "pip"), "-r", requirements_file],
+        timeout=timeout,
+        on_output=on_output,
+    )
+    if result.ok:
+        cache.add(key, requirements_file)
+    return result
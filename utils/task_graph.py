@@ -0,0 +1,66 @@
+# utils/task_graph.py
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+
+class TaskGraph:
+    """
+    Runs async stages as a dependency graph.
+
+    Each stage starts as soon as the stages it depends on have finished, so
+    independent stages run concurrently. A stage function receives the results of
+    all stages finished so far, keyed by stage name.
+
+    Example:
+        graph = TaskGraph()
+        graph.add("draft", lambda results: draft_plan())
+        graph.add("tech_stack", lambda results: research(results["draft"]), deps=["draft"])
+        results = await graph.run()
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {}
+        self.deps: Dict[str, List[str]] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Any]], deps: Iterable[str] = ()):
+        deps = list(deps)
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = func
+        self.deps[name] = deps
+
+    async def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        started = time.perf_counter()
+
+        async def run_stage(name: str):
+            if self.deps[name]:
+                await asyncio.gather(*[tasks[dep] for dep in self.deps[name]])
+            start = time.perf_counter()
+            try:
+                results[name] = await self.stages[name](results)
+            finally:
+                end = time.perf_counter()
+                self.timings[name] = {
+                    "start": start - started,
+                    "end": end - started,
+                    "duration": end - start,
+                }
+
+        # Stages are added after their dependencies, so insertion order is a valid schedule
+        for name in self.stages:
+            tasks[name] = asyncio.ensure_future(run_stage(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        total = time.perf_counter() - started
+        self.timings["total"] = {"start": 0.0, "end": total, "duration": total}
+        return results
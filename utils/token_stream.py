@@ -0,0 +1,36 @@
+# utils/token_stream.py
+
+import sys
+import time
+from typing import AsyncIterator, Dict, Optional, TextIO
+
+
+async def collect(tokens: AsyncIterator[str]) -> str:
+    return "".join([token async for token in tokens])
+
+
+async def print_stream(tokens: AsyncIterator[str], label: Optional[str] = None,
+                       out: TextIO = sys.stdout) -> Dict[str, object]:
+    """
+    Write tokens to the terminal as they arrive.
+
+    Returns the full text with its timing: `first_token` is the time to the
+    first token, `total` the time until the stream was exhausted.
+    """
+    if label:
+        out.write(f"{label}: ")
+        out.flush()
+    start = time.perf_counter()
+    first_token = None
+    parts = []
+    async for token in tokens:
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        parts.append(token)
+        out.write(token)
+        out.flush()
+    total = time.perf_counter() - start
+    first = f"{first_token:.2f}s" if first_token is not None else "n/a"
+    out.write(f"\n[first token {first}, total {total:.2f}s]\n")
+    out.flush()
+    return {"text": "".join(parts), "first_token": first_token, "total": total}
@@ -0,0 +1,98 @@
+# utils/tool_runtime.py
+
+import asyncio
+import contextvars
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.tracing import span
+
+
+class ToolRuntime:
+    """
+    Executes agent tools without blocking the event loop.
+
+    Tools whose `run` is a coroutine function are awaited directly; blocking
+    tools are offloaded to a bounded thread pool. Every call gets a timeout, and
+    calls in flight can be cancelled. Note that cancelling or timing out a
+    blocking tool stops waiting for it, but the worker thread finishes its
+    current call in the background.
+
+    Args:
+        tools (Iterable[type]): Tool classes, looked up by class name.
+        max_workers (int): Threads available to blocking tools.
+        timeout (float): Default seconds a call may take, None for no limit.
+        timeouts (dict): Per-tool timeout overrides, keyed by tool name.
+    """
+
+    def __init__(self, tools: Iterable[type], max_workers: int = 8, timeout: Optional[float] = 120.0,
+                 timeouts: Optional[Dict[str, Optional[float]]] = None):
+        self.tools = {tool.__name__: tool for tool in tools}
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.in_flight: Set[asyncio.Task] = set()
+
+    def is_async(self, tool: Any) -> bool:
+        return inspect.iscoroutinefunction(tool.run)
+
+    async def invoke(self, tool: Any) -> Any:
+        if self.is_async(tool):
+            return await tool.run()
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the current context so spans inside the tool nest under its tool.run span
+        result = await loop.run_in_executor(self.executor, contextvars.copy_context().run, tool.run)
+        # Some sync run() implementations still hand back an awaitable
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def run(self, tool_name: str, timeout: Optional[float] = None, **kwargs) -> Any:
+        with span("tool.run", **{"tool.name": tool_name}) as s:
+            result = await self.run_tool(tool_name, timeout, **kwargs)
+            if isinstance(result, str) and result.startswith("Error:"):
+                s.error = result
+            return result
+
+    async def run_tool(self, tool_name: str, timeout: Optional[float], **kwargs) -> Any:
+        tool_class = self.tools.get(tool_name)
+        if tool_class is None:
+            return f"Error: Unknown tool '{tool_name}'."
+        try:
+            tool = tool_class(**kwargs)
+        except Exception as e:
+            return f"Error: Invalid arguments for {tool_name}: {e}"
+
+        if timeout is None:
+            timeout = self.timeouts.get(tool_name, self.timeout)
+        task = asyncio.ensure_future(self.invoke(tool))
+        self.in_flight.add(task)
+        try:
+            return await asyncio.wait_for(task, timeout=timeout)
+        except asyncio.TimeoutError:
+            return f"Error: {tool_name} timed out after {timeout} seconds."
+        except asyncio.CancelledError:
+            # Re-raise when the caller itself is being cancelled, report cancel_all() otherwise
+            current = asyncio.current_task()
+            if current is not None and getattr(current, "cancelling", lambda: 0)():
+                raise
+            return f"Error: {tool_name} was cancelled."
+        finally:
+            self.in_flight.discard(task)
+
+    async def run_many(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """Run independent tool calls concurrently, results in call order."""
+        results = await asyncio.gather(*[self.run(name, **kwargs) for name, kwargs in calls],
+                                       return_exceptions=True)
+        return [f"Error: {result}" if isinstance(result, Exception) else result for result in results]
+
+    def cancel_all(self) -> int:
+        tasks = [task for task in self.in_flight if not task.done()]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,282 @@
+# utils/tracing.py
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from config.config import TRACE_FILE, TRACE_KEEP, TRACE_MAX_BYTES, SERVICE_NAME
+
+# OTLP span kinds
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """
+    One timed operation. Used as a (sync or async) context manager it becomes the
+    current span, so spans started inside it, including in tasks created inside
+    it, are recorded as its children.
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, kind: int = INTERNAL, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self.token: Optional[contextvars.Token] = None
+
+    @property
+    def duration(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e9
+
+    def set(self, key: str, value: Any) -> "Span":
+        if value is not None:
+            self.attributes[key] = value
+        return self
+
+    def record_error(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer.finish(self)
+
+    def __enter__(self) -> "Span":
+        self.token = current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and not isinstance(exc, GeneratorExit):
+            self.record_error(exc)
+        if self.token is not None:
+            try:
+                current_span.reset(self.token)
+            except ValueError:
+                # Exited from a different context (e.g. an abandoned generator)
+                pass
+            self.token = None
+        self.end()
+        return False
+
+    async def __aenter__(self) -> "Span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": key, "value": otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+
+class Tracer:
+    """
+    Collects spans per trace and exports each trace when its root span ends.
+
+    Finished traces are appended to `path` as OTLP/JSON lines (the format of the
+    OpenTelemetry Collector file exporter), and the last `keep` traces stay in
+    memory for `slowest`. Once the file grows past `max_bytes` it is moved to
+    `<path>.1`, replacing the previous one, and a new file is started.
+
+    Args:
+        path (str): JSON lines file traces are appended to, None to keep them in memory only.
+        keep (int): Finished traces kept in memory.
+        service_name (str): `service.name` resource attribute.
+        max_bytes (int): Size at which the file is rotated, 0 to let it grow.
+    """
+
+    def __init__(self, path: Optional[str] = None, keep: int = 20, service_name: str = "agenmicrox",
+                 max_bytes: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.service_name = service_name
+        self.lock = threading.Lock()
+        self.open_traces: Dict[str, List[Span]] = {}
+        self.traces: Deque[List[Span]] = deque(maxlen=keep)
+
+    def span(self, name: str, kind: int = INTERNAL, **attributes) -> Span:
+        return Span(self, name, kind, current_span.get(), attributes)
+
+    def finish(self, span: Span):
+        root = span
+        while root.parent is not None:
+            root = root.parent
+        with self.lock:
+            if root is not span and root.end_ns is not None:
+                # Outlived its trace (e.g. a task nobody awaited); the trace is already exported
+                return
+            spans = self.open_traces.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent is not None:
+                return
+            del self.open_traces[span.trace_id]
+            self.traces.append(spans)
+        self.export(spans)
+
+    def export(self, spans: List[Span]):
+        if not self.path:
+            return
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": otlp_value(self.service_name)}]},
+                "scopeSpans": [{"scope": {"name": "agenmicrox"}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self.lock:
+                if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(payload) + "\n")
+        except OSError:
+            pass
+
+    def last_trace(self, skip: Optional[Callable[[Span], bool]] = None) -> List[Span]:
+        with self.lock:
+            for spans in reversed(self.traces):
+                root = spans[-1]
+                if skip is None or not skip(root):
+                    return list(spans)
+        return []
+
+    def slowest(self, limit: int = 10, spans: Optional[List[Span]] = None) -> List[Span]:
+        spans = self.last_trace() if spans is None else spans
+        return sorted(spans, key=lambda span: -span.duration)[:limit]
+
+
+def format_spans(spans: List[Span]) -> str:
+    lines = []
+    for span in spans:
+        attributes = ", ".join(f"{key}={value}" for key, value in span.attributes.items())
+        status = f"  ERROR {span.error}" if span.error else ""
+        parent = f"  (in {span.parent.name})" if span.parent is not None else ""
+        lines.append(f"{span.duration * 1000:>9.1f} ms  {span.name}{parent}  {attributes}{status}".rstrip())
+    return "\n".join(lines)
+
+
+def trace_report(limit: int = 10, tracer: Optional[Tracer] = None) -> str:
+    """The `/trace` console command: slowest spans of the last finished trace."""
+    tracer = tracer or get_tracer()
+    spans = tracer.last_trace()
+    if not spans:
+        return "No traced command yet."
+    root = spans[-1]
+    header = f"Trace {root.trace_id}: {root.attributes.get('command', root.name)}"
+    return header + "\n" + format_spans(tracer.slowest(limit, spans))
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(TRACE_FILE or None, keep=TRACE_KEEP, service_name=SERVICE_NAME,
+                             max_bytes=TRACE_MAX_BYTES)
+        return _tracer
+
+
+def span(name: str, kind: int = INTERNAL, **attributes) -> Span:
+    """Start a span under the current one: `with span("name", key=value) as s:`."""
+    return get_tracer().span(name, kind, **attributes)
+
+
+def annotate(**attributes):
+    """Set attributes on the current span, if there is one."""
+    s = current_span.get()
+    if s is not None:
+        for key, value in attributes.items():
+            s.set(key, value)
+
+
+def traced(name: Optional[str] = None, kind: int = INTERNAL):
+    """Decorator recording a span around a function, coroutine or async generator."""
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def generator_wrapper(*args, **kwargs):
+                # The span is only made current while the generator runs, never across a yield
+                s = span(span_name, kind)
+                generator = func(*args, **kwargs)
+                items = 0
+                try:
+                    while True:
+                        token = current_span.set(s)
+                        try:
+                            item = await generator.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            current_span.reset(token)
+                        items += 1
+                        yield item
+                except BaseException as e:
+                    if not isinstance(e, GeneratorExit):
+                        s.record_error(e)
+                    raise
+                finally:
+                    s.set("items", items)
+                    await generator.aclose()
+                    s.end()
+            return generator_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator